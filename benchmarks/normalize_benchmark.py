@@ -0,0 +1,344 @@
+"""Benchmark suite for KEGG parsers and normalizers.
+
+Times ``parse_reaction_entry``, ``extract_kegg_enzymes``,
+``extract_kegg_reactions``, ``extract_compound_name``, ``normalize_name`` and
+``build_parsed_reactions`` over the checked-in corpus under
+``benchmarks/corpus/`` and over a larger synthetic corpus from the same
+generator, reporting throughput (entries/s) and peak traced memory:
+
+    PYTHONPATH=. python benchmarks/normalize_benchmark.py --output bench.json
+    PYTHONPATH=. python benchmarks/normalize_benchmark.py --compare bench.json
+
+``--compare`` prints per-case throughput and memory changes against an
+earlier result file and exits non-zero when a case slows down by more than
+``--max-regression`` percent. ``--regenerate-corpus`` rewrites the corpus
+files (only needed when the generator changes).
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from etl.enrich.compound_enrichment import extract_compound_name
+from etl.normalize.domain_models_builder import build_parsed_reactions
+from etl.normalize.kegg_enzymes import extract_kegg_enzymes
+from etl.normalize.kegg_reactions import extract_kegg_reactions, parse_reaction_entry
+from etl.normalize.kegg_sections import section_text
+from etl.normalize.name_utils import normalize_name
+
+RESULT_FORMAT_VERSION = 1
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+CORPUS_SIZES = {"reaction": 3000, "compound": 2000, "module": 400}
+CORPUS_SEED = 20260101
+MIN_TIMING_SECONDS = 0.2
+
+_ELEMENTS = ("C", "H", "N", "O", "P", "S")
+_NAME_WORDS = (
+    "glucose", "phosphate", "pyruvate", "acetyl", "CoA", "NAD+", "NADH", "ATP", "ADP",
+    "dehydrogenase", "kinase", "synthase", "L-glutamate", "2-oxoglutarate", "beta-D-fructose",
+    "1,6-bisphosphate", "alpha-D-glucose", "succinyl", "malate", "oxaloacetate", "ethanol",
+)
+
+
+# ---------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------
+def generate_entries(kind: str, count: int, *, seed: int) -> list[str]:
+    """Build KEGG-shaped flat-file entries of one kind ("reaction", "compound", "module").
+
+    Entries follow the 12-column layout with wrapped continuation lines,
+    multi-line NAME/EQUATION values, occasional symbolic and decimal
+    coefficients, REFERENCE sub-sections and cross-reference blocks.
+    """
+    rng = random.Random(f"{kind}:{seed}")
+    builder = {"reaction": _reaction_entry, "compound": _compound_entry, "module": _module_entry}[kind]
+    return [builder(rng, number) for number in range(1, count + 1)]
+
+
+def load_corpus(kind: str) -> list[str]:
+    """Load the checked-in corpus of one kind."""
+    with gzip.open(CORPUS_DIR / f"{kind}.txt.gz", "rt", encoding="utf-8") as handle:
+        return [f"{block.strip()}\n" for block in handle.read().split("///\n") if block.strip()]
+
+
+def write_corpus() -> None:
+    """Regenerate the checked-in corpus files deterministically."""
+    CORPUS_DIR.mkdir(parents=True, exist_ok=True)
+    for kind, count in CORPUS_SIZES.items():
+        body = "".join(f"{entry}///\n" for entry in generate_entries(kind, count, seed=CORPUS_SEED))
+        # mtime=0 keeps the gzip bytes stable across regenerations.
+        with gzip.GzipFile(CORPUS_DIR / f"{kind}.txt.gz", "wb", mtime=0) as handle:
+            handle.write(body.encode("utf-8"))
+        print(f"Wrote {count} {kind} entries to {CORPUS_DIR / f'{kind}.txt.gz'}")
+
+
+def _wrap(label: str, values: list[str]) -> str:
+    lines = [f"{label:<12}{values[0]}"]
+    lines.extend(f"{'':<12}{value}" for value in values[1:])
+    return "\n".join(lines) + "\n"
+
+
+def _chunks(items: list[str], size: int, sep: str = " ") -> list[str]:
+    return [sep.join(items[i : i + size]) for i in range(0, len(items), size)] or [""]
+
+
+def _name(rng: random.Random) -> str:
+    return " ".join(rng.sample(_NAME_WORDS, rng.randint(1, 3)))
+
+
+def _coefficient(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.70:
+        return ""
+    if roll < 0.93:
+        return f"{rng.randint(2, 4)} "
+    if roll < 0.97:
+        return rng.choice(["n ", "(n+1) ", "2n ", "(n-1) "])
+    return rng.choice(["0.5 ", "1.5 "])
+
+
+def _side(rng: random.Random) -> str:
+    terms = []
+    for _ in range(rng.choices((1, 2, 3, 4), weights=(2, 5, 3, 1))[0]):
+        suffix = "(n)" if rng.random() < 0.02 else ""
+        terms.append(f"{_coefficient(rng)}C{rng.randint(1, 22000):05d}{suffix}")
+    return " + ".join(terms)
+
+
+def _references(rng: random.Random, count: int) -> str:
+    text = ""
+    for ref in range(1, count + 1):
+        text += f"REFERENCE   {ref}  [PMID:{rng.randint(1000000, 39999999)}]\n"
+        text += f"  AUTHORS   Author{rng.randint(1, 999)} A, Author{rng.randint(1, 999)} B\n"
+        text += f"  TITLE     Characterization of {_name(rng)}\n"
+        text += f"  JOURNAL   J Biol Chem {rng.randint(200, 299)}:{rng.randint(1, 9999)}-{rng.randint(1, 9999)} ({rng.randint(1970, 2024)})\n"
+    return text
+
+
+def _reaction_entry(rng: random.Random, number: int) -> str:
+    left, right = _side(rng), _side(rng)
+    arrow = "<=>" if rng.random() < 0.9 else "=>"
+    equation = f"{left} {arrow} {right}"
+    names = [f"{_name(rng)};" for _ in range(rng.randint(1, 3))]
+    names[-1] = names[-1].rstrip(";")
+    text = f"ENTRY       R{number:05d}                      Reaction\n"
+    text += _wrap("NAME", names)
+    text += _wrap("DEFINITION", _chunks(f"{_name(rng)} + {_name(rng)} {arrow} {_name(rng)}".split(), 8))
+    text += _wrap("EQUATION", _chunks(equation.split(" "), 9))
+    if rng.random() < 0.3:
+        text += _wrap("COMMENT", [f"{_name(rng)} (see R{rng.randint(1, 14000):05d})"])
+    rclasses = [f"RC{rng.randint(1, 3200):05d}  C{rng.randint(1, 22000):05d}_C{rng.randint(1, 22000):05d}" for _ in range(rng.randint(1, 3))]
+    text += _wrap("RCLASS", rclasses)
+    enzymes = [f"{rng.randint(1, 7)}.{rng.randint(1, 20)}.{rng.randint(1, 9)}.{rng.randint(1, 400)}" for _ in range(rng.randint(1, 6))]
+    text += _wrap("ENZYME", _chunks(enzymes, 4, "        "))
+    pathways = [f"rn{rng.choice([0, 1, 9])}{rng.randint(0, 1299):04d}  {_name(rng)} metabolism" for _ in range(rng.randint(0, 5))]
+    if pathways:
+        text += _wrap("PATHWAY", pathways)
+    if rng.random() < 0.4:
+        text += _wrap("MODULE", [f"M{rng.randint(1, 950):05d}  {_name(rng)} pathway" for _ in range(rng.randint(1, 2))])
+    orthologs = [f"K{rng.randint(1, 25000):05d}  {_name(rng)} [EC:{enzymes[0]}]" for _ in range(rng.randint(0, 8))]
+    if orthologs:
+        text += _wrap("ORTHOLOGY", orthologs)
+    text += _wrap("DBLINKS", [f"RHEA: {rng.randint(10000, 99999)}"])
+    text += _references(rng, rng.choice((0, 0, 1, 2)))
+    return text
+
+
+def _compound_entry(rng: random.Random, number: int) -> str:
+    names = [f"{_name(rng)};" for _ in range(rng.randint(1, 6))]
+    names[-1] = names[-1].rstrip(";")
+    formula = "".join(f"{element}{rng.randint(1, 30)}" for element in _ELEMENTS[: rng.randint(2, 6)])
+    reactions = [f"R{rng.randint(1, 14000):05d}" for _ in range(rng.randint(0, 40))]
+    text = f"ENTRY       C{number:05d}                   Compound\n"
+    text += _wrap("NAME", names)
+    text += f"FORMULA     {formula}\n"
+    text += f"EXACT_MASS  {rng.uniform(20, 1200):.4f}\n"
+    text += f"MOL_WEIGHT  {rng.uniform(20, 1200):.4f}\n"
+    if reactions:
+        text += _wrap("REACTION", _chunks(reactions, 6))
+    pathways = [f"map{rng.randint(0, 1299):05d}  {_name(rng)} metabolism" for _ in range(rng.randint(0, 6))]
+    if pathways:
+        text += _wrap("PATHWAY", pathways)
+    text += _wrap("DBLINKS", [f"CAS: {rng.randint(50, 99999)}-{rng.randint(10, 99)}-{rng.randint(0, 9)}", f"PubChem: {rng.randint(3000, 400000)}", f"ChEBI: {rng.randint(1000, 99999)}"])
+    atoms = rng.randint(3, 24)
+    text += f"ATOM        {atoms}\n"
+    text += "".join(f"            {i:<3} C1a C {rng.uniform(0, 30):8.4f} {rng.uniform(-20, 0):8.4f}\n" for i in range(1, atoms + 1))
+    text += f"BOND        {atoms - 1}\n"
+    text += "".join(f"            {i:<3} {i:>3} {i + 1:>3} 1\n" for i in range(1, atoms))
+    return text
+
+
+def _module_entry(rng: random.Random, number: int) -> str:
+    steps = [
+        ",".join(f"R{rng.randint(1, 14000):05d}" for _ in range(rng.randint(1, 3)))
+        + f"  C{rng.randint(1, 22000):05d} -> C{rng.randint(1, 22000):05d}"
+        for _ in range(rng.randint(2, 12))
+    ]
+    orthologs = [f"K{rng.randint(1, 25000):05d}  {_name(rng)} [EC:{rng.randint(1, 7)}.1.1.{rng.randint(1, 300)}]" for _ in range(rng.randint(2, 12))]
+    text = f"ENTRY       M{number:05d}                   Pathway   Module\n"
+    text += _wrap("NAME", [f"{_name(rng)} pathway, {_name(rng)} => {_name(rng)}"])
+    text += _wrap("DEFINITION", [" ".join(f"(K{rng.randint(1, 25000):05d},K{rng.randint(1, 25000):05d})" for _ in range(5))])
+    text += _wrap("ORTHOLOGY", orthologs)
+    text += _wrap("CLASS", ["Pathway modules; Carbohydrate metabolism; Central carbohydrate metabolism"])
+    text += _wrap("PATHWAY", [f"map{rng.randint(0, 1299):05d}  {_name(rng)} metabolism" for _ in range(rng.randint(1, 4))])
+    text += _wrap("REACTION", steps)
+    text += _wrap("COMPOUND", [f"C{rng.randint(1, 22000):05d}  {_name(rng)}" for _ in range(rng.randint(2, 10))])
+    return text
+
+
+# ---------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------
+def build_cases(corpus: dict[str, list[str]]) -> list[tuple[str, Callable[[], Any], int]]:
+    """Return ``(case, run, entries)`` triples over one corpus."""
+    reactions = corpus["reaction"]
+    compounds = corpus["compound"]
+    modules = corpus["module"]
+    raw_names = [section_text(text, "NAME") for text in compounds + reactions]
+    records = [
+        {"reaction_id": f"R{idx:05d}", "pathway_id": "map00010", "pathway_name": None, **parse_reaction_entry(text)}
+        for idx, text in enumerate(reactions)
+    ]
+
+    return [
+        ("parse_reaction_entry", lambda: [parse_reaction_entry(text) for text in reactions], len(reactions)),
+        ("extract_kegg_enzymes", lambda: [extract_kegg_enzymes(text) for text in reactions], len(reactions)),
+        ("extract_kegg_reactions", lambda: [extract_kegg_reactions(text) for text in modules], len(modules)),
+        ("extract_compound_name", lambda: [extract_compound_name(text) for text in compounds], len(compounds)),
+        ("normalize_name", lambda: [normalize_name(name) for name in raw_names], len(raw_names)),
+        ("build_parsed_reactions", lambda: build_parsed_reactions(records), len(records)),
+    ]
+
+
+def measure(run: Callable[[], Any], entries: int, repeat: int) -> dict[str, float | int]:
+    """Time ``run`` (best of ``repeat``) and trace its peak allocation once.
+
+    Fast cases are looped so each timing spans at least ``MIN_TIMING_SECONDS``,
+    which keeps small corpora from being dominated by timer noise.
+    """
+    started = time.perf_counter()
+    run()
+    loops = max(1, math.ceil(MIN_TIMING_SECONDS / max(time.perf_counter() - started, 1e-9)))
+
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            run()
+        best = min(best, (time.perf_counter() - started) / loops)
+
+    # Tracing slows allocation-heavy code down, so it is measured separately.
+    tracemalloc.start()
+    try:
+        run()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "entries": entries,
+        "seconds": round(best, 6),
+        "entries_per_second": round(entries / best, 1) if best > 0 else None,
+        "peak_bytes": peak,
+    }
+
+
+def run_suite(*, synthetic_scale: int, repeat: int) -> dict[str, Any]:
+    """Run every case over the checked-in and synthetic corpora."""
+    corpora = {"fixture": {kind: load_corpus(kind) for kind in CORPUS_SIZES}}
+    if synthetic_scale > 0:
+        corpora[f"synthetic_x{synthetic_scale}"] = {
+            kind: generate_entries(kind, count * synthetic_scale, seed=CORPUS_SEED + 1)
+            for kind, count in CORPUS_SIZES.items()
+        }
+
+    results: dict[str, dict[str, Any]] = {}
+    for corpus_name, corpus in corpora.items():
+        for case, run, entries in build_cases(corpus):
+            key = f"{corpus_name}/{case}"
+            results[key] = measure(run, entries, repeat)
+            stats = results[key]
+            print(
+                f"{key:<45} {stats['entries']:>7} entries  "
+                f"{stats['entries_per_second']:>12,.0f} entries/s  "
+                f"peak {stats['peak_bytes'] / 1024:>9,.0f} KiB"
+            )
+
+    return {
+        "format_version": RESULT_FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], max_regression: float) -> list[str]:
+    """Print per-case changes and return cases slower than ``max_regression`` percent."""
+    regressions = []
+    for key, stats in current["results"].items():
+        before = baseline.get("results", {}).get(key)
+        if not before or not before.get("entries_per_second") or before.get("entries") != stats["entries"]:
+            print(f"{key:<45} (no comparable baseline)")
+            continue
+        speed = (stats["entries_per_second"] / before["entries_per_second"] - 1) * 100
+        memory = (stats["peak_bytes"] / before["peak_bytes"] - 1) * 100 if before["peak_bytes"] else 0.0
+        flag = ""
+        if speed < -max_regression:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{key:<45} throughput {speed:+7.1f}%  peak memory {memory:+7.1f}%{flag}")
+    return regressions
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark KEGG parsers and normalizers")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, help="Earlier results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=15.0, help="Allowed slowdown in percent")
+    parser.add_argument("--synthetic-scale", type=int, default=5, help="Synthetic corpus size as a multiple of the fixture (0 skips)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions (best is kept)")
+    parser.add_argument("--regenerate-corpus", action="store_true", help="Rewrite benchmarks/corpus and exit")
+    args = parser.parse_args()
+
+    if args.regenerate_corpus:
+        write_corpus()
+        return 0
+
+    summary = run_suite(synthetic_scale=args.synthetic_scale, repeat=args.repeat)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(summary, indent=2, sort_keys=True))
+        print(f"Wrote benchmark results to {args.output}")
+    if args.compare:
+        regressions = compare(summary, json.loads(args.compare.read_text()), args.max_regression)
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.max_regression}%", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
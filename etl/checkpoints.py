@@ -0,0 +1,134 @@
+"""Durable per-pathway stage checkpoints for resumable batch ingestion."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from etl.config import REPO_ROOT
+
+CHECKPOINT_PATH = REPO_ROOT / "data" / "checkpoints" / "ingestion.sqlite"
+
+STAGE_FETCHED = "fetched"
+STAGE_PARSED = "parsed"
+STAGE_ENRICHED = "enriched"
+STAGE_LOADED = "loaded"
+STAGES = (STAGE_FETCHED, STAGE_PARSED, STAGE_ENRICHED, STAGE_LOADED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    batch_id TEXT NOT NULL,
+    pathway_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    payload BLOB,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (batch_id, pathway_id)
+);
+"""
+
+
+class CheckpointStore:
+    """SQLite store of the last completed stage of each pathway in a batch.
+
+    Each checkpoint keeps the output of its stage (zlib-compressed JSON), so
+    a rerun with the same batch id continues from the first unfinished
+    stage without redoing earlier ones. Only the latest stage's output is
+    kept per pathway.
+    """
+
+    def __init__(self, path: str | Path = CHECKPOINT_PATH) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def save(self, batch_id: str, pathway_id: str, stage: str, payload: Any = None) -> None:
+        """Record that ``stage`` completed for a pathway, with its output."""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown checkpoint stage: {stage}")
+        body = zlib.compress(json.dumps(payload).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO checkpoints (batch_id, pathway_id, stage, payload, saved_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (batch_id, pathway_id, stage, body, time.time()),
+            )
+
+    def load(self, batch_id: str, pathway_id: str) -> tuple[str | None, Any]:
+        """Return the last completed stage and its output (``(None, None)`` if none)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stage, payload FROM checkpoints WHERE batch_id = ? AND pathway_id = ?",
+                (batch_id, pathway_id),
+            ).fetchone()
+        if row is None:
+            return None, None
+        stage, body = row
+        return stage, json.loads(zlib.decompress(body).decode("utf-8"))
+
+    def status(self, batch_id: str) -> dict[str, str]:
+        """Return pathway id -> last completed stage for a batch."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT pathway_id, stage FROM checkpoints WHERE batch_id = ? ORDER BY pathway_id",
+                (batch_id,),
+            ).fetchall()
+        return dict(rows)
+
+    def completed(self, batch_id: str) -> set[str]:
+        """Return the pathways of a batch that reached the ``loaded`` stage."""
+        return {pathway_id for pathway_id, stage in self.status(batch_id).items() if stage == STAGE_LOADED}
+
+    def clear(self, batch_id: str) -> int:
+        """Delete every checkpoint of a batch; returns the number removed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM checkpoints WHERE batch_id = ?", (batch_id,))
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def run_pathway_stages(
+    pathway_id: str,
+    steps: Sequence[tuple[str, Callable[[Any], Any]]],
+    *,
+    store: CheckpointStore | None = None,
+    batch_id: str | None = None,
+) -> Any:
+    """Run a pathway's stages in order, checkpointing after each one.
+
+    ``steps`` pairs each stage name with a function taking the previous
+    stage's output (None for the first). Stages already checkpointed for
+    ``batch_id`` are skipped and the chain resumes from the stored output
+    of the last completed one; outputs must be JSON-serializable. Without a
+    store or batch id, the stages simply run.
+
+    Returns:
+        Output of the last stage.
+    """
+    names = [name for name, _ in steps]
+    value: Any = None
+    start = 0
+    if store is not None and batch_id is not None:
+        stage, payload = store.load(batch_id, pathway_id)
+        if stage in names:
+            start, value = names.index(stage) + 1, payload
+            if start < len(steps):
+                print(f"Resuming {pathway_id} after stage '{stage}'")
+
+    for name, fn in steps[start:]:
+        value = fn(value)
+        if store is not None and batch_id is not None:
+            store.save(batch_id, pathway_id, name, value)
+    return value
@@ -18,6 +18,14 @@ class ETLSettings:
     neo4j_uri: str
     neo4j_user: str
     neo4j_password: str | None
+    kegg_cache_path: str | None = None
+    kegg_cache_ttl_hours: float = 168.0
+    kegg_cache_negative_ttl_hours: float = 24.0
+    kegg_cache_max_mb: int = 512
+    kegg_archive_mode: str | None = None
+    kegg_archive_path: str | None = None
+    kegg_parse_workers: int = 1
+    pathway_concurrency: int = 4
 
 
 def get_settings() -> ETLSettings:
@@ -25,4 +33,12 @@ def get_settings() -> ETLSettings:
         neo4j_uri=os.getenv("APP_NEO4J_URI", "bolt://localhost:7687"),
         neo4j_user=os.getenv("APP_NEO4J_USER", "neo4j"),
         neo4j_password=os.getenv("APP_NEO4J_PASSWORD"),
+        kegg_cache_path=os.getenv("KEGG_CACHE_PATH") or None,
+        kegg_cache_ttl_hours=float(os.getenv("KEGG_CACHE_TTL_HOURS", "168")),
+        kegg_cache_negative_ttl_hours=float(os.getenv("KEGG_CACHE_NEGATIVE_TTL_HOURS", "24")),
+        kegg_cache_max_mb=int(os.getenv("KEGG_CACHE_MAX_MB", "512")),
+        kegg_archive_mode=os.getenv("KEGG_ARCHIVE_MODE") or None,
+        kegg_archive_path=os.getenv("KEGG_ARCHIVE_PATH") or None,
+        kegg_parse_workers=int(os.getenv("KEGG_PARSE_WORKERS", "1")),
+        pathway_concurrency=int(os.getenv("PATHWAY_CONCURRENCY", "4")),
     )
@@ -3,21 +3,35 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable
 
 import requests
 
-from etl.fetch.kegg_api import fetch_kegg_data
+from etl.fetch.kegg_api import fetch_kegg_entries, stream_kegg_lines
 from etl.models.kegg_types import RawReactionRecord
+from etl.models.reaction_table import ReactionTable
+from etl.normalize.kegg_parse_pool import parse_entries
+from etl.normalize.kegg_sections import section_text
 from etl.normalize.name_utils import normalize_name
 
+ENRICH_MODE_ENTRY = "entry"
+ENRICH_MODE_BULK = "bulk"
+DEFAULT_NAME_TABLE_REFRESH_SECONDS = 7 * 24 * 3600
+
 
 def enrich_compound_names(
 	reactions: list[RawReactionRecord],
 	*,
 	cache_path: str | Path | None = None,
 	session: requests.Session | None = None,
+	mode: str = ENRICH_MODE_ENTRY,
+	refresh_interval: float = DEFAULT_NAME_TABLE_REFRESH_SECONDS,
+	fetch: Callable[..., str] | None = None,
+	parse_workers: int | None = None,
 ) -> list[RawReactionRecord]:
 	"""Attach compound names to reaction records.
 
@@ -25,38 +39,116 @@ def enrich_compound_names(
 		reactions: Raw reaction records to enrich.
 		cache_path: Optional JSON cache file path for compound names.
 		session: Optional requests session for connection reuse.
+		mode: "entry" fetches uncached compound entries; "bulk" fills the
+			cache from the whole-database ``list/compound`` table first.
+		refresh_interval: Seconds before the bulk name table is re-downloaded.
+		fetch: Optional ``fetch_kegg_data``-compatible source (e.g. an offline
+			``FlatFileDump.fetch``); bypasses the KEGG response cache.
+		parse_workers: Processes for parsing fetched compound entries
+			(defaults to ``KEGG_PARSE_WORKERS``; 1 parses serially).
 
 	Returns:
 		Updated reaction records with compound names attached.
 	"""
+	cache = resolve_compound_names(
+		collect_compound_ids(reactions),
+		cache_path=cache_path,
+		session=session,
+		mode=mode,
+		refresh_interval=refresh_interval,
+		fetch=fetch,
+		parse_workers=parse_workers,
+	)
 
-	compound_ids = collect_compound_ids(reactions)
-	cache = load_compound_cache(cache_path)
-	sess = session or requests.Session()
-
-	for compound_id in sorted(compound_ids):
-		if compound_id in cache:
-			continue
-		entry = fetch_kegg_data("get", compound_id, session=sess)
-		cache[compound_id] = extract_compound_name(entry)
+	return attach_compound_names(reactions, cache)
 
-	save_compound_cache(cache_path, cache)
 
+def attach_compound_names(
+	reactions: list[RawReactionRecord],
+	names: dict[str, str | None],
+) -> list[RawReactionRecord]:
+	"""Set ``name`` on each compound and a ``compound_names`` map per reaction."""
 	for reaction in reactions:
-		names: dict[str, str | None] = {}
+		reaction_names: dict[str, str | None] = {}
 		for compound in reaction.get("substrates", []):
-			name = cache.get(compound["id"])
+			name = names.get(compound["id"])
 			compound["name"] = name
-			names[compound["id"]] = name
+			reaction_names[compound["id"]] = name
 		for compound in reaction.get("products", []):
-			name = cache.get(compound["id"])
+			name = names.get(compound["id"])
 			compound["name"] = name
-			names[compound["id"]] = name
-		reaction["compound_names"] = names
+			reaction_names[compound["id"]] = name
+		reaction["compound_names"] = reaction_names
 
 	return reactions
 
 
+def enrich_reaction_table(
+	table: ReactionTable,
+	*,
+	cache_path: str | Path | None = None,
+	session: requests.Session | None = None,
+	mode: str = ENRICH_MODE_ENTRY,
+	refresh_interval: float = DEFAULT_NAME_TABLE_REFRESH_SECONDS,
+	fetch: Callable[..., str] | None = None,
+	parse_workers: int | None = None,
+) -> ReactionTable:
+	"""Attach compound names to a ``ReactionTable`` (once per compound).
+
+	Takes the same options as ``enrich_compound_names``.
+	"""
+	names = resolve_compound_names(
+		table.compound_ids,
+		cache_path=cache_path,
+		session=session,
+		mode=mode,
+		refresh_interval=refresh_interval,
+		fetch=fetch,
+		parse_workers=parse_workers,
+	)
+	table.set_compound_names(names)
+	return table
+
+
+def resolve_compound_names(
+	compound_ids: Iterable[str],
+	*,
+	cache_path: str | Path | None = None,
+	session: requests.Session | None = None,
+	mode: str = ENRICH_MODE_ENTRY,
+	refresh_interval: float = DEFAULT_NAME_TABLE_REFRESH_SECONDS,
+	fetch: Callable[..., str] | None = None,
+	parse_workers: int | None = None,
+) -> dict[str, str | None]:
+	"""Return the compound name cache, extended with any missing ``compound_ids``."""
+	if mode not in (ENRICH_MODE_ENTRY, ENRICH_MODE_BULK):
+		raise ValueError(f"Unknown enrichment mode: {mode}")
+
+	sess = session or requests.Session()
+	if mode == ENRICH_MODE_BULK:
+		cache = refresh_compound_name_table(
+			cache_path,
+			refresh_interval=refresh_interval,
+			session=sess,
+		)
+	else:
+		cache = load_compound_cache(cache_path)
+
+	# Fetch uncached compounds (e.g. glycans missing from the bulk table)
+	# with batched multi-entry requests.
+	missing_ids = sorted({compound_id for compound_id in compound_ids if compound_id not in cache})
+	entries = (
+		fetch_kegg_entries(missing_ids, session=sess, fetch=fetch, use_cache=fetch is None)
+		if missing_ids
+		else {}
+	)
+	names = parse_entries(list(entries.values()), extract_compound_name, workers=parse_workers)
+	cache.update(zip(entries, names))
+
+	save_compound_cache(cache_path, cache)
+	return cache
+
+
 def collect_compound_ids(reactions: list[RawReactionRecord]) -> set[str]:
 	"""Collect unique compound IDs from reaction substrates and products."""
 	compound_ids: set[str] = set()
@@ -73,25 +165,96 @@ def extract_compound_name(entry: str) -> str | None:
 	if not entry:
 		return None
 
-	name_line = ""
-	capture = False
-	for line in entry.splitlines():
-		if line.startswith("NAME"):
-			capture = True
-			name_line = line.replace("NAME", "").strip()
-			continue
-		if capture:
-			if line.startswith(" "):
-				name_line += " " + line.strip()
-			else:
-				break
-
+	name_line = section_text(entry, "NAME")
 	if not name_line:
 		return None
 
 	return normalize_name(name_line.split(";", 1)[0])
 
 
+def refresh_compound_name_table(
+	cache_path: str | Path | None,
+	*,
+	refresh_interval: float = DEFAULT_NAME_TABLE_REFRESH_SECONDS,
+	session: requests.Session | None = None,
+) -> dict[str, str | None]:
+	"""Load the compound name cache, refreshing it from ``list/compound`` when stale.
+
+	The refresh time is kept in a sidecar ``*.meta.json`` file next to the
+	cache (or in memory when no cache path is configured).
+
+	Args:
+		cache_path: Optional JSON cache file path for compound names.
+		refresh_interval: Seconds before the table is re-downloaded.
+		session: Optional requests session for connection reuse.
+
+	Returns:
+		Compound id -> name mapping covering the whole KEGG compound database.
+	"""
+	global _memory_table_refreshed_at
+
+	cache = load_compound_cache(cache_path)
+	if not cache_path and _memory_table:
+		cache.update(_memory_table)
+	refreshed_at = _load_table_refreshed_at(cache_path)
+	if time.time() - refreshed_at < refresh_interval:
+		return cache
+
+	lines = stream_kegg_lines("list", "compound", session=session)
+	table = parse_compound_list(lines)
+	if not table:
+		return cache
+
+	cache.update(table)
+	if cache_path:
+		save_compound_cache(cache_path, cache)
+		_meta_path(cache_path).write_text(json.dumps({"refreshed_at": time.time()}))
+	else:
+		_memory_table.clear()
+		_memory_table.update(table)
+		_memory_table_refreshed_at = time.time()
+	print(f"Compound name table refreshed: {len(table)} compounds")
+	return cache
+
+
+def parse_compound_list(lines: Iterable[str]) -> dict[str, str | None]:
+	"""Parse ``list/compound`` lines into a compound id -> first name mapping.
+
+	Lines look like ``C00001\tH2O; Water`` (older releases prefix ids with
+	``cpd:``); the first ``;``-separated synonym is kept.
+	"""
+	table: dict[str, str | None] = {}
+	for line in lines:
+		compound_id, _, names = line.partition("\t")
+		compound_id = compound_id.strip().removeprefix("cpd:")
+		if not compound_id:
+			continue
+		table[compound_id] = normalize_name(names.split(";", 1)[0])
+	return table
+
+
+_memory_table: dict[str, str | None] = {}
+_memory_table_refreshed_at = 0.0
+
+
+def _meta_path(cache_path: str | Path) -> Path:
+	"""Return the sidecar metadata path for a compound cache file."""
+	return Path(cache_path).with_suffix(".meta.json")
+
+
+def _load_table_refreshed_at(cache_path: str | Path | None) -> float:
+	"""Return when the bulk name table was last refreshed (0 if never)."""
+	if not cache_path:
+		return _memory_table_refreshed_at
+	path = _meta_path(cache_path)
+	if not path.exists():
+		return 0.0
+	try:
+		return float(json.loads(path.read_text()).get("refreshed_at", 0.0))
+	except (json.JSONDecodeError, TypeError, ValueError):
+		return 0.0
+
+
 def load_compound_cache(cache_path: str | Path | None) -> dict[str, str | None]:
 	"""Load compound name cache from disk if configured."""
 	if not cache_path:
@@ -111,4 +274,7 @@ def save_compound_cache(cache_path: str | Path | None, cache: dict[str, Any]) ->
 		return
 	path = Path(cache_path)
 	path.parent.mkdir(parents=True, exist_ok=True)
-	path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+	# Write-then-rename so concurrent readers never see a half-written file.
+	tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+	tmp_path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+	os.replace(tmp_path, path)
@@ -2,11 +2,35 @@
 
 from __future__ import annotations
 
+import logging
+import re
 import time
+from typing import Any, Callable, Iterable, Iterator
 
 import requests
 
+from etl.fetch.kegg_archive import ARCHIVE_MODE_REPLAY, get_active_archive
+from etl.fetch.kegg_cache import KeggCache, get_default_cache
+from etl.fetch.kegg_control import (
+    OUTCOME_ERROR,
+    OUTCOME_OK,
+    KeggFlowControl,
+    classify_status,
+    get_flow_control,
+    parse_retry_after,
+    retry_delay,
+)
+from etl.fetch.kegg_metrics import endpoint_label, get_fetch_metrics
+from etl.fetch.kegg_singleflight import InFlightCall, get_singleflight
+
+logger = logging.getLogger(__name__)
+
 BASE_URL = "https://rest.kegg.jp"
+# KEGG's get endpoint accepts at most this many '+'-joined entries.
+KEGG_MAX_GET_ENTRIES = 10
+# Singleflight keys for per-entry claims; kept apart from URL keys so a batch
+# owner fetching a one-entry chunk never waits on itself.
+_ENTRY_FLIGHT_PREFIX = "entry:get/"
 
 
 def fetch_kegg_data(
@@ -17,6 +41,9 @@ def fetch_kegg_data(
     retries: int = 3,
     session: requests.Session | None = None,
     backoff: float = 1.5,
+    cache: KeggCache | None = None,
+    use_cache: bool = True,
+    control: KeggFlowControl | None = None,
 ) -> str:
     """Fetch raw text from a KEGG REST endpoint.
 
@@ -27,32 +54,477 @@ def fetch_kegg_data(
         retries: Number of attempts before giving up.
         session: Optional requests session for connection reuse.
         backoff: Multiplier for retry sleep time.
+        cache: Optional response cache (defaults to ``KEGG_CACHE_PATH``).
+        use_cache: Set to False to bypass the response cache.
+        control: Optional flow controller (defaults to the shared one); its
+            circuit breaker pauses requests while KEGG is throttling.
+
+    Concurrent calls for the same endpoint and entries share one request:
+    later callers wait for the in-flight one and reuse its result.
 
     Returns:
         Raw response text or an empty string on failure.
     """
 
-    # Normalize inputs and build the request URL.
+    # Normalize inputs; recorded/replayed runs go through the active archive.
     entries = entries.strip()
+    archive = get_active_archive()
+    if archive is not None and archive.mode == ARCHIVE_MODE_REPLAY:
+        return archive.replay(endpoint, entries)
+
+    def _fetch() -> str:
+        started = time.perf_counter()
+        body = _fetch_kegg_text(
+            endpoint,
+            entries,
+            timeout=timeout,
+            retries=retries,
+            session=session,
+            backoff=backoff,
+            cache=resolve_cache(cache, use_cache),
+            control=control or get_flow_control(),
+        )
+        if archive is not None:
+            archive.record(endpoint, entries, body, elapsed=time.perf_counter() - started)
+        return body
+
+    return get_singleflight().do(f"{endpoint}/{entries}", _fetch)
+
+
+def resolve_cache(cache: KeggCache | None, use_cache: bool = True) -> KeggCache | None:
+    """Pick the response cache for a fetch, or None when it must be bypassed.
+
+    Archived runs bypass the cache so that recordings capture every request
+    and replays do not depend on local cache state.
+    """
+    if not use_cache or get_active_archive() is not None:
+        return None
+    return cache or get_default_cache()
+
+
+def _fetch_kegg_text(
+    endpoint: str,
+    entries: str,
+    *,
+    timeout: int,
+    retries: int,
+    session: requests.Session | None,
+    backoff: float,
+    cache: KeggCache | None,
+    control: KeggFlowControl,
+) -> str:
+    """Fetch one KEGG URL through the response cache with retries.
+
+    Every attempt holds one of ``control``'s in-flight slots and reports its
+    outcome to it; throttling responses (403/429/503) and server errors are
+    retried with jittered backoff that honors Retry-After.
+    """
     url = f"{BASE_URL}/{endpoint}/{entries}"
+    metrics = get_fetch_metrics()
+    label = endpoint_label(endpoint, entries)
+
+    # Single-entry responses are cached here; multi-entry batches are cached
+    # per entry by fetch_kegg_entries.
+    kegg_cache = cache if "+" not in entries else None
+    if kegg_cache is not None:
+        cached = kegg_cache.get(endpoint, entries)
+        metrics.record_cache(label, hit=cached is not None)
+        if cached is not None:
+            return cached
 
     sess = session or requests.Session()
 
-    # Retry transient failures with incremental backoff.
+    # Retry transient failures with jittered incremental backoff.
     for attempt in range(1, retries + 1):
+        retry_after: float | None = None
         try:
-            # Perform the request and return raw response text.
-            response = sess.get(url, timeout=timeout)
+            # Perform the request and return raw response text. The flow
+            # control slot bounds in-flight requests across the process.
+            with control.slot():
+                started = time.perf_counter()
+                response = sess.get(url, timeout=timeout)
+            latency = time.perf_counter() - started
+            outcome = classify_status(response.status_code)
+            if outcome != OUTCOME_OK:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            control.record(outcome, latency=latency, retry_after=retry_after)
+            metrics.record_request(
+                label,
+                latency=latency,
+                size=len(response.text.encode("utf-8")),
+                error=response.status_code >= 400 and response.status_code != 404,
+            )
+            if response.status_code == 404:
+                # KEGG answers 404 for unknown entries; retrying will not help.
+                if kegg_cache is not None:
+                    kegg_cache.set(endpoint, entries, "")
+                return ""
             response.raise_for_status()
+            if kegg_cache is not None:
+                kegg_cache.set(endpoint, entries, response.text)
             return response.text
 
         except requests.exceptions.RequestException as e:
+            if not isinstance(e, requests.exceptions.HTTPError):
+                # Timeouts and connection errors never produced a status.
+                control.record(OUTCOME_ERROR)
+                metrics.record_request(label, latency=time.perf_counter() - started, error=True)
             if attempt == retries:
-                print(f"[KEGG ERROR] {url} -> {e}")
+                logger.error("KEGG request failed: %s -> %s", url, e)
                 return ""
 
-            sleep_time = backoff * attempt
-            print(f"[KEGG RETRY {attempt}/{retries}] waiting {sleep_time:.1f}s")
+            metrics.record_retry(label)
+            sleep_time = retry_delay(attempt, backoff, retry_after)
+            logger.warning(
+                "KEGG retry %d/%d for %s: %s; waiting %.1fs", attempt, retries, url, e, sleep_time
+            )
             time.sleep(sleep_time)
 
     return ""
+
+
+def stream_kegg_lines(
+    endpoint: str,
+    entries: str,
+    *,
+    timeout: int = 60,
+    retries: int = 3,
+    session: requests.Session | None = None,
+    backoff: float = 1.5,
+    control: KeggFlowControl | None = None,
+) -> Iterator[str]:
+    """Stream a KEGG REST response line by line.
+
+    Intended for bulk ``list``/``link`` tables that are too large to hold as a
+    single string. Failed connections are retried only before the first line
+    has been yielded.
+
+    Args:
+        endpoint: KEGG REST endpoint name (e.g., "list").
+        entries: Entry id or database name passed to KEGG.
+        timeout: Request timeout in seconds.
+        retries: Number of attempts before giving up.
+        session: Optional requests session for connection reuse.
+        backoff: Multiplier for retry sleep time.
+        control: Optional flow controller (defaults to the shared one); as in
+            ``fetch_kegg_data``, its circuit breaker pauses the request.
+
+    Yields:
+        Non-empty response lines.
+    """
+    entries = entries.strip()
+    archive = get_active_archive()
+    if archive is not None and archive.mode == ARCHIVE_MODE_REPLAY:
+        yield from (line for line in archive.replay(endpoint, entries).splitlines() if line)
+        return
+
+    lines = _stream_lines(
+        endpoint,
+        entries,
+        timeout=timeout,
+        retries=retries,
+        session=session,
+        backoff=backoff,
+        control=control or get_flow_control(),
+    )
+    if archive is not None:
+        # Record the full table once the stream has been consumed.
+        started = time.perf_counter()
+        recorded = list(lines)
+        archive.record(endpoint, entries, "\n".join(recorded), elapsed=time.perf_counter() - started)
+        yield from recorded
+        return
+
+    yield from lines
+
+
+def _stream_lines(
+    endpoint: str,
+    entries: str,
+    *,
+    timeout: int,
+    retries: int,
+    session: requests.Session | None,
+    backoff: float,
+    control: KeggFlowControl,
+) -> Iterator[str]:
+    """Stream response lines straight from KEGG (no archive involvement).
+
+    Attempts go through the same flow control as ``_fetch_kegg_text``: each
+    holds an in-flight slot (waiting for the circuit breaker) until the body
+    has been consumed, reports its outcome, and throttling responses honor
+    Retry-After.
+    """
+    url = f"{BASE_URL}/{endpoint}/{entries}"
+    sess = session or requests.Session()
+    metrics = get_fetch_metrics()
+    label = endpoint_label(endpoint, entries)
+
+    for attempt in range(1, retries + 1):
+        retry_after: float | None = None
+        # The slot is held until the body has been streamed (or the attempt failed).
+        control.acquire()
+        started = time.perf_counter()
+        try:
+            response = sess.get(url, timeout=timeout, stream=True)
+            outcome = classify_status(response.status_code)
+            if outcome != OUTCOME_OK:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            # Latency to the response headers; the body is streamed afterwards.
+            control.record(outcome, latency=time.perf_counter() - started, retry_after=retry_after)
+            response.raise_for_status()
+        except BaseException as e:
+            control.release()
+            if not isinstance(e, requests.exceptions.RequestException):
+                raise
+            if not isinstance(e, requests.exceptions.HTTPError):
+                # Timeouts and connection errors never produced a status.
+                control.record(OUTCOME_ERROR)
+            metrics.record_request(label, latency=time.perf_counter() - started, error=True)
+            if attempt == retries:
+                logger.error("KEGG stream failed: %s -> %s", url, e)
+                return
+            metrics.record_retry(label)
+            sleep_time = retry_delay(attempt, backoff, retry_after)
+            logger.warning(
+                "KEGG retry %d/%d for %s: %s; waiting %.1fs", attempt, retries, url, e, sleep_time
+            )
+            time.sleep(sleep_time)
+            continue
+
+        response.encoding = response.encoding or "utf-8"
+        size = 0
+        try:
+            with response:
+                for line in response.iter_lines(decode_unicode=True):
+                    size += len(line.encode("utf-8")) + 1
+                    if line:
+                        yield line
+        finally:
+            control.release()
+            # Latency covers the whole stream, which dominates for bulk tables.
+            metrics.record_request(label, latency=time.perf_counter() - started, size=size)
+        return
+
+
+def fetch_kegg_release(
+    session: requests.Session | None = None,
+    *,
+    fetch: Callable[..., str] | None = None,
+) -> str | None:
+    """Fetch the current KEGG release string from ``info/kegg``.
+
+    Args:
+        session: Optional requests session for connection reuse.
+        fetch: Optional ``fetch_kegg_data``-compatible source.
+
+    Returns:
+        Release identifier (e.g., "117.0+/01-18") or None when unavailable.
+    """
+    if fetch is not None:
+        text = fetch("info", "kegg", session=session)
+    else:
+        text = fetch_kegg_data("info", "kegg", session=session, use_cache=False)
+    match = re.search(r"Release\s+(\S+)", text)
+    return match.group(1).rstrip(",") if match else None
+
+
+def sync_kegg_release(
+    *,
+    cache: KeggCache | None = None,
+    session: requests.Session | None = None,
+) -> str | None:
+    """Confirm the KEGG release for this run and invalidate stale cache entries.
+
+    Makes at most one ``info`` call per ``release_recheck`` window, so every
+    ingestion entry point can call it cheaply at startup.
+
+    Args:
+        cache: Optional response cache (defaults to ``KEGG_CACHE_PATH``).
+        session: Optional requests session for connection reuse.
+
+    Returns:
+        The confirmed KEGG release, or None when caching is disabled or the
+        release could not be determined (entries then fall back to TTLs).
+    """
+    kegg_cache = cache or get_default_cache()
+    if kegg_cache is None:
+        return None
+    if kegg_cache.release_is_fresh():
+        return kegg_cache.release
+
+    release = fetch_kegg_release(session=session)
+    if release is None:
+        return None
+    previous = kegg_cache.release
+    if kegg_cache.sync_release(release):
+        logger.info("KEGG release changed (%s -> %s); cache invalidated", previous, release)
+    return release
+
+
+def fetch_kegg_entries(
+    entry_ids: list[str],
+    *,
+    batch_size: int = KEGG_MAX_GET_ENTRIES,
+    chunk_retries: int = 1,
+    session: requests.Session | None = None,
+    fetch: Callable[..., str] | None = None,
+    cache: KeggCache | None = None,
+    use_cache: bool = True,
+    **fetch_kwargs: Any,
+) -> dict[str, str]:
+    """Fetch KEGG entries with batched multi-entry ``get`` requests.
+
+    Args:
+        entry_ids: KEGG entry ids to fetch.
+        batch_size: Entries per request (KEGG accepts at most 10).
+        chunk_retries: Extra rounds for chunks that came back empty.
+        session: Optional requests session for connection reuse.
+        fetch: Optional fetch callable (defaults to ``fetch_kegg_data``).
+        cache: Optional response cache (defaults to ``KEGG_CACHE_PATH``).
+        use_cache: Set to False to bypass the response cache.
+        **fetch_kwargs: Extra keyword arguments passed to ``fetch``.
+
+    Returns:
+        Mapping of each requested id to its entry text ("" when missing).
+    """
+    fetch_fn = fetch or fetch_kegg_data
+    sess = session or requests.Session()
+    kegg_cache = resolve_cache(cache, use_cache)
+    results = read_cached_entries(kegg_cache, entry_ids)
+
+    # Entries already being fetched by a concurrent caller are awaited, not refetched.
+    owned, shared = claim_entries([entry_id for entry_id in entry_ids if entry_id not in results])
+    try:
+        pending = chunk_entry_ids(owned, batch_size)
+        for _ in range(chunk_retries + 1):
+            failed: list[list[str]] = []
+            for chunk in pending:
+                text = fetch_fn("get", "+".join(chunk), session=sess, **fetch_kwargs)
+                if not text:
+                    failed.append(chunk)
+                    continue
+                results.update(resolve_chunk(chunk, text, kegg_cache))
+            pending = failed
+            if not pending:
+                break
+    except BaseException as exc:
+        publish_entries(owned, results, error=exc)
+        raise
+    publish_entries(owned, results)
+
+    for entry_id, call in shared.items():
+        results[entry_id] = call.wait()
+    return {entry_id: results.get(entry_id, "") for entry_id in entry_ids}
+
+
+def claim_entries(entry_ids: Iterable[str]) -> tuple[list[str], dict[str, InFlightCall]]:
+    """Claim per-entry ownership for a batched ``get``.
+
+    Returns:
+        Ids this caller must fetch and then ``publish_entries``, and pending
+        calls, by id, for entries another caller is already fetching.
+    """
+    prefix_len = len(_ENTRY_FLIGHT_PREFIX)
+    owned, shared = get_singleflight().claim(
+        f"{_ENTRY_FLIGHT_PREFIX}{entry_id.strip()}" for entry_id in entry_ids if entry_id.strip()
+    )
+    return (
+        [key[prefix_len:] for key in owned],
+        {key[prefix_len:]: call for key, call in shared.items()},
+    )
+
+
+def publish_entries(
+    entry_ids: Iterable[str],
+    results: dict[str, str],
+    *,
+    error: BaseException | None = None,
+) -> None:
+    """Release claimed entries, handing their texts (or an error) to waiters."""
+    flight = get_singleflight()
+    for entry_id in entry_ids:
+        flight.complete(f"{_ENTRY_FLIGHT_PREFIX}{entry_id}", results.get(entry_id, ""), error=error)
+
+
+def read_cached_entries(cache: KeggCache | None, entry_ids: Iterable[str]) -> dict[str, str]:
+    """Return cached ``get`` bodies (including negative entries) for entry ids."""
+    if cache is None:
+        return {}
+    metrics = get_fetch_metrics()
+    cached: dict[str, str] = {}
+    for entry_id in entry_ids:
+        body = cache.get("get", entry_id)
+        metrics.record_cache("get", hit=body is not None)
+        if body is not None:
+            cached[entry_id] = body
+    return cached
+
+
+def resolve_chunk(chunk: list[str], text: str, cache: KeggCache | None) -> dict[str, str]:
+    """Map a successful chunk response to entry texts and cache each entry.
+
+    Ids absent from the response are unknown to KEGG and cached as negative.
+    """
+    matched = match_kegg_entries(chunk, text)
+    resolved = {entry_id: matched.get(entry_id, "") for entry_id in chunk}
+    if cache is not None:
+        for entry_id, body in resolved.items():
+            cache.set("get", entry_id, body)
+    return resolved
+
+
+def chunk_entry_ids(entry_ids: list[str], batch_size: int = KEGG_MAX_GET_ENTRIES) -> list[list[str]]:
+    """Split unique entry ids into ``get`` sized chunks, preserving order."""
+    if not 1 <= batch_size <= KEGG_MAX_GET_ENTRIES:
+        raise ValueError(f"batch_size must be between 1 and {KEGG_MAX_GET_ENTRIES}")
+    unique_ids = list(dict.fromkeys(entry_id.strip() for entry_id in entry_ids if entry_id.strip()))
+    return [unique_ids[i : i + batch_size] for i in range(0, len(unique_ids), batch_size)]
+
+
+def match_kegg_entries(requested: list[str], text: str) -> dict[str, str]:
+    """Map requested ids to entry texts from a multi-entry ``get`` response.
+
+    Requested ids may carry a database prefix (e.g. "cpd:C00001"); they are
+    matched against the bare ENTRY id. A single-entry response without an
+    ENTRY line is attributed to the single requested id.
+    """
+    entries = split_kegg_entries(text)
+    if len(requested) == 1 and not entries and text.strip():
+        return {requested[0]: text}
+
+    matched: dict[str, str] = {}
+    for entry_id in requested:
+        bare_id = entry_id.split(":", 1)[-1]
+        if bare_id in entries:
+            matched[entry_id] = entries[bare_id]
+    return matched
+
+
+def split_kegg_entries(text: str) -> dict[str, str]:
+    """Split concatenated KEGG flat-file entries on ``///`` terminators.
+
+    Args:
+        text: Raw response containing one or more KEGG entries.
+
+    Returns:
+        Mapping of ENTRY id to that entry's text (without the terminator).
+    """
+    entries: dict[str, str] = {}
+    for block in text.split("\n///"):
+        block = block.strip("\n")
+        if not block.strip():
+            continue
+        entry_id = _entry_id(block)
+        if entry_id:
+            entries[entry_id] = block + "\n"
+    return entries
+
+
+def _entry_id(block: str) -> str | None:
+    """Return the id from the ENTRY line of a flat-file block."""
+    for line in block.splitlines():
+        if line.startswith("ENTRY"):
+            tokens = line.split()
+            return tokens[1] if len(tokens) > 1 else None
+    return None
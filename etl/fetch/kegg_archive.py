@@ -0,0 +1,205 @@
+"""Record/replay archive of KEGG traffic for deterministic ingestion runs."""
+
+from __future__ import annotations
+
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from etl.config import REPO_ROOT, get_settings
+
+ARCHIVE_MODE_RECORD = "record"
+ARCHIVE_MODE_REPLAY = "replay"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    entries TEXT NOT NULL,
+    body BLOB NOT NULL,
+    elapsed REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+"""
+
+
+class KeggArchiveMiss(KeyError):
+    """Raised in strict replay mode when a request is not in the archive."""
+
+
+class KeggArchive:
+    """Single-file SQLite archive of KEGG requests and responses.
+
+    In record mode every ``fetch_kegg_data`` result is written to the archive
+    together with its wall-clock latency. In replay mode responses are served
+    from the archive without touching the network, optionally with injected
+    latency and a seeded failure rate; requests missing from the archive are
+    collected in ``unmatched`` (or raise ``KeggArchiveMiss`` when strict).
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        mode: str = ARCHIVE_MODE_REPLAY,
+        *,
+        latency: float = 0.0,
+        latency_scale: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = 0,
+        strict: bool = False,
+    ) -> None:
+        if mode not in (ARCHIVE_MODE_RECORD, ARCHIVE_MODE_REPLAY):
+            raise ValueError(f"Unknown archive mode: {mode}")
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.strict = strict
+        self.unmatched: list[str] = []
+        self.recorded = 0
+        self.replayed = 0
+        self.injected_errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        if mode == ARCHIVE_MODE_REPLAY and not self.path.exists():
+            raise FileNotFoundError(f"KEGG archive not found: {self.path}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def key(endpoint: str, entries: str) -> str:
+        """Build the archive key for an endpoint and entry list."""
+        return f"{endpoint.strip('/')}/{entries.strip()}"
+
+    def record(self, endpoint: str, entries: str, body: str, *, elapsed: float = 0.0) -> None:
+        """Store one request/response pair, replacing earlier recordings."""
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO requests
+                    (key, endpoint, entries, body, elapsed, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    self.key(endpoint, entries),
+                    endpoint,
+                    entries,
+                    zlib.compress(body.encode("utf-8")),
+                    elapsed,
+                    time.time(),
+                ),
+            )
+            self.recorded += 1
+
+    def replay(self, endpoint: str, entries: str) -> str:
+        """Serve a recorded response, applying injected latency and errors."""
+        key = self.key(endpoint, entries)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, elapsed FROM requests WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.unmatched.append(key)
+            fail = row is not None and self._rng.random() < self.error_rate
+
+        if row is None:
+            if self.strict:
+                raise KeggArchiveMiss(key)
+            print(f"[KEGG REPLAY] unmatched request: {key}")
+            return ""
+
+        body, elapsed = row
+        delay = self.latency + self.latency_scale * elapsed
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            self.replayed += 1
+            if fail:
+                self.injected_errors += 1
+        if fail:
+            return ""
+        return zlib.decompress(body).decode("utf-8")
+
+    def summary(self) -> dict[str, object]:
+        """Return counters for the current run."""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "path": str(self.path),
+                "recorded": self.recorded,
+                "replayed": self.replayed,
+                "injected_errors": self.injected_errors,
+                "unmatched": list(self.unmatched),
+            }
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_active_archive: KeggArchive | None = None
+_settings_archive: KeggArchive | None = None
+_archive_lock = threading.Lock()
+
+
+def get_active_archive() -> KeggArchive | None:
+    """Return the archive in use, if any.
+
+    An archive installed with ``use_archive`` takes precedence; otherwise
+    ``KEGG_ARCHIVE_MODE``/``KEGG_ARCHIVE_PATH`` configure one process-wide.
+    """
+    global _settings_archive
+    if _active_archive is not None:
+        return _active_archive
+
+    settings = get_settings()
+    if not settings.kegg_archive_mode or not settings.kegg_archive_path:
+        return None
+    path = Path(settings.kegg_archive_path)
+    if not path.is_absolute():
+        path = REPO_ROOT / path
+
+    with _archive_lock:
+        if _settings_archive is None or _settings_archive.path != path:
+            _settings_archive = KeggArchive(path, settings.kegg_archive_mode)
+        return _settings_archive
+
+
+@contextmanager
+def use_archive(
+    path: str | Path,
+    mode: str = ARCHIVE_MODE_REPLAY,
+    **options: object,
+) -> Iterator[KeggArchive]:
+    """Route all KEGG fetches through an archive for the duration of the block.
+
+    Args:
+        path: Archive file path.
+        mode: "record" or "replay".
+        **options: Extra ``KeggArchive`` options (latency, error_rate, ...).
+
+    Yields:
+        The active archive, whose ``summary()`` reports the run's traffic.
+    """
+    global _active_archive
+    archive = KeggArchive(path, mode, **options)
+    with _archive_lock:
+        previous = _active_archive
+        _active_archive = archive
+    try:
+        yield archive
+    finally:
+        with _archive_lock:
+            _active_archive = previous
+        archive.close()
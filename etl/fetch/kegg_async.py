@@ -0,0 +1,246 @@
+"""Async, bounded-concurrency fetching for the KEGG REST API."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Sequence, TypeVar
+
+import requests
+
+from etl.fetch.kegg_api import (
+    KEGG_MAX_GET_ENTRIES,
+    chunk_entry_ids,
+    claim_entries,
+    fetch_kegg_data,
+    publish_entries,
+    read_cached_entries,
+    resolve_cache,
+    resolve_chunk,
+)
+from etl.fetch.kegg_cache import KeggCache
+from etl.fetch.kegg_control import KeggFlowControl, get_flow_control
+
+# KEGG asks API clients to stay at or below roughly three requests per second.
+KEGG_RATE_LIMIT = 3.0
+DEFAULT_CONCURRENCY = 4
+
+FetchFn = Callable[..., str]
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by concurrent fetches.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Each wait reserves one token up front and sleeps until it is due, so
+    the bucket is safe to share across event loops and threads.
+    """
+
+    def __init__(
+        self,
+        rate: float = KEGG_RATE_LIMIT,
+        capacity: float | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserve one token and return the delay in seconds before it is usable."""
+        with self._lock:
+            now = self._clock()
+            elapsed = now - self._updated
+            self._updated = now
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def wait(self) -> None:
+        """Block the calling thread until a token is available."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class AsyncKeggFetcher:
+    """Fetch many KEGG endpoints concurrently under a rate limit.
+
+    Requests run ``fetch`` (``fetch_kegg_data`` by default) in worker threads,
+    so retry and backoff behave exactly as in the synchronous client. At most
+    ``concurrency`` requests of the fetcher are in flight, across every thread
+    using it. When ``adaptive`` is set, the cap also follows the shared
+    ``KeggFlowControl`` limit, and the whole pool pauses while its circuit
+    breaker is open. Pass one ``bucket`` to
+    every fetcher of a process (or share one fetcher) so concurrent pathway
+    chains stay under a single KEGG rate limit.
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate_limit: float | None = KEGG_RATE_LIMIT,
+        session: requests.Session | None = None,
+        fetch: FetchFn | None = None,
+        cache: KeggCache | None = None,
+        use_cache: bool = True,
+        control: KeggFlowControl | None = None,
+        adaptive: bool = True,
+        bucket: TokenBucket | None = None,
+        **fetch_kwargs: Any,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        # A rate limit of None disables throttling (e.g. offline sources).
+        if bucket is None and rate_limit is not None:
+            bucket = TokenBucket(rate_limit)
+        self.bucket = bucket
+        self.session = session or requests.Session()
+        self._fetch = fetch or fetch_kegg_data
+        self.cache = resolve_cache(cache, use_cache)
+        self.control = (control or get_flow_control()) if adaptive else None
+        self._fetch_kwargs = fetch_kwargs
+        self._slots = threading.Condition()
+        self._in_flight = 0
+        if self.control is not None:
+            self._fetch_kwargs["control"] = self.control
+
+    def current_limit(self) -> int:
+        """Number of requests currently allowed in flight."""
+        if self.control is None:
+            return self.concurrency
+        return min(self.concurrency, self.control.limit)
+
+    async def fetch_many(self, calls: Sequence[tuple[str, str]]) -> list[str]:
+        """Fetch ``(endpoint, entries)`` pairs and return bodies in input order."""
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self._fetch_one, endpoint, entries) for endpoint, entries in calls)
+        )
+        return list(results)
+
+    def _fetch_one(self, endpoint: str, entries: str) -> str:
+        """Run one request in a worker thread under the fetcher's in-flight cap.
+
+        The counter lives on the fetcher, so callers sharing it from several
+        threads or event loops (e.g. concurrent pathway chains) share the cap.
+        """
+        with self._slots:
+            while True:
+                pause = self.control.pause_remaining() if self.control else 0.0
+                if pause > 0:
+                    # Circuit breaker open: hold the whole pool until it closes.
+                    self._slots.wait(timeout=pause)
+                    continue
+                if self._in_flight < self.current_limit():
+                    self._in_flight += 1
+                    break
+                self._slots.wait()
+        try:
+            if self.bucket is not None:
+                self.bucket.wait()
+            return self._fetch(endpoint, entries, session=self.session, **self._fetch_kwargs)
+        finally:
+            with self._slots:
+                self._in_flight -= 1
+                self._slots.notify_all()
+
+    def fetch_all(self, calls: Sequence[tuple[str, str]]) -> list[str]:
+        """Synchronous wrapper around ``fetch_many``."""
+        if not calls:
+            return []
+        return run_coroutine(self.fetch_many(calls))
+
+    def fetch_one(self, endpoint: str, entries: str) -> str:
+        """Fetch a single endpoint under the same rate limit and flow control."""
+        return self.fetch_all([(endpoint, entries)])[0]
+
+    async def fetch_entries_async(
+        self,
+        entry_ids: Sequence[str],
+        *,
+        batch_size: int = KEGG_MAX_GET_ENTRIES,
+        chunk_retries: int = 1,
+    ) -> dict[str, str]:
+        """Fetch entries with concurrent multi-entry ``get`` requests.
+
+        Cached entries are served without a request. Chunks that come back
+        empty are retried up to ``chunk_retries`` times; successful chunks are
+        never refetched. Entries another caller is already fetching are
+        awaited instead of requested again.
+        """
+        results = read_cached_entries(self.cache, entry_ids)
+        owned, shared = claim_entries(
+            [entry_id for entry_id in entry_ids if entry_id not in results]
+        )
+
+        try:
+            pending = chunk_entry_ids(owned, batch_size)
+            for _ in range(chunk_retries + 1):
+                texts = await self.fetch_many([("get", "+".join(chunk)) for chunk in pending])
+                failed: list[list[str]] = []
+                for chunk, text in zip(pending, texts):
+                    if not text:
+                        failed.append(chunk)
+                        continue
+                    results.update(resolve_chunk(chunk, text, self.cache))
+                pending = failed
+                if not pending:
+                    break
+        except BaseException as exc:
+            publish_entries(owned, results, error=exc)
+            raise
+        publish_entries(owned, results)
+
+        if shared:
+            texts = await asyncio.gather(
+                *(asyncio.to_thread(call.wait) for call in shared.values())
+            )
+            results.update(zip(shared, texts))
+
+        return {entry_id: results.get(entry_id, "") for entry_id in entry_ids}
+
+    def fetch_entries(
+        self,
+        entry_ids: Sequence[str],
+        *,
+        batch_size: int = KEGG_MAX_GET_ENTRIES,
+        chunk_retries: int = 1,
+    ) -> dict[str, str]:
+        """Synchronous wrapper around ``fetch_entries_async``."""
+        if not entry_ids:
+            return {}
+        return run_coroutine(
+            self.fetch_entries_async(
+                entry_ids,
+                batch_size=batch_size,
+                chunk_retries=chunk_retries,
+            )
+        )
+
+
+def run_coroutine(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion from synchronous code.
+
+    Falls back to a helper thread when called from inside a running event loop
+    (e.g. async orchestration workers), where ``asyncio.run`` is not allowed.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
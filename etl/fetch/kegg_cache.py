@@ -0,0 +1,345 @@
+"""Persistent on-disk cache for KEGG REST responses."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from etl.config import REPO_ROOT, get_settings
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_NEGATIVE_TTL_SECONDS = 24 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_RELEASE_RECHECK_SECONDS = 6 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    negative INTEGER NOT NULL DEFAULT 0,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    release TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS parsed (
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (kind, digest)
+);
+"""
+
+
+class KeggCache:
+    """Content-addressed KEGG response cache backed by SQLite.
+
+    Response bodies are zlib-compressed and stored once per SHA-256 digest;
+    the ``entries`` table maps ``endpoint/entry`` keys to digests with a
+    per-entry expiry. Known-empty or unparsable results are stored as
+    negative entries with a shorter TTL. When the total compressed size
+    exceeds ``max_bytes``, least recently used entries are evicted.
+
+    Entries are stamped with the KEGG release current when they were stored.
+    While that release has been confirmed within ``release_recheck`` seconds
+    (see ``sync_release``), positive entries from it are served past their
+    TTL; a release change invalidates the whole cache.
+
+    The ``parsed`` table memoizes parse results by the same content digest
+    and a parser version, so byte-identical entries skip parsing on later
+    runs; storing results under a new version drops every older one.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        release_recheck: float = DEFAULT_RELEASE_RECHECK_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_bytes = max_bytes
+        self.release_recheck = release_recheck
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+        if "release" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN release TEXT")
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        self._release: str | None = meta.get("release")
+        self._release_checked_at = float(meta.get("release_checked_at", 0.0))
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()[0]
+        self._parsed_versions: dict[str, int] = {}
+
+    @staticmethod
+    def key(endpoint: str, entries: str) -> str:
+        """Build the cache key for an endpoint and entry."""
+        return f"{endpoint.strip('/')}/{entries.strip()}"
+
+    @property
+    def total_bytes(self) -> int:
+        """Total compressed size of cached bodies."""
+        return self._total_bytes
+
+    @property
+    def release(self) -> str | None:
+        """KEGG release the cached entries belong to, if known."""
+        return self._release
+
+    def release_is_fresh(self) -> bool:
+        """Whether the cached release was confirmed within ``release_recheck``."""
+        return (
+            self._release is not None
+            and self._clock() - self._release_checked_at < self.release_recheck
+        )
+
+    def sync_release(self, release: str) -> bool:
+        """Record the current KEGG release, invalidating entries if it changed.
+
+        Args:
+            release: Release string reported by KEGG's ``info`` endpoint.
+
+        Returns:
+            True when cached entries were invalidated.
+        """
+        changed = release != self._release
+        now = self._clock()
+        with self._lock:
+            if changed:
+                self._conn.execute("DELETE FROM entries")
+                self._conn.execute("DELETE FROM blobs")
+                self._total_bytes = 0
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [("release", release), ("release_checked_at", repr(now))],
+            )
+            self._release = release
+            self._release_checked_at = now
+        return changed
+
+    def get(self, endpoint: str, entries: str) -> str | None:
+        """Return a cached body, "" for a negative entry, or None on a miss."""
+        key = self.key(endpoint, entries)
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT e.negative, e.expires_at, e.release, b.body
+                FROM entries e JOIN blobs b ON b.digest = e.digest
+                WHERE e.key = ?
+                """,
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            negative, expires_at, release, body = row
+            same_release = release is not None and release == self._release
+            if expires_at <= now and (negative or not same_release or not self.release_is_fresh()):
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+
+        if negative:
+            return ""
+        return zlib.decompress(body).decode("utf-8")
+
+    def set(self, endpoint: str, entries: str, body: str, *, ttl: float | None = None) -> None:
+        """Store a response body; empty bodies are cached as negative entries."""
+        negative = not body
+        if ttl is None:
+            ttl = self.negative_ttl if negative else self.ttl
+        self._store(self.key(endpoint, entries), body, negative=negative, ttl=ttl)
+
+    def mark_negative(self, endpoint: str, entries: str, *, ttl: float | None = None) -> bool:
+        """Flag a cached entry as unusable so it expires after the negative TTL.
+
+        Used for entries that were fetched but could not be parsed into
+        records; the body is kept but refetched sooner than healthy entries.
+        Entries that are not cached are left alone, so a fetch that failed
+        (and was never stored) is retried on the next run.
+
+        Returns:
+            True when a cached entry was flagged.
+        """
+        expires_at = self._clock() + (self.negative_ttl if ttl is None else ttl)
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE entries SET negative = 1, expires_at = MIN(expires_at, ?) WHERE key = ?",
+                (expires_at, self.key(endpoint, entries)),
+            ).rowcount
+        return bool(updated)
+
+    def get_parsed(self, kind: str, version: int, digests: Iterable[str]) -> dict[str, bytes]:
+        """Return memoized parse payloads (JSON bytes) by content digest.
+
+        Args:
+            kind: Parser name (e.g. "reaction").
+            version: Current parser version; other versions are misses.
+            digests: ``content_digest`` values of the raw entry texts.
+        """
+        wanted = list(dict.fromkeys(digests))
+        found: dict[str, bytes] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit.
+            for start in range(0, len(wanted), 500):
+                batch = wanted[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for digest, payload in self._conn.execute(
+                    f"SELECT digest, payload FROM parsed WHERE kind = ? AND version = ? "
+                    f"AND digest IN ({placeholders})",
+                    (kind, version, *batch),
+                ):
+                    found[digest] = zlib.decompress(payload)
+        return found
+
+    def set_parsed(self, kind: str, version: int, results: Iterable[tuple[str, Any]]) -> None:
+        """Memoize JSON-serializable parse results keyed by content digest."""
+        rows = [
+            (kind, digest, version, zlib.compress(json.dumps(result).encode("utf-8")))
+            for digest, result in results
+        ]
+        with self._lock:
+            if self._parsed_versions.get(kind) != version:
+                # A parser version bump invalidates every older result of this kind.
+                self._conn.execute(
+                    "DELETE FROM parsed WHERE kind = ? AND version != ?", (kind, version)
+                )
+                self._parsed_versions[kind] = version
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO parsed (kind, digest, version, payload) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def clear(self) -> None:
+        """Remove every cached entry, body and parse result."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM blobs")
+            self._conn.execute("DELETE FROM parsed")
+            self._total_bytes = 0
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _store(self, key: str, body: str, *, negative: bool, ttl: float) -> None:
+        raw = body.encode("utf-8")
+        digest = _digest_bytes(raw)
+        compressed = zlib.compress(raw)
+        now = self._clock()
+
+        with self._lock:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO blobs (digest, body, size) VALUES (?, ?, ?)",
+                (digest, compressed, len(compressed)),
+            ).rowcount
+            if inserted:
+                self._total_bytes += len(compressed)
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO entries
+                    (key, digest, negative, stored_at, expires_at, accessed_at, release)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, digest, int(negative), now, now + ttl, now, self._release),
+            )
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        """Drop least recently used entries until the cache fits ``max_bytes``."""
+        target = int(self.max_bytes * 0.9)
+        while self._total_bytes > target:
+            excess = self._total_bytes - target
+            victims: list[str] = []
+            freed = 0
+            for key, size in self._conn.execute(
+                """
+                SELECT e.key, b.size
+                FROM entries e JOIN blobs b ON b.digest = e.digest
+                ORDER BY e.accessed_at
+                """
+            ):
+                victims.append(key)
+                freed += size
+                if freed >= excess:
+                    break
+            if not victims:
+                break
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in victims])
+            self._conn.execute(
+                "DELETE FROM blobs WHERE digest NOT IN (SELECT digest FROM entries)"
+            )
+            self._conn.execute(
+                "DELETE FROM parsed WHERE digest NOT IN (SELECT digest FROM blobs)"
+            )
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()[0]
+
+
+def content_digest(text: str) -> str:
+    """Return the SHA-256 digest identifying a body in the cache."""
+    return _digest_bytes(text.encode("utf-8"))
+
+
+def _digest_bytes(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+_default_cache: KeggCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> KeggCache | None:
+    """Return the process-wide cache configured via ``KEGG_CACHE_PATH``.
+
+    Returns None when caching is not configured.
+    """
+    global _default_cache
+    settings = get_settings()
+    if not settings.kegg_cache_path:
+        return None
+
+    path = Path(settings.kegg_cache_path)
+    if not path.is_absolute():
+        path = REPO_ROOT / path
+
+    with _default_cache_lock:
+        if _default_cache is None or _default_cache.path != path:
+            _default_cache = KeggCache(
+                path,
+                ttl=settings.kegg_cache_ttl_hours * 3600,
+                negative_ttl=settings.kegg_cache_negative_ttl_hours * 3600,
+                max_bytes=settings.kegg_cache_max_mb * 1024 * 1024,
+            )
+        return _default_cache
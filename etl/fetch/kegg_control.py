@@ -0,0 +1,235 @@
+"""Adaptive concurrency, circuit breaking and backoff for KEGG fetching."""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+OUTCOME_OK = "ok"
+OUTCOME_THROTTLED = "throttled"
+OUTCOME_ERROR = "error"
+
+# Status codes KEGG (and its front proxies) use to push back on clients.
+THROTTLE_STATUS_CODES = frozenset({403, 429, 503})
+MAX_RETRY_AFTER_SECONDS = 120.0
+
+
+class KeggFlowControl:
+    """AIMD concurrency controller with a circuit breaker.
+
+    Successful responses grow the allowed concurrency additively (about +1
+    per ``limit`` successes); throttling responses or latency spikes halve it,
+    at most once per ``decrease_interval``. After ``failure_threshold``
+    consecutive failures, or a throttling response carrying Retry-After, the
+    breaker opens and every fetch sharing this controller pauses until it
+    cools down. The first request after the pause probes upstream health: one
+    more failure reopens the breaker immediately.
+
+    Every KEGG request holds a ``slot`` while it is in flight, so the limit
+    bounds all concurrent callers sharing this controller, synchronous or
+    async, rather than each batch of requests separately.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        latency_factor: float = 3.0,
+        decrease_interval: float = 1.0,
+        failure_threshold: int = 5,
+        cooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_factor = latency_factor
+        self.decrease_interval = decrease_interval
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._slots = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._limit = float(initial_limit)
+        self._latency_baseline: float | None = None
+        self._last_decrease = float("-inf")
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self.breaker_trips = 0
+
+    @property
+    def limit(self) -> int:
+        """Currently allowed number of in-flight requests."""
+        with self._lock:
+            return max(self.min_limit, int(self._limit))
+
+    def pause_remaining(self) -> float:
+        """Seconds until the breaker closes (0 when requests may proceed)."""
+        with self._lock:
+            return max(0.0, self._open_until - self._clock())
+
+    def wait_until_closed(self) -> None:
+        """Block the calling thread while the breaker is open."""
+        remaining = self.pause_remaining()
+        while remaining > 0:
+            time.sleep(remaining)
+            remaining = self.pause_remaining()
+
+    def acquire(self) -> None:
+        """Block until the breaker is closed and an in-flight slot is free."""
+        while True:
+            self.wait_until_closed()
+            with self._slots:
+                if self._open_until > self._clock():
+                    # The breaker reopened while this caller was waiting.
+                    continue
+                if self._in_flight < max(self.min_limit, int(self._limit)):
+                    self._in_flight += 1
+                    return
+                self._slots.wait()
+
+    def release(self) -> None:
+        """Return a slot taken by ``acquire``."""
+        with self._slots:
+            self._in_flight -= 1
+            self._slots.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one in-flight slot for the duration of a request."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record(
+        self,
+        outcome: str,
+        *,
+        latency: float | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        """Feed one request outcome into the controller.
+
+        Args:
+            outcome: "ok", "throttled" or "error".
+            latency: Request latency in seconds, when known.
+            retry_after: Server-requested pause in seconds, when given.
+        """
+        with self._lock:
+            now = self._clock()
+            if outcome == OUTCOME_OK:
+                self._consecutive_failures = 0
+                if latency is not None and self._is_latency_spike(latency):
+                    self._decrease(now)
+                else:
+                    self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+                    # A larger limit may admit callers waiting for a slot.
+                    self._slots.notify_all()
+                if latency is not None:
+                    self._update_baseline(latency)
+                return
+
+            self._consecutive_failures += 1
+            if outcome == OUTCOME_THROTTLED:
+                self._decrease(now)
+                if retry_after is not None:
+                    self._open(now, min(retry_after, MAX_RETRY_AFTER_SECONDS))
+            if self._consecutive_failures >= self.failure_threshold:
+                self._open(now, self.cooldown)
+
+    def snapshot(self) -> dict[str, float | int]:
+        """Return the controller state for logging and metrics."""
+        with self._lock:
+            return {
+                "limit": max(self.min_limit, int(self._limit)),
+                "in_flight": self._in_flight,
+                "consecutive_failures": self._consecutive_failures,
+                "breaker_open_seconds": max(0.0, self._open_until - self._clock()),
+                "breaker_trips": self.breaker_trips,
+            }
+
+    def _is_latency_spike(self, latency: float) -> bool:
+        baseline = self._latency_baseline
+        return baseline is not None and latency > baseline * self.latency_factor
+
+    def _update_baseline(self, latency: float) -> None:
+        """Track a slow-moving EWMA of healthy request latency."""
+        if self._latency_baseline is None:
+            self._latency_baseline = latency
+        else:
+            self._latency_baseline = 0.9 * self._latency_baseline + 0.1 * latency
+
+    def _decrease(self, now: float) -> None:
+        if now - self._last_decrease < self.decrease_interval:
+            return
+        self._limit = max(float(self.min_limit), self._limit / 2)
+        self._last_decrease = now
+
+    def _open(self, now: float, duration: float) -> None:
+        if duration <= 0:
+            return
+        until = now + duration
+        if until > self._open_until:
+            if self._open_until <= now:
+                self.breaker_trips += 1
+                logger.warning("KEGG circuit breaker open; pausing fetches for %.1fs", duration)
+            self._open_until = until
+
+
+def retry_delay(attempt: int, backoff: float, retry_after: float | None = None) -> float:
+    """Return the sleep before retry ``attempt``.
+
+    Honors a server Retry-After value; otherwise applies +/-50% jitter to the
+    linear ``backoff * attempt`` schedule so concurrent workers do not retry
+    in lockstep.
+    """
+    if retry_after is not None:
+        return min(retry_after, MAX_RETRY_AFTER_SECONDS)
+    base = backoff * attempt
+    return random.uniform(0.5 * base, 1.5 * base)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def classify_status(status_code: int) -> str:
+    """Map an HTTP status code to a flow-control outcome."""
+    if status_code in THROTTLE_STATUS_CODES:
+        return OUTCOME_THROTTLED
+    if status_code >= 500:
+        return OUTCOME_ERROR
+    return OUTCOME_OK
+
+
+_default_control = KeggFlowControl()
+
+
+def get_flow_control() -> KeggFlowControl:
+    """Return the process-wide controller shared by all KEGG fetches."""
+    return _default_control
@@ -0,0 +1,179 @@
+"""Offline KEGG flat-file dump source backed by memory-mapped files."""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Iterator
+
+from etl.normalize.kegg_membership import MembershipIndex
+from etl.normalize.kegg_reactions import extract_reaction_links
+
+_TERMINATOR = b"\n///"
+_ORG_PATHWAY = re.compile(r"^[a-z]{2,4}\d{5}$")
+
+
+def iter_flatfile_entries(path: str | Path) -> Iterator[tuple[str, str]]:
+    """Stream ``(entry_id, text)`` records from a KEGG flat file.
+
+    The file is memory-mapped and split on ``///`` terminators, so only one
+    record is decoded at a time regardless of file size.
+
+    Args:
+        path: Path to a KEGG flat file (e.g., the ``reaction`` database).
+
+    Yields:
+        ENTRY id and the record text (without the terminator line).
+    """
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start, end in _scan_records(mm):
+                text = mm[start:end].decode("utf-8", errors="replace") + "\n"
+                entry_id = _entry_id(text)
+                if entry_id:
+                    yield entry_id, text
+
+
+class FlatFileDump:
+    """Random-access view over a directory of KEGG flat files.
+
+    Record offsets are indexed lazily on first lookup; record bodies stay in
+    the memory-mapped files until requested. ``fetch`` mirrors the
+    ``fetch_kegg_data`` signature so the dump can stand in for the REST API
+    in ``ingest_pathway`` and compound enrichment.
+    """
+
+    def __init__(self, dump_dir: str | Path) -> None:
+        self.dump_dir = Path(dump_dir)
+        if not self.dump_dir.is_dir():
+            raise FileNotFoundError(f"KEGG dump directory not found: {self.dump_dir}")
+        self._files = sorted(
+            path
+            for path in self.dump_dir.iterdir()
+            if path.is_file() and not path.name.startswith(".")
+        )
+        self._maps: dict[Path, mmap.mmap] = {}
+        self._handles: list = []
+        self._offsets: dict[str, tuple[Path, int, int]] | None = None
+
+    def __enter__(self) -> FlatFileDump:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release memory maps and file handles."""
+        for mm in self._maps.values():
+            mm.close()
+        for handle in self._handles:
+            handle.close()
+        self._maps.clear()
+        self._handles.clear()
+        self._offsets = None
+
+    def database_path(self, database: str) -> Path | None:
+        """Return the flat file for a database name (e.g., "reaction")."""
+        for path in self._files:
+            if path.stem == database:
+                return path
+        return None
+
+    def entry_ids(self, database: str) -> list[str]:
+        """List ENTRY ids in a database file, in file order."""
+        path = self.database_path(database)
+        if path is None:
+            return []
+        return [entry_id for entry_id, _text in iter_flatfile_entries(path)]
+
+    def get(self, entry_id: str) -> str:
+        """Return one record's text, or "" when it is not in the dump."""
+        offsets = self._index()
+        bare_id = entry_id.strip().split(":")[-1]
+        location = offsets.get(bare_id)
+        if location is None and _ORG_PATHWAY.match(bare_id):
+            # Dumps carry reference maps; fall back from e.g. hsa00010 to map00010.
+            location = offsets.get(f"map{bare_id[-5:]}")
+        if location is None:
+            return ""
+        path, start, end = location
+        return self._maps[path][start:end].decode("utf-8", errors="replace") + "\n"
+
+    def fetch(self, endpoint: str, entries: str, **_kwargs: object) -> str:
+        """Serve ``get`` requests ('+'-joined ids allowed) from the dump.
+
+        Other endpoints (``link``, ``list``) have no flat-file equivalent and
+        return "".
+        """
+        if endpoint != "get":
+            return ""
+        blocks = [self.get(entry_id) for entry_id in entries.split("+")]
+        return "".join(f"{block}///\n" for block in blocks if block)
+
+    def build_membership_index(self, database: str = "reaction") -> MembershipIndex:
+        """Derive pathway/module membership from reaction PATHWAY/MODULE sections.
+
+        Uses the same section extraction as ``parse_reaction_entry`` (see
+        ``extract_reaction_links``) without parsing equations.
+        """
+        index = MembershipIndex()
+        path = self.database_path(database)
+        if path is None:
+            return index
+
+        for entry_id, text in iter_flatfile_entries(path):
+            links = extract_reaction_links(text)
+            index.add_reaction(entry_id, pathways=links["pathways"], modules=links["modules"])
+        return index
+
+    def _index(self) -> dict[str, tuple[Path, int, int]]:
+        """Build the entry id -> (file, start, end) offset index once."""
+        if self._offsets is not None:
+            return self._offsets
+
+        offsets: dict[str, tuple[Path, int, int]] = {}
+        for path in self._files:
+            handle = open(path, "rb")
+            if path.stat().st_size == 0:
+                handle.close()
+                continue
+            self._handles.append(handle)
+            mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[path] = mm
+            for start, end in _scan_records(mm):
+                # The ENTRY line opens each record; avoid decoding whole bodies.
+                header = mm[start : min(end, start + 512)]
+                entry_id = _entry_id(header.decode("utf-8", errors="replace"))
+                if entry_id:
+                    offsets[entry_id] = (path, start, end)
+        self._offsets = offsets
+        return offsets
+
+
+def _scan_records(mm: mmap.mmap) -> Iterator[tuple[int, int]]:
+    """Yield ``(start, end)`` byte offsets of records terminated by ``///``."""
+    size = len(mm)
+    start = 0
+    while start < size:
+        end = mm.find(_TERMINATOR, start)
+        if end == -1:
+            end = size
+        if mm[start:end].strip():
+            yield start, end
+        next_line = mm.find(b"\n", end + 1)
+        start = size if next_line == -1 else next_line + 1
+
+
+def _entry_id(text: str) -> str | None:
+    """Return the id from a record's ENTRY line (handles "EC x.x.x.x")."""
+    for line in text.splitlines():
+        if line.startswith("ENTRY"):
+            tokens = line.split()
+            if len(tokens) > 2 and tokens[1] == "EC":
+                return tokens[2]
+            return tokens[1] if len(tokens) > 1 else None
+    return None
@@ -0,0 +1,146 @@
+"""Per-endpoint telemetry for the KEGG fetch layer."""
+
+from __future__ import annotations
+
+import bisect
+import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+# Upper bounds (seconds) of the latency histogram buckets; a final +Inf bucket
+# catches everything slower.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def endpoint_label(endpoint: str, entries: str = "") -> str:
+    """Return the metrics label for a request.
+
+    ``link`` requests are labelled by target database (e.g. "link/rn",
+    "link/reaction") because their cost differs wildly between per-pathway
+    and whole-database tables; other endpoints use their name.
+    """
+    endpoint = endpoint.strip("/")
+    if endpoint == "link" and entries:
+        return f"link/{entries.split('/', 1)[0]}"
+    return endpoint
+
+
+@dataclass
+class EndpointStats:
+    """Counters and latency histogram for one endpoint label."""
+
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    bytes: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    latency_sum: float = 0.0
+    latency_max: float = 0.0
+    latency_buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def as_dict(self) -> dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        bucket_labels = [str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes": self.bytes,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_ratio": round(self.cache_hits / lookups, 4) if lookups else None,
+            "latency_seconds": {
+                "count": self.requests,
+                "sum": round(self.latency_sum, 6),
+                "mean": round(self.latency_sum / self.requests, 6) if self.requests else None,
+                "max": round(self.latency_max, 6),
+                "buckets": dict(zip(bucket_labels, self.latency_buckets)),
+            },
+        }
+
+
+class FetchMetrics:
+    """Thread-safe registry of fetch telemetry keyed by endpoint label.
+
+    ``requests`` counts HTTP attempts (so a request retried twice counts
+    three times); ``retries`` counts the sleeps between attempts.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, EndpointStats] = {}
+
+    def record_request(
+        self,
+        label: str,
+        *,
+        latency: float,
+        size: int = 0,
+        error: bool = False,
+    ) -> None:
+        """Record one HTTP attempt with its latency and response size."""
+        with self._lock:
+            stats = self._stats(label)
+            stats.requests += 1
+            stats.bytes += size
+            stats.latency_sum += latency
+            stats.latency_max = max(stats.latency_max, latency)
+            stats.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+            if error:
+                stats.errors += 1
+
+    def record_retry(self, label: str) -> None:
+        """Record a retry sleep after a failed attempt."""
+        with self._lock:
+            self._stats(label).retries += 1
+
+    def record_cache(self, label: str, *, hit: bool) -> None:
+        """Record one response-cache lookup."""
+        with self._lock:
+            stats = self._stats(label)
+            if hit:
+                stats.cache_hits += 1
+            else:
+                stats.cache_misses += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return per-endpoint stats plus run totals as plain data."""
+        with self._lock:
+            endpoints = {label: stats.as_dict() for label, stats in sorted(self._endpoints.items())}
+        totals = {
+            key: sum(stats[key] for stats in endpoints.values())
+            for key in ("requests", "errors", "retries", "bytes", "cache_hits", "cache_misses")
+        }
+        lookups = totals["cache_hits"] + totals["cache_misses"]
+        totals["cache_hit_ratio"] = round(totals["cache_hits"] / lookups, 4) if lookups else None
+        return {"endpoints": endpoints, "totals": totals}
+
+    def reset(self) -> None:
+        """Drop all recorded stats (e.g. at the start of a run)."""
+        with self._lock:
+            self._endpoints.clear()
+
+    def write_summary(self, path: str | Path, **extra: Any) -> Path:
+        """Write the snapshot (plus ``extra`` fields) as a JSON run summary."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        summary = {**extra, **self.snapshot()}
+        target.write_text(json.dumps(summary, indent=2, sort_keys=True))
+        return target
+
+    def _stats(self, label: str) -> EndpointStats:
+        stats = self._endpoints.get(label)
+        if stats is None:
+            stats = self._endpoints[label] = EndpointStats()
+        return stats
+
+
+_default_metrics = FetchMetrics()
+
+
+def get_fetch_metrics() -> FetchMetrics:
+    """Return the process-wide fetch metrics registry."""
+    return _default_metrics
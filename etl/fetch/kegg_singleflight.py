@@ -0,0 +1,113 @@
+"""In-flight request coalescing (singleflight) for concurrent KEGG fetches."""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+
+class InFlightCall:
+    """A pending result shared by every caller of the same key."""
+
+    __slots__ = ("_event", "result", "error")
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+    def wait(self) -> Any:
+        """Block until the leader finishes, then return its result."""
+        self._event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def _finish(self, result: Any, error: BaseException | None) -> None:
+        self.result = result
+        self.error = error
+        self._event.set()
+
+
+class SingleFlight:
+    """Share one execution among concurrent callers of the same key.
+
+    The first caller for a key becomes the leader and runs the work; callers
+    arriving while it is in flight wait for and reuse its result. Results are
+    not retained after completion (that is the response cache's job).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, InFlightCall] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run ``fn`` for ``key`` unless an identical call is already in flight."""
+        owned, shared = self.claim([key])
+        if not owned:
+            return shared[key].wait()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            self.complete(key, error=exc)
+            raise
+        self.complete(key, result)
+        return result
+
+    def claim(self, keys: Iterable[str]) -> tuple[list[str], dict[str, InFlightCall]]:
+        """Claim leadership for keys that are not already in flight.
+
+        Returns:
+            Keys the caller now owns (and must ``complete``) and pending
+            calls, by key, that other callers are already running.
+        """
+        owned: list[str] = []
+        shared: dict[str, InFlightCall] = {}
+        with self._lock:
+            for key in keys:
+                if key in shared or key in owned:
+                    continue
+                call = self._calls.get(key)
+                if call is not None:
+                    shared[key] = call
+                    self._coalesced += 1
+                else:
+                    self._calls[key] = InFlightCall()
+                    owned.append(key)
+                    self._executed += 1
+        return owned, shared
+
+    def complete(self, key: str, result: Any = None, *, error: BaseException | None = None) -> None:
+        """Publish the result (or error) for an owned key and wake waiters."""
+        with self._lock:
+            call = self._calls.pop(key, None)
+        if call is not None:
+            call._finish(result, error)
+
+    def stats(self) -> dict[str, int]:
+        """Return counts of executed and coalesced (deduplicated) calls."""
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls),
+            }
+
+    def reset_stats(self) -> None:
+        """Reset counters (in-flight calls are unaffected)."""
+        with self._lock:
+            self._executed = 0
+            self._coalesced = 0
+
+
+_default_singleflight = SingleFlight()
+
+
+def get_singleflight() -> SingleFlight:
+    """Return the process-wide singleflight group used by KEGG fetches."""
+    return _default_singleflight
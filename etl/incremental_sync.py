@@ -0,0 +1,460 @@
+"""Incremental KEGG sync: diff a manifest of ingested entries against KEGG list/link tables."""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, NamedTuple, Sequence
+
+import requests
+
+from etl.config import REPO_ROOT
+from etl.enrich.compound_enrichment import (
+    ENRICH_MODE_ENTRY,
+    attach_compound_names,
+    collect_compound_ids,
+    parse_compound_list,
+    resolve_compound_names,
+)
+from etl.fetch.kegg_api import fetch_kegg_data, fetch_kegg_release
+from etl.fetch.kegg_async import DEFAULT_CONCURRENCY, KEGG_RATE_LIMIT, AsyncKeggFetcher
+from etl.fetch.kegg_cache import content_digest, get_default_cache
+from etl.models.kegg_types import RawReactionRecord
+from etl.normalize.kegg_membership import (
+    build_membership_index,
+    parse_list_table,
+    parse_pathway_modules,
+    pathway_key,
+    pathway_list_name,
+)
+from etl.normalize.kegg_pipeline import parse_reaction_texts
+from etl.normalize.kegg_registry import PathwayMembership
+
+SYNC_MANIFEST_PATH = REPO_ROOT / "data" / "sync" / "kegg_manifest.sqlite"
+
+KIND_PATHWAY = "pathway"
+KIND_REACTION = "reaction"
+KIND_COMPOUND = "compound"
+
+# Link kinds stored in the manifest: pathway -> reaction and reaction -> compound.
+_LINK_MEMBERSHIP = "membership"
+_LINK_COMPOUND = "compound"
+_ORGANISM = re.compile(r"^([a-z]+)\d{5}$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    entry_id TEXT NOT NULL,
+    list_hash TEXT,
+    content_hash TEXT,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (kind, entry_id)
+);
+CREATE TABLE IF NOT EXISTS links (
+    kind TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    PRIMARY KEY (kind, source_id, target_id)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class EntryState(NamedTuple):
+    """Hashes recorded for one ingested entry.
+
+    ``list_hash`` covers the entry's line in the ``list`` table (name, and
+    the equation for reactions); ``content_hash`` covers the full entry
+    text and is only known for entries that were fetched.
+    """
+
+    list_hash: str | None
+    content_hash: str | None
+
+
+@dataclass
+class EntityChanges:
+    """Added, updated and removed ids of one entity kind."""
+
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.updated) + len(self.removed)
+
+    def as_dict(self) -> dict[str, int]:
+        return {"added": len(self.added), "updated": len(self.updated), "removed": len(self.removed)}
+
+
+@dataclass
+class ChangeSet:
+    """Everything an incremental sync changes, ready for the loader.
+
+    ``records`` holds the added and updated reactions (without pathway
+    fields, compound names attached); ``memberships`` the full reaction
+    lists of added and updated pathways; ``compound_names`` the names of
+    added and updated compounds. ``states`` and ``reaction_compounds`` are
+    the manifest rows written by ``SyncManifest.apply`` once the change set
+    has been loaded.
+    """
+
+    release: str | None = None
+    pathways: EntityChanges = field(default_factory=EntityChanges)
+    reactions: EntityChanges = field(default_factory=EntityChanges)
+    compounds: EntityChanges = field(default_factory=EntityChanges)
+    records: list[RawReactionRecord] = field(default_factory=list)
+    memberships: list[PathwayMembership] = field(default_factory=list)
+    compound_names: dict[str, str | None] = field(default_factory=dict)
+    skipped: list[str] = field(default_factory=list)
+    states: dict[str, dict[str, EntryState]] = field(default_factory=dict)
+    reaction_compounds: dict[str, list[str]] = field(default_factory=dict)
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether the graph needs no changes."""
+        return not (len(self.pathways) or len(self.reactions) or len(self.compounds))
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "release": self.release,
+            "pathways": self.pathways.as_dict(),
+            "reactions": self.reactions.as_dict(),
+            "compounds": self.compounds.as_dict(),
+            "fetched_reactions": len(self.states.get(KIND_REACTION, {})),
+            "skipped_reactions": len(self.skipped),
+        }
+
+
+class SyncManifest:
+    """SQLite record of the ids, hashes and links of previously synced entries."""
+
+    def __init__(self, path: str | Path = SYNC_MANIFEST_PATH) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(_SCHEMA)
+
+    @property
+    def release(self) -> str | None:
+        """KEGG release of the last applied sync, if any."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'release'").fetchone()
+        return row[0] if row else None
+
+    def pathway_ids(self) -> list[str]:
+        """Return tracked pathway ids in the order they were first synced."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT entry_id FROM entries WHERE kind = ? ORDER BY rowid", (KIND_PATHWAY,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def states(self, kind: str) -> dict[str, EntryState]:
+        """Return the recorded hashes of every entry of one kind."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT entry_id, list_hash, content_hash FROM entries WHERE kind = ?", (kind,)
+            ).fetchall()
+        return {entry_id: EntryState(list_hash, content_hash) for entry_id, list_hash, content_hash in rows}
+
+    def memberships(self) -> dict[str, set[str]]:
+        """Return pathway id -> synced reaction ids."""
+        return self._links(_LINK_MEMBERSHIP)
+
+    def reaction_compounds(self) -> dict[str, set[str]]:
+        """Return reaction id -> compound ids of its equation."""
+        return self._links(_LINK_COMPOUND)
+
+    def apply(self, change_set: ChangeSet) -> None:
+        """Record a change set after it has been loaded, in one transaction."""
+        now = time.time()
+        removed = [
+            (KIND_PATHWAY, change_set.pathways.removed),
+            (KIND_REACTION, change_set.reactions.removed),
+            (KIND_COMPOUND, change_set.compounds.removed),
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for kind, states in change_set.states.items():
+                    self._conn.executemany(
+                        """
+                        INSERT INTO entries (kind, entry_id, list_hash, content_hash, synced_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (kind, entry_id) DO UPDATE SET
+                            list_hash = excluded.list_hash,
+                            content_hash = excluded.content_hash,
+                            synced_at = excluded.synced_at
+                        """,
+                        [(kind, entry_id, *state, now) for entry_id, state in states.items()],
+                    )
+                for kind, entry_ids in removed:
+                    self._conn.executemany(
+                        "DELETE FROM entries WHERE kind = ? AND entry_id = ?",
+                        [(kind, entry_id) for entry_id in entry_ids],
+                    )
+                self._replace_links(
+                    _LINK_MEMBERSHIP,
+                    {item.pathway_id: item.reaction_ids for item in change_set.memberships}
+                    | {pathway_id: [] for pathway_id in change_set.pathways.removed},
+                )
+                self._replace_links(
+                    _LINK_COMPOUND,
+                    change_set.reaction_compounds
+                    | {reaction_id: [] for reaction_id in change_set.reactions.removed},
+                )
+                if change_set.release is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('release', ?)",
+                        (change_set.release,),
+                    )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _links(self, kind: str) -> dict[str, set[str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source_id, target_id FROM links WHERE kind = ?", (kind,)
+            ).fetchall()
+        links: dict[str, set[str]] = {}
+        for source_id, target_id in rows:
+            links.setdefault(source_id, set()).add(target_id)
+        return links
+
+    def _replace_links(self, kind: str, targets: dict[str, Iterable[str]]) -> None:
+        for source_id, target_ids in targets.items():
+            self._conn.execute(
+                "DELETE FROM links WHERE kind = ? AND source_id = ?", (kind, source_id)
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO links (kind, source_id, target_id) VALUES (?, ?, ?)",
+                [(kind, source_id, target_id) for target_id in target_ids],
+            )
+
+
+def plan_sync(
+    manifest: SyncManifest,
+    pathway_ids: Sequence[str] | None = None,
+    *,
+    fetch: Callable[..., str] | None = None,
+    session: requests.Session | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate_limit: float | None = KEGG_RATE_LIMIT,
+    parse_workers: int | None = None,
+    force: bool = False,
+) -> ChangeSet:
+    """Compute the changes since the last sync without touching the manifest.
+
+    Tracked pathways are the manifest's plus ``pathway_ids``. When the KEGG
+    release is unchanged and no pathway is new, nothing else is requested.
+    Otherwise the ``list`` tables (pathways, reactions, compounds) and the
+    ``link`` tables (reaction/pathway, reaction/module, module/pathway) are
+    downloaded and diffed against the manifest. Only reactions that are new
+    or whose ``list`` line changed are fetched in full; their content hash
+    decides whether they count as updated. A pathway is updated when its
+    name or reaction set changed.
+
+    Args:
+        manifest: Manifest of the previous sync.
+        pathway_ids: Pathways to start tracking (in addition to synced ones).
+        fetch: Optional ``fetch_kegg_data``-compatible source.
+        session: Optional requests session for connection reuse.
+        concurrency: Concurrent ``get`` requests for reaction entries.
+        rate_limit: KEGG requests per second (None disables throttling).
+        parse_workers: Processes for parsing reaction entries.
+        force: Diff and refetch every tracked reaction even if the release
+            and ``list`` lines are unchanged (catches edits to sections such
+            as ``ENZYME`` that the ``list`` line does not cover).
+
+    Returns:
+        The change set; apply it with ``apply_change_set`` and then record
+        it with ``SyncManifest.apply``.
+    """
+    session = session or requests.Session()
+    use_network = fetch is None
+
+    def _table(endpoint: str, entries: str) -> list[str]:
+        if use_network:
+            # Bypass the response cache: stale list/link tables would hide changes.
+            text = fetch_kegg_data(endpoint, entries, session=session, timeout=60, use_cache=False)
+        else:
+            text = fetch(endpoint, entries, session=session)
+        lines = [line for line in text.splitlines() if line.strip()]
+        if not lines:
+            # An empty table would otherwise mark every tracked entry as removed.
+            raise RuntimeError(f"KEGG {endpoint}/{entries} returned no data; sync aborted")
+        return lines
+
+    synced_pathways = manifest.states(KIND_PATHWAY)
+    tracked = list(dict.fromkeys([*manifest.pathway_ids(), *(pathway_ids or [])]))
+    release = fetch_kegg_release(session=session, fetch=fetch)
+    change_set = ChangeSet(release=release)
+    new_pathways = [pathway_id for pathway_id in tracked if pathway_id not in synced_pathways]
+    if not force and not new_pathways and release is not None and release == manifest.release:
+        print(f"KEGG release {release} unchanged since last sync; nothing to do")
+        return change_set
+
+    cache = get_default_cache() if use_network else None
+    if cache is not None and release is not None:
+        # Drops cached entries from an older release before anything is fetched.
+        cache.sync_release(release)
+
+    listed: dict[str, str] = {}
+    for organism in sorted({_organism(pathway_id) for pathway_id in tracked}):
+        listed.update(parse_list_table(_table("list", "pathway" if organism == "map" else f"pathway/{organism}")))
+    index = build_membership_index(
+        "\n".join(_table("link", "reaction/pathway")),
+        "\n".join(_table("link", "reaction/module")),
+    )
+    pathway_modules = parse_pathway_modules(_table("link", "module/pathway"))
+
+    members: dict[str, set[str]] = {}
+    for pathway_id in tracked:
+        if pathway_id not in listed:
+            if pathway_id in synced_pathways:
+                change_set.pathways.removed.append(pathway_id)
+            else:
+                print(f"Pathway {pathway_id} is not listed by KEGG; skipped")
+            continue
+        members[pathway_id] = index.reactions_for_pathway(pathway_id) | index.reactions_for_modules(
+            pathway_modules.get(pathway_key(pathway_id) or "", ())
+        )
+
+    # Reactions KEGG no longer lists are obsolete, even if still linked.
+    reaction_lines = parse_list_table(_table("list", "reaction"))
+    scope = set().union(*members.values()) & reaction_lines.keys()
+    synced_reactions = manifest.states(KIND_REACTION)
+    candidates = sorted(
+        reaction_id
+        for reaction_id in scope
+        if force
+        or reaction_id not in synced_reactions
+        or synced_reactions[reaction_id].list_hash != content_digest(reaction_lines[reaction_id])
+    )
+    print(
+        f"Reactions in scope: {len(scope)}; fetching {len(candidates)} new or changed "
+        f"(of {len(synced_reactions)} synced)"
+    )
+
+    fetcher = AsyncKeggFetcher(
+        concurrency=concurrency,
+        rate_limit=rate_limit,
+        session=session,
+        fetch=fetch,
+        use_cache=use_network,
+        adaptive=use_network,
+    )
+    texts = fetcher.fetch_entries(candidates)
+    parsed, skipped = parse_reaction_texts(texts, cache=fetcher.cache, parse_workers=parse_workers)
+    change_set.skipped = sorted(skipped)
+
+    reaction_states: dict[str, EntryState] = {}
+    for reaction_id, fields in parsed.items():
+        state = EntryState(content_digest(reaction_lines[reaction_id]), content_digest(texts[reaction_id]))
+        reaction_states[reaction_id] = state
+        previous = synced_reactions.get(reaction_id)
+        if previous is None:
+            change_set.reactions.added.append(reaction_id)
+        elif previous.content_hash != state.content_hash:
+            change_set.reactions.updated.append(reaction_id)
+        else:
+            continue
+        change_set.records.append(
+            {"reaction_id": reaction_id, "pathway_id": None, "pathway_name": None, **fields}
+        )
+    change_set.reactions.removed = sorted(synced_reactions.keys() - scope)
+    change_set.states[KIND_REACTION] = reaction_states
+    change_set.reaction_compounds = {
+        reaction_id: sorted(collect_compound_ids([fields])) for reaction_id, fields in parsed.items()
+    }
+
+    # Unfetched (or unparsable) new reactions stay out until a later sync picks them up.
+    synced = (synced_reactions.keys() - set(change_set.reactions.removed)) | parsed.keys()
+    old_members = manifest.memberships()
+    pathway_states: dict[str, EntryState] = {}
+    for pathway_id, reaction_ids in members.items():
+        reaction_ids = reaction_ids & synced
+        state = EntryState(content_digest(listed[pathway_id]), None)
+        previous = synced_pathways.get(pathway_id)
+        if previous is None:
+            change_set.pathways.added.append(pathway_id)
+        elif previous != state or reaction_ids != old_members.get(pathway_id, set()):
+            change_set.pathways.updated.append(pathway_id)
+        else:
+            continue
+        pathway_states[pathway_id] = state
+        change_set.memberships.append(
+            PathwayMembership(
+                pathway_id, pathway_list_name(pathway_id, listed[pathway_id]), sorted(reaction_ids)
+            )
+        )
+    change_set.states[KIND_PATHWAY] = pathway_states
+
+    _plan_compounds(change_set, manifest, synced, _table("list", "compound"), fetch=fetch, session=session)
+    print(f"Sync change set: {change_set.summary()}")
+    return change_set
+
+
+def _plan_compounds(
+    change_set: ChangeSet,
+    manifest: SyncManifest,
+    synced_reactions: set[str],
+    compound_lines: list[str],
+    *,
+    fetch: Callable[..., str] | None,
+    session: requests.Session,
+) -> None:
+    """Diff compounds referenced by synced reactions and attach their names."""
+    reaction_compounds = manifest.reaction_compounds()
+    reaction_compounds.update({rid: set(cids) for rid, cids in change_set.reaction_compounds.items()})
+    scope: set[str] = set()
+    for reaction_id in synced_reactions:
+        scope.update(reaction_compounds.get(reaction_id, ()))
+
+    listed = parse_list_table(compound_lines)
+    synced_compounds = manifest.states(KIND_COMPOUND)
+    compound_states: dict[str, EntryState] = {}
+    for compound_id in sorted(scope):
+        # Compounds missing from list/compound (e.g. glycans) have no list hash.
+        state = EntryState(content_digest(listed[compound_id]) if compound_id in listed else None, None)
+        previous = synced_compounds.get(compound_id)
+        if previous is None:
+            change_set.compounds.added.append(compound_id)
+        elif previous != state:
+            change_set.compounds.updated.append(compound_id)
+        else:
+            continue
+        compound_states[compound_id] = state
+    change_set.compounds.removed = sorted(synced_compounds.keys() - scope)
+    change_set.states[KIND_COMPOUND] = compound_states
+
+    needed = set(compound_states) | collect_compound_ids(change_set.records)
+    names = {cid: name for cid, name in parse_compound_list(compound_lines).items() if cid in needed}
+    missing = needed - names.keys()
+    if missing:
+        names.update(
+            resolve_compound_names(missing, mode=ENRICH_MODE_ENTRY, fetch=fetch, session=session)
+        )
+    change_set.compound_names = {compound_id: names.get(compound_id) for compound_id in compound_states}
+    attach_compound_names(change_set.records, names)
+
+
+def _organism(pathway_id: str) -> str:
+    """Return the id prefix selecting the ``list/pathway`` table ("map" for reference maps)."""
+    match = _ORGANISM.match(pathway_id.strip().split(":")[-1])
+    return match.group(1) if match else "map"
@@ -5,7 +5,13 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
-from etl.normalize.kegg_pipeline import ingest_pathway
+from etl.fetch.kegg_async import DEFAULT_CONCURRENCY
+from etl.fetch.kegg_flatfile import FlatFileDump
+from etl.fetch.kegg_metrics import get_fetch_metrics
+from etl.models.reaction_table import ReactionTable
+from etl.normalize.kegg_membership import load_membership_index
+from etl.normalize.kegg_organism import ingest_organism
+from etl.normalize.kegg_pipeline import ingest_pathway, ingest_pathways_from_dump
 
 
 def _parse_args() -> argparse.Namespace:
@@ -20,7 +26,13 @@ def _parse_args() -> argparse.Namespace:
         "pathway_id",
         nargs="?",
         default="hsa00010",
-        help="KEGG pathway id (default: hsa00010)",
+        help="KEGG pathway id (default: hsa00010), or 'organism' to ingest a whole organism",
+    )
+    parser.add_argument(
+        "organism",
+        nargs="?",
+        default=None,
+        help="KEGG organism code for 'organism' mode (e.g. hsa)",
     )
     parser.add_argument(
         "--output",
@@ -28,7 +40,52 @@ def _parse_args() -> argparse.Namespace:
         default=None,
         help="Optional output JSON path",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum in-flight KEGG requests (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--link-tables",
+        action="store_true",
+        help="Resolve reaction membership from bulk KEGG link tables",
+    )
+    parser.add_argument(
+        "--dump-dir",
+        type=Path,
+        default=None,
+        help="Ingest offline from a directory of KEGG flat files",
+    )
+    parser.add_argument(
+        "--all-pathways",
+        action="store_true",
+        help="With --dump-dir, ingest every pathway in the dump",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Processes for parsing reaction entries (default: KEGG_PARSE_WORKERS)",
+    )
+    parser.add_argument(
+        "--metrics-output",
+        type=Path,
+        default=None,
+        help="Optional JSON path for the KEGG fetch telemetry summary",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        type=Path,
+        default=None,
+        help="Optional directory for a Parquet snapshot of the normalized reactions",
+    )
+    args = parser.parse_args()
+    if args.pathway_id == "organism" and not args.organism:
+        parser.error("organism mode needs an organism code, e.g. 'organism hsa'")
+    if args.organism and args.pathway_id != "organism":
+        parser.error("an organism code is only accepted in 'organism' mode")
+    return args
 
 
 def main() -> int:
@@ -39,8 +96,45 @@ def main() -> int:
     """
     # Run ingestion with the requested pathway id.
     args = _parse_args()
+    metrics_label = args.pathway_id
+
+    if args.pathway_id == "organism":
+        metrics_label = f"organism:{args.organism}"
+        result = ingest_organism(
+            args.organism,
+            concurrency=args.concurrency,
+            parse_workers=args.parse_workers,
+        )
+        reactions = result.pathway_records()
+    elif args.dump_dir:
+        pathway_ids = None if args.all_pathways else [args.pathway_id]
+        reactions = []
+        with FlatFileDump(args.dump_dir) as dump:
+            for _pathway_id, records in ingest_pathways_from_dump(
+                dump,
+                pathway_ids,
+                concurrency=args.concurrency,
+                parse_workers=args.parse_workers,
+            ):
+                reactions.extend(records)
+    else:
+        membership = load_membership_index() if args.link_tables else None
+        reactions = ingest_pathway(
+            args.pathway_id,
+            concurrency=args.concurrency,
+            membership=membership,
+            parse_workers=args.parse_workers,
+        )
+
+    if args.metrics_output:
+        get_fetch_metrics().write_summary(args.metrics_output, pathway_id=metrics_label)
+        print(f"Wrote KEGG fetch metrics to {args.metrics_output}")
+
+    if args.snapshot_dir:
+        from etl.load.parquet_snapshot import write_snapshot
 
-    reactions = ingest_pathway(args.pathway_id)
+        snapshot_path = write_snapshot(ReactionTable.from_records(reactions), args.snapshot_dir)
+        print(f"Wrote KEGG snapshot to {snapshot_path}")
 
     # Persist results when an output path is provided.
     if args.output:
@@ -5,25 +5,34 @@ Loads parsed KEGG reactions into a metabolic graph.
 Graph model:
 
 (:Pathway {id, name})
-(:Reaction {id, reversible, name, definition})
+(:Reaction {id, reversible, name, definition, rclasses})
 (:Compound {id, name})
 (:Enzyme {ec})
+(:Ortholog {id})
 
 (:Pathway)-[:HAS_REACTION]->(:Reaction)
-(:Compound)-[:CONSUMED_BY {coef}]->(:Reaction)
-(:Reaction)-[:PRODUCES {coef}]->(:Compound)
+(:Compound)-[:CONSUMED_BY {coef, coef_symbol}]->(:Reaction)
+(:Reaction)-[:PRODUCES {coef, coef_symbol}]->(:Compound)
 (:Reaction)-[:CATALYZED_BY]->(:Enzyme)
+(:Reaction)-[:HAS_ORTHOLOG]->(:Ortholog)
 """
 
 from __future__ import annotations
 
-from typing import Iterable
+from typing import TYPE_CHECKING, Any, Iterable
 
 from neo4j import GraphDatabase
 
 from etl.models.kegg_types import RawReactionRecord
+from etl.models.reaction_table import ROLE_SUBSTRATE, ReactionTable
 from etl.config import get_settings
 
+if TYPE_CHECKING:
+    from etl.incremental_sync import ChangeSet
+
+# Rows per UNWIND transaction when loading a ReactionTable.
+TABLE_BATCH_SIZE = 500
+
 
 # ---------------------------------------------------------------------
 # Driver
@@ -62,6 +71,329 @@ def load_reactions(driver, reactions: Iterable[RawReactionRecord]) -> None:
             session.execute_write(_load_single_reaction, reaction)
 
 
+def load_pathway_memberships(
+    driver,
+    memberships: Iterable[tuple[str, str | None, Iterable[str]]],
+) -> None:
+    """Attach ``HAS_REACTION`` edges for already-loaded reactions.
+
+    Args:
+        driver: Neo4j driver.
+        memberships: ``(pathway_id, pathway_name, reaction_ids)`` triples;
+            each pathway is written with one UNWIND query.
+    """
+    with driver.session() as session:
+        for pathway_id, pathway_name, reaction_ids in memberships:
+            session.execute_write(
+                _load_pathway_membership, pathway_id, pathway_name, list(reaction_ids)
+            )
+
+
+def apply_change_set(driver, change_set: ChangeSet) -> None:
+    """Apply an incremental sync change set.
+
+    Removed pathways are deleted; updated reactions lose their compound,
+    enzyme and ortholog edges before being reloaded, so edges KEGG dropped do
+    not linger. Added and updated pathways get exactly their listed
+    ``HAS_REACTION`` edges and updated compounds their new names. Removed
+    reactions are deleted only once no pathway (including pathways outside
+    the synced scope) still has them, and removed compounds once nothing
+    references them.
+    """
+    with driver.session() as session:
+        if change_set.pathways.removed:
+            session.execute_write(_delete_pathways, change_set.pathways.removed)
+        if change_set.reactions.updated:
+            session.execute_write(_clear_reaction_edges, change_set.reactions.updated)
+
+    load_reactions(driver, change_set.records)
+
+    with driver.session() as session:
+        for item in change_set.memberships:
+            session.execute_write(
+                _replace_pathway_membership, item.pathway_id, item.name, item.reaction_ids
+            )
+        if change_set.reactions.removed:
+            session.execute_write(_delete_orphan_reactions, change_set.reactions.removed)
+        if change_set.compound_names:
+            session.execute_write(
+                _set_compound_names,
+                [{"id": cid, "name": name} for cid, name in change_set.compound_names.items()],
+            )
+        if change_set.compounds.removed:
+            session.execute_write(_delete_orphan_compounds, change_set.compounds.removed)
+
+
+def load_reaction_table(
+    driver,
+    table: ReactionTable,
+    *,
+    reaction_ids: Iterable[str] | None = None,
+    batch_size: int = TABLE_BATCH_SIZE,
+) -> None:
+    """Load a columnar reaction table with batched UNWIND writes.
+
+    Rows are built straight from the table's columns and edge arrays, so no
+    per-reaction record dicts are materialized; each node and edge kind is
+    written ``batch_size`` rows per transaction. The graph matches what
+    ``load_reactions`` writes for the same reactions.
+
+    Args:
+        driver: Neo4j driver.
+        table: Normalized (and optionally enriched) reactions.
+        reaction_ids: Restrict the load to these reactions (default: all).
+        batch_size: Rows per UNWIND transaction.
+    """
+    rows = _table_rows(table, table.reaction_indices(reaction_ids))
+    with driver.session() as session:
+        for kind, query in _TABLE_QUERIES:
+            kind_rows = rows[kind]
+            for start in range(0, len(kind_rows), batch_size):
+                session.execute_write(_write_rows, query, kind_rows[start : start + batch_size])
+
+
+# ---------------------------------------------------------------------
+# Columnar table loader
+# ---------------------------------------------------------------------
+# Written in this order so every edge query finds both of its endpoints.
+_TABLE_QUERIES = (
+    (
+        "pathways",
+        """
+        UNWIND $rows AS row
+        MERGE (p:Pathway {id: row.id})
+        SET p.name = coalesce(row.name, p.name)
+        """,
+    ),
+    (
+        "reactions",
+        """
+        UNWIND $rows AS row
+        MERGE (r:Reaction {id: row.id})
+        SET r.reversible = row.reversible,
+            r.name = coalesce(row.name, r.name),
+            r.definition = coalesce(row.definition, r.definition),
+            r.rclasses = coalesce(row.rclasses, r.rclasses)
+        """,
+    ),
+    (
+        "has_reaction",
+        """
+        UNWIND $rows AS row
+        MATCH (p:Pathway {id: row.pid})
+        MATCH (r:Reaction {id: row.rid})
+        MERGE (p)-[:HAS_REACTION]->(r)
+        """,
+    ),
+    (
+        "compounds",
+        """
+        UNWIND $rows AS row
+        MERGE (c:Compound {id: row.id})
+        SET c.name = coalesce(row.name, c.name)
+        """,
+    ),
+    (
+        "consumed_by",
+        """
+        UNWIND $rows AS row
+        MATCH (c:Compound {id: row.cid})
+        MATCH (r:Reaction {id: row.rid})
+        MERGE (c)-[rel:CONSUMED_BY]->(r)
+        SET rel.coef = row.coef, rel.coef_symbol = row.coef_symbol
+        """,
+    ),
+    (
+        "produces",
+        """
+        UNWIND $rows AS row
+        MATCH (c:Compound {id: row.cid})
+        MATCH (r:Reaction {id: row.rid})
+        MERGE (r)-[rel:PRODUCES]->(c)
+        SET rel.coef = row.coef, rel.coef_symbol = row.coef_symbol
+        """,
+    ),
+    (
+        "catalyzed_by",
+        """
+        UNWIND $rows AS row
+        MERGE (e:Enzyme {ec: row.ec})
+        WITH e, row
+        MATCH (r:Reaction {id: row.rid})
+        MERGE (r)-[:CATALYZED_BY]->(e)
+        """,
+    ),
+    (
+        "has_ortholog",
+        """
+        UNWIND $rows AS row
+        MERGE (k:Ortholog {id: row.kid})
+        WITH k, row
+        MATCH (r:Reaction {id: row.rid})
+        MERGE (r)-[:HAS_ORTHOLOG]->(k)
+        """,
+    ),
+)
+
+
+def _write_rows(tx, query: str, rows: list[dict[str, Any]]) -> None:
+    tx.run(query, rows=rows)
+
+
+def _table_rows(table: ReactionTable, indices: list[int]) -> dict[str, list[dict[str, Any]]]:
+    """Build the UNWIND rows for the selected reaction rows of a table."""
+    rows: dict[str, list[dict[str, Any]]] = {kind: [] for kind, _ in _TABLE_QUERIES}
+    selected = set(indices)
+    pathways: set[int] = set()
+    compounds: set[int] = set()
+
+    for idx in indices:
+        reaction_id = table.reaction_ids[idx]
+        links = table.reaction_links[idx]
+        rows["reactions"].append(
+            {
+                "id": reaction_id,
+                "reversible": bool(table.reversible[idx]),
+                "name": table.names[idx],
+                "definition": table.definitions[idx],
+                "rclasses": links["rclasses"] if links is not None else None,
+            }
+        )
+        pathway_idx = table.reaction_pathway[idx]
+        if pathway_idx >= 0:
+            pathways.add(pathway_idx)
+            rows["has_reaction"].append({"pid": table.pathway_ids[pathway_idx], "rid": reaction_id})
+        if links is not None:
+            rows["has_ortholog"].extend({"kid": kid, "rid": reaction_id} for kid in links["orthologs"])
+
+    for edge, reaction_idx in enumerate(table.edge_reaction):
+        if reaction_idx not in selected:
+            continue
+        compound_idx = table.edge_compound[edge]
+        compounds.add(compound_idx)
+        kind = "consumed_by" if table.edge_role[edge] == ROLE_SUBSTRATE else "produces"
+        rows[kind].append(
+            {
+                "cid": table.compound_ids[compound_idx],
+                "rid": table.reaction_ids[reaction_idx],
+                "coef": table.coefficient(edge),
+                "coef_symbol": table.edge_coef_symbol.get(edge),
+            }
+        )
+
+    for reaction_idx, enzyme_idx in zip(table.enzyme_edge_reaction, table.enzyme_edge_enzyme):
+        if reaction_idx in selected:
+            rows["catalyzed_by"].append(
+                {"ec": table.enzyme_ids[enzyme_idx], "rid": table.reaction_ids[reaction_idx]}
+            )
+
+    rows["pathways"] = [
+        {"id": table.pathway_ids[idx], "name": table.pathway_names[idx]} for idx in sorted(pathways)
+    ]
+    rows["compounds"] = [
+        {"id": table.compound_ids[idx], "name": table.compound_names[idx]} for idx in sorted(compounds)
+    ]
+    return rows
+
+
+# ---------------------------------------------------------------------
+# Pathway membership loader
+# ---------------------------------------------------------------------
+def _load_pathway_membership(
+    tx, pathway_id: str, pathway_name: str | None, reaction_ids: list[str]
+) -> None:
+    """Merge one pathway and its edges to existing reactions."""
+    tx.run(
+        """
+        MERGE (p:Pathway {id: $pid})
+        SET p.name = coalesce($pname, p.name)
+        WITH p
+        UNWIND $rids AS rid
+        MATCH (r:Reaction {id: rid})
+        MERGE (p)-[:HAS_REACTION]->(r)
+        """,
+        pid=pathway_id,
+        pname=pathway_name,
+        rids=reaction_ids,
+    )
+
+
+def _replace_pathway_membership(
+    tx, pathway_id: str, pathway_name: str | None, reaction_ids: list[str]
+) -> None:
+    """Drop ``HAS_REACTION`` edges not in ``reaction_ids``, then merge the rest."""
+    tx.run(
+        """
+        MATCH (p:Pathway {id: $pid})-[edge:HAS_REACTION]->(r:Reaction)
+        WHERE NOT r.id IN $rids
+        DELETE edge
+        """,
+        pid=pathway_id,
+        rids=reaction_ids,
+    )
+    _load_pathway_membership(tx, pathway_id, pathway_name, reaction_ids)
+
+
+# ---------------------------------------------------------------------
+# Incremental sync helpers
+# ---------------------------------------------------------------------
+def _delete_pathways(tx, pathway_ids: list[str]) -> None:
+    tx.run("MATCH (p:Pathway) WHERE p.id IN $ids DETACH DELETE p", ids=pathway_ids)
+
+
+def _delete_orphan_reactions(tx, reaction_ids: list[str]) -> None:
+    tx.run(
+        """
+        MATCH (r:Reaction)
+        WHERE r.id IN $ids AND NOT (:Pathway)-[:HAS_REACTION]->(r)
+        DETACH DELETE r
+        """,
+        ids=reaction_ids,
+    )
+
+
+def _clear_reaction_edges(tx, reaction_ids: list[str]) -> None:
+    """Remove the edges ``_load_single_reaction`` recreates from the entry."""
+    tx.run(
+        """
+        MATCH (r:Reaction)-[edge:PRODUCES|CATALYZED_BY|HAS_ORTHOLOG]->()
+        WHERE r.id IN $ids
+        DELETE edge
+        """,
+        ids=reaction_ids,
+    )
+    tx.run(
+        """
+        MATCH (:Compound)-[edge:CONSUMED_BY]->(r:Reaction)
+        WHERE r.id IN $ids
+        DELETE edge
+        """,
+        ids=reaction_ids,
+    )
+
+
+def _set_compound_names(tx, rows: list[dict[str, str | None]]) -> None:
+    tx.run(
+        """
+        UNWIND $rows AS row
+        MATCH (c:Compound {id: row.id})
+        SET c.name = coalesce(row.name, c.name)
+        """,
+        rows=rows,
+    )
+
+
+def _delete_orphan_compounds(tx, compound_ids: list[str]) -> None:
+    tx.run(
+        """
+        MATCH (c:Compound)
+        WHERE c.id IN $ids AND NOT (c)--()
+        DELETE c
+        """,
+        ids=compound_ids,
+    )
+
+
 # ---------------------------------------------------------------------
 # Reaction loader
 # ---------------------------------------------------------------------
@@ -75,6 +407,7 @@ def _load_single_reaction(tx, reaction: RawReactionRecord) -> None:
     reversible = reaction.get("reversible", True)
     name = reaction.get("name")
     definition = reaction.get("definition")
+    rclasses = reaction.get("rclasses")
 
     # --------------------------
     # Pathway
@@ -97,12 +430,14 @@ def _load_single_reaction(tx, reaction: RawReactionRecord) -> None:
         MERGE (r:Reaction {id: $rid})
         SET r.reversible = $reversible,
             r.name = coalesce($name, r.name),
-            r.definition = coalesce($definition, r.definition)
+            r.definition = coalesce($definition, r.definition),
+            r.rclasses = coalesce($rclasses, r.rclasses)
         """,
         rid=reaction_id,
         reversible=reversible,
         name=name,
         definition=definition,
+        rclasses=rclasses,
     )
 
     # --------------------------
@@ -130,12 +465,13 @@ def _load_single_reaction(tx, reaction: RawReactionRecord) -> None:
             WITH c
             MATCH (r:Reaction {id: $rid})
             MERGE (c)-[rel:CONSUMED_BY]->(r)
-            SET rel.coef = $coef
+            SET rel.coef = $coef, rel.coef_symbol = $coef_symbol
             """,
             cid=compound["id"],
             name=compound.get("name"),
             rid=reaction_id,
             coef=compound.get("coef", 1),
+            coef_symbol=compound.get("coef_symbol"),
         )
 
     # --------------------------
@@ -149,12 +485,13 @@ def _load_single_reaction(tx, reaction: RawReactionRecord) -> None:
             WITH c
             MATCH (r:Reaction {id: $rid})
             MERGE (r)-[rel:PRODUCES]->(c)
-            SET rel.coef = $coef
+            SET rel.coef = $coef, rel.coef_symbol = $coef_symbol
             """,
             cid=compound["id"],
             name=compound.get("name"),
             rid=reaction_id,
             coef=compound.get("coef", 1),
+            coef_symbol=compound.get("coef_symbol"),
         )
 
     # --------------------------
@@ -171,3 +508,18 @@ def _load_single_reaction(tx, reaction: RawReactionRecord) -> None:
             ec=enzyme_id,
             rid=reaction_id,
         )
+
+    # --------------------------
+    # KEGG orthology
+    # --------------------------
+    for ortholog_id in reaction.get("orthologs", []):
+        tx.run(
+            """
+            MERGE (k:Ortholog {id: $kid})
+            WITH k
+            MATCH (r:Reaction {id: $rid})
+            MERGE (r)-[:HAS_ORTHOLOG]->(k)
+            """,
+            kid=ortholog_id,
+            rid=reaction_id,
+        )
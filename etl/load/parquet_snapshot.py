@@ -0,0 +1,276 @@
+"""Parquet snapshots of normalized KEGG data.
+
+A snapshot is a directory of Parquet tables written from a ``ReactionTable``:
+
+    reactions/       reaction_id, equation, name, definition, reversible,
+                     pathways, modules, orthologs, rclasses (id lists)
+    compounds/       compound_id, name
+    pathways/        pathway_id, name
+    stoichiometry/   reaction_id, compound_id, role, coef, coef_symbol
+    enzymes/         reaction_id, enzyme_id
+    membership/      pathway_id=<id>/ partitions of reaction_id
+    manifest.json    snapshot metadata and row counts
+
+Tables are read through pandas with column projection and pyarrow filters,
+so only the requested columns and matching row groups/partitions are
+materialized.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import pandas as pd
+
+from etl.config import REPO_ROOT
+from etl.models.reaction_table import ROLE_SUBSTRATE, ReactionTable
+from etl.normalize.kegg_reactions import PARSER_VERSION
+
+SNAPSHOT_ROOT = REPO_ROOT / "data" / "snapshots"
+SNAPSHOT_TABLES = ("reactions", "compounds", "pathways", "stoichiometry", "enzymes", "membership")
+SNAPSHOT_FORMAT_VERSION = 1
+_LINK_COLUMNS = ("pathways", "modules", "orthologs", "rclasses")
+
+_ROLE_NAMES = {ROLE_SUBSTRATE: "substrate"}
+
+
+def write_snapshot(table: ReactionTable, path: str | Path | None = None) -> Path:
+    """Write a ``ReactionTable`` as a Parquet snapshot directory.
+
+    Reactions that appear in several pathways are stored once; their pathway
+    links go to the ``membership`` table, partitioned by ``pathway_id``.
+
+    Args:
+        table: Normalized (and optionally enriched) reactions.
+        path: Snapshot directory (default: a timestamped directory under
+            ``data/snapshots``).
+
+    Returns:
+        The snapshot directory; row counts are in its ``manifest.json``.
+    """
+    target = Path(path) if path else SNAPSHOT_ROOT / time.strftime("%Y%m%dT%H%M%S")
+    target.mkdir(parents=True, exist_ok=True)
+
+    frames = snapshot_frames(table)
+    for name, frame in frames.items():
+        table_dir = target / name
+        if name == "membership" and not frame.empty:
+            frame.to_parquet(table_dir, engine="pyarrow", index=False, partition_cols=["pathway_id"])
+        else:
+            table_dir.mkdir(parents=True, exist_ok=True)
+            frame.to_parquet(table_dir / "part-0.parquet", engine="pyarrow", index=False)
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "parser_version": PARSER_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "enriched": table.enriched,
+        "counts": {name: len(frame) for name, frame in frames.items()},
+    }
+    (target / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return target
+
+
+def snapshot_frames(table: ReactionTable) -> dict[str, pd.DataFrame]:
+    """Convert a ``ReactionTable`` into the snapshot's DataFrames."""
+    # Keep the first occurrence of each reaction; later ones only add membership.
+    first_index: dict[str, int] = {}
+    for idx, reaction_id in enumerate(table.reaction_ids):
+        first_index.setdefault(reaction_id, idx)
+    kept = sorted(first_index.values())
+    kept_set = set(kept)
+
+    reactions = pd.DataFrame(
+        {
+            "reaction_id": [table.reaction_ids[idx] for idx in kept],
+            "equation": [table.equations[idx] for idx in kept],
+            "name": [table.names[idx] for idx in kept],
+            "definition": [table.definitions[idx] for idx in kept],
+            "reversible": [bool(table.reversible[idx]) for idx in kept],
+            **{
+                column: pd.Series(
+                    [_link_ids(table.reaction_links[idx], column) for idx in kept], dtype="object"
+                )
+                for column in _LINK_COLUMNS
+            },
+        }
+    )
+
+    edges = [edge for edge, idx in enumerate(table.edge_reaction) if idx in kept_set]
+    stoichiometry = pd.DataFrame(
+        {
+            "reaction_id": [table.reaction_ids[table.edge_reaction[edge]] for edge in edges],
+            "compound_id": [table.compound_ids[table.edge_compound[edge]] for edge in edges],
+            "role": [_ROLE_NAMES.get(table.edge_role[edge], "product") for edge in edges],
+            "coef": pd.Series([table.edge_coef[edge] for edge in edges], dtype="float64"),
+            "coef_symbol": pd.Series(
+                [table.edge_coef_symbol.get(edge) for edge in edges], dtype="object"
+            ),
+        }
+    )
+
+    enzyme_edges = [edge for edge, idx in enumerate(table.enzyme_edge_reaction) if idx in kept_set]
+    enzymes = pd.DataFrame(
+        {
+            "reaction_id": [table.reaction_ids[table.enzyme_edge_reaction[e]] for e in enzyme_edges],
+            "enzyme_id": [table.enzyme_ids[table.enzyme_edge_enzyme[e]] for e in enzyme_edges],
+        }
+    )
+
+    membership_pairs = dict.fromkeys(
+        (table.pathway_ids[pathway_idx], table.reaction_ids[idx])
+        for idx, pathway_idx in enumerate(table.reaction_pathway)
+        if pathway_idx >= 0
+    )
+    membership = pd.DataFrame(list(membership_pairs), columns=["pathway_id", "reaction_id"])
+
+    return {
+        "reactions": reactions,
+        "compounds": pd.DataFrame(
+            {"compound_id": table.compound_ids, "name": pd.Series(table.compound_names, dtype="object")}
+        ),
+        "pathways": pd.DataFrame(
+            {"pathway_id": table.pathway_ids, "name": pd.Series(table.pathway_names, dtype="object")}
+        ),
+        "stoichiometry": stoichiometry,
+        "enzymes": enzymes,
+        "membership": membership,
+    }
+
+
+def read_snapshot_table(
+    path: str | Path,
+    name: str,
+    *,
+    columns: Sequence[str] | None = None,
+    filters: list[tuple[str, str, Any]] | None = None,
+) -> pd.DataFrame:
+    """Read one snapshot table with column projection and predicate pushdown.
+
+    Args:
+        path: Snapshot directory.
+        name: Table name (see ``SNAPSHOT_TABLES``).
+        columns: Columns to read (default: all).
+        filters: pyarrow filters, e.g. ``[("pathway_id", "in", ["hsa00010"])]``;
+            partition filters skip whole directories, column filters skip
+            row groups by their statistics.
+
+    Returns:
+        The selected rows and columns.
+    """
+    if name not in SNAPSHOT_TABLES:
+        raise ValueError(f"Unknown snapshot table: {name}")
+    table_dir = Path(path) / name
+    if not table_dir.exists():
+        return pd.DataFrame(columns=list(columns or []))
+    frame = pd.read_parquet(
+        table_dir,
+        engine="pyarrow",
+        columns=list(columns) if columns else None,
+        filters=filters,
+    )
+    if "pathway_id" in frame.columns:
+        # Hive partition keys come back as categoricals.
+        frame["pathway_id"] = frame["pathway_id"].astype(str)
+    return frame
+
+
+def load_snapshot(
+    path: str | Path,
+    *,
+    pathway_ids: Iterable[str] | None = None,
+) -> ReactionTable:
+    """Rebuild a ``ReactionTable`` from a snapshot, optionally for some pathways.
+
+    Produces one record per pathway membership (plus one per reaction with no
+    pathway when loading everything), matching what ingestion emits.
+    """
+    selected = list(pathway_ids) if pathway_ids is not None else None
+    membership_filter = [("pathway_id", "in", selected)] if selected is not None else None
+    membership = read_snapshot_table(path, "membership", filters=membership_filter)
+
+    reaction_filter = None
+    if selected is not None:
+        if membership.empty:
+            return ReactionTable()
+        reaction_filter = [("reaction_id", "in", sorted(set(membership["reaction_id"])))]
+
+    reactions = read_snapshot_table(path, "reactions", filters=reaction_filter)
+    stoichiometry = read_snapshot_table(path, "stoichiometry", filters=reaction_filter)
+    enzymes = read_snapshot_table(path, "enzymes", filters=reaction_filter)
+    compound_ids = sorted(set(stoichiometry["compound_id"]))
+    compounds = read_snapshot_table(
+        path, "compounds", filters=[("compound_id", "in", compound_ids)] if compound_ids else None
+    )
+    pathways = read_snapshot_table(path, "pathways")
+    manifest = json.loads((Path(path) / "manifest.json").read_text())
+
+    pathway_names = dict(zip(pathways["pathway_id"], _none_for_nan(pathways["name"])))
+    compound_names = dict(zip(compounds["compound_id"], _none_for_nan(compounds["name"])))
+    enzymes_by_reaction: dict[str, list[str]] = {}
+    for reaction_id, enzyme_id in zip(enzymes["reaction_id"], enzymes["enzyme_id"]):
+        enzymes_by_reaction.setdefault(reaction_id, []).append(enzyme_id)
+
+    amounts: dict[str, tuple[list[dict], list[dict]]] = {}
+    for reaction_id, compound_id, role, coef, symbol in zip(
+        stoichiometry["reaction_id"],
+        stoichiometry["compound_id"],
+        stoichiometry["role"],
+        stoichiometry["coef"],
+        _none_for_nan(stoichiometry["coef_symbol"]),
+    ):
+        amount: dict[str, Any] = {"id": compound_id, "coef": int(coef) if float(coef).is_integer() else coef}
+        if symbol is not None:
+            amount["coef_symbol"] = symbol
+        if manifest.get("enriched"):
+            amount["name"] = compound_names.get(compound_id)
+        sides = amounts.setdefault(reaction_id, ([], []))
+        sides[0 if role == "substrate" else 1].append(amount)
+
+    pathways_by_reaction: dict[str, list[str]] = {}
+    for pathway_id, reaction_id in zip(membership["pathway_id"], membership["reaction_id"]):
+        pathways_by_reaction.setdefault(reaction_id, []).append(pathway_id)
+
+    table = ReactionTable()
+    link_columns = [column for column in _LINK_COLUMNS if column in reactions.columns]
+    for row in reactions.to_dict("records"):
+        reaction_id = row["reaction_id"]
+        substrates, products = amounts.get(reaction_id, ([], []))
+        linked = pathways_by_reaction.get(reaction_id) or ([None] if selected is None else [])
+        links = {
+            column: list(row[column]) for column in link_columns if row[column] is not None
+        }
+        for pathway_id in linked:
+            table.append(
+                {
+                    "reaction_id": reaction_id,
+                    "pathway_id": pathway_id,
+                    "pathway_name": pathway_names.get(pathway_id) if pathway_id else None,
+                    "equation": _none_if_nan(row["equation"]),
+                    "reversible": bool(row["reversible"]),
+                    "substrates": substrates,
+                    "products": products,
+                    "enzymes": enzymes_by_reaction.get(reaction_id, []),
+                    "name": _none_if_nan(row["name"]),
+                    "definition": _none_if_nan(row["definition"]),
+                    **links,
+                }
+            )
+    table.enriched = bool(manifest.get("enriched"))
+    return table
+
+
+def _link_ids(links: dict[str, list[str]] | None, column: str) -> list[str] | None:
+    return None if links is None else list(links.get(column, []))
+
+
+def _none_for_nan(values: Iterable[Any]) -> list[Any]:
+    return [_none_if_nan(value) for value in values]
+
+
+def _none_if_nan(value: Any) -> Any:
+    return None if value is None or (isinstance(value, float) and value != value) else value
+
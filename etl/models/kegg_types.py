@@ -2,18 +2,36 @@
 
 from __future__ import annotations
 
-from typing import TypedDict
+from typing import NotRequired, TypedDict
 
 
 class CompoundAmount(TypedDict):
-    """Compound identifier with stoichiometric coefficient."""
+    """Compound identifier with stoichiometric coefficient.
+
+    ``coef_symbol`` holds symbolic coefficients such as "n" or "n+1"; ``coef``
+    is then 1.
+    """
 
     id: str
     coef: int | float
+    coef_symbol: NotRequired[str]
+
+
+class ReactionLinks(TypedDict):
+    """Cross-reference ids listed in a KEGG reaction entry."""
+
+    pathways: list[str]
+    modules: list[str]
+    orthologs: list[str]
+    rclasses: list[str]
 
 
 class ParsedReactionFields(TypedDict):
-    """Structured reaction fields parsed from KEGG entries."""
+    """Structured reaction fields parsed from KEGG entries.
+
+    The ``ReactionLinks`` fields are filled by ``parse_reaction_entry`` but may
+    be absent on records built elsewhere (tests, older JSON outputs).
+    """
 
     equation: str | None
     reversible: bool
@@ -22,6 +40,10 @@ class ParsedReactionFields(TypedDict):
     enzymes: list[str]
     name: str | None
     definition: str | None
+    pathways: NotRequired[list[str]]
+    modules: NotRequired[list[str]]
+    orthologs: NotRequired[list[str]]
+    rclasses: NotRequired[list[str]]
 
 
 class RawReactionRecord(ParsedReactionFields):
@@ -30,3 +52,11 @@ class RawReactionRecord(ParsedReactionFields):
     reaction_id: str
     pathway_id: str
     pathway_name: str | None
+
+
+class FetchedPathway(TypedDict):
+    """Raw KEGG entry texts for one pathway, before parsing."""
+
+    pathway_id: str
+    pathway_name: str | None
+    reaction_texts: dict[str, str]
@@ -0,0 +1,267 @@
+"""Columnar container for parsed KEGG reactions."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Mapping
+
+from etl.models.kegg_types import (
+    CompoundAmount,
+    ParsedReactionFields,
+    RawReactionRecord,
+    ReactionLinks,
+)
+
+ROLE_SUBSTRATE = 0
+ROLE_PRODUCT = 1
+
+_NO_PATHWAY = -1
+
+
+@dataclass
+class ReactionTable:
+    """Reactions stored as parallel columns with interned ids.
+
+    Reaction attributes are columns indexed by reaction position. Pathway,
+    compound and enzyme ids are interned once each. Stoichiometry is an edge
+    list of ``(reaction_idx, compound_idx, coef, role)`` held in typed
+    arrays, and enzymes are a ``(reaction_idx, enzyme_idx)`` edge list, so a
+    batch costs a handful of arrays instead of nested dicts per reaction.
+    Compound names live once per compound rather than once per edge.
+    """
+
+    reaction_ids: list[str] = field(default_factory=list)
+    equations: list[str | None] = field(default_factory=list)
+    names: list[str | None] = field(default_factory=list)
+    definitions: list[str | None] = field(default_factory=list)
+    reversible: bytearray = field(default_factory=bytearray)
+    reaction_pathway: array = field(default_factory=lambda: array("i"))
+    # PATHWAY/MODULE/ORTHOLOGY/RCLASS ids from the entry (None when not parsed).
+    reaction_links: list[ReactionLinks | None] = field(default_factory=list)
+
+    pathway_ids: list[str] = field(default_factory=list)
+    pathway_names: list[str | None] = field(default_factory=list)
+    compound_ids: list[str] = field(default_factory=list)
+    compound_names: list[str | None] = field(default_factory=list)
+    enzyme_ids: list[str] = field(default_factory=list)
+
+    edge_reaction: array = field(default_factory=lambda: array("I"))
+    edge_compound: array = field(default_factory=lambda: array("I"))
+    edge_coef: array = field(default_factory=lambda: array("d"))
+    edge_role: bytearray = field(default_factory=bytearray)
+    # Symbolic coefficients ("n+1") are rare; keep them sparse by edge index.
+    edge_coef_symbol: dict[int, str] = field(default_factory=dict)
+
+    enzyme_edge_reaction: array = field(default_factory=lambda: array("I"))
+    enzyme_edge_enzyme: array = field(default_factory=lambda: array("I"))
+
+    # Whether compound names have been attached (by enrichment or records).
+    enriched: bool = False
+
+    def __post_init__(self) -> None:
+        self._pathway_index = {pid: idx for idx, pid in enumerate(self.pathway_ids)}
+        self._compound_index = {cid: idx for idx, cid in enumerate(self.compound_ids)}
+        self._enzyme_index = {eid: idx for idx, eid in enumerate(self.enzyme_ids)}
+
+    def __len__(self) -> int:
+        return len(self.reaction_ids)
+
+    @classmethod
+    def from_records(cls, records: Iterable[RawReactionRecord]) -> ReactionTable:
+        """Build a table from ``RawReactionRecord`` dicts."""
+        table = cls()
+        for record in records:
+            table.append(record)
+        return table
+
+    @classmethod
+    def from_parsed(cls, reactions: Mapping[str, ParsedReactionFields]) -> ReactionTable:
+        """Build a table of pathway-less reactions from parsed fields by id."""
+        table = cls()
+        for reaction_id, fields in reactions.items():
+            table.add_reaction(reaction_id, fields)
+        return table
+
+    def append(self, record: RawReactionRecord) -> int:
+        """Add one record and return its reaction index."""
+        return self.add_reaction(
+            record["reaction_id"],
+            record,
+            pathway_id=record.get("pathway_id"),
+            pathway_name=record.get("pathway_name"),
+        )
+
+    def add_reaction(
+        self,
+        reaction_id: str,
+        fields: ParsedReactionFields,
+        *,
+        pathway_id: str | None = None,
+        pathway_name: str | None = None,
+    ) -> int:
+        """Add one reaction's parsed fields and return its reaction index."""
+        reaction_idx = len(self.reaction_ids)
+        self.reaction_ids.append(reaction_id)
+        self.equations.append(fields.get("equation"))
+        self.names.append(fields.get("name"))
+        self.definitions.append(fields.get("definition"))
+        self.reversible.append(1 if fields.get("reversible", True) else 0)
+        self.reaction_pathway.append(
+            self._intern_pathway(pathway_id, pathway_name) if pathway_id else _NO_PATHWAY
+        )
+        self.reaction_links.append(_record_links(fields))
+
+        for role, key in ((ROLE_SUBSTRATE, "substrates"), (ROLE_PRODUCT, "products")):
+            for compound in fields.get(key, []):
+                compound_idx = self._intern_compound(compound["id"])
+                if "name" in compound:
+                    self.enriched = True
+                    if compound["name"] is not None:
+                        self.compound_names[compound_idx] = compound["name"]
+                symbol = compound.get("coef_symbol")
+                if symbol is not None:
+                    self.edge_coef_symbol[len(self.edge_role)] = symbol
+                self.edge_reaction.append(reaction_idx)
+                self.edge_compound.append(compound_idx)
+                self.edge_coef.append(float(compound.get("coef", 1)))
+                self.edge_role.append(role)
+
+        for enzyme_id in fields.get("enzymes", []):
+            self.enzyme_edge_reaction.append(reaction_idx)
+            self.enzyme_edge_enzyme.append(self._intern_enzyme(enzyme_id))
+        return reaction_idx
+
+    def reaction_indices(self, reaction_ids: Iterable[str] | None = None) -> list[int]:
+        """Return the row indices of ``reaction_ids`` (every row when None).
+
+        Ids missing from the table are ignored; a reaction stored once per
+        pathway yields all of its rows.
+        """
+        if reaction_ids is None:
+            return list(range(len(self.reaction_ids)))
+        wanted = set(reaction_ids)
+        return [idx for idx, reaction_id in enumerate(self.reaction_ids) if reaction_id in wanted]
+
+    def coefficient(self, edge: int) -> int | float:
+        """Return an edge's coefficient, as an int when it is integral."""
+        coef = self.edge_coef[edge]
+        return int(coef) if coef.is_integer() else coef
+
+    def set_compound_names(self, names: dict[str, str | None]) -> None:
+        """Attach compound names (e.g. from enrichment), once per compound."""
+        self.compound_names = [names.get(compound_id) for compound_id in self.compound_ids]
+        self.enriched = True
+
+    def update_compound_names(self, names: Mapping[str, str | None]) -> None:
+        """Set names for the given compounds only, leaving the others untouched."""
+        for compound_id, name in names.items():
+            idx = self._compound_index.get(compound_id)
+            if idx is not None:
+                self.compound_names[idx] = name
+
+    def compound_ids_for(self, reaction_ids: Iterable[str]) -> list[str]:
+        """Return the distinct compounds of ``reaction_ids`` in interning order."""
+        selected = set(self.reaction_indices(reaction_ids))
+        compounds = {
+            compound_idx
+            for reaction_idx, compound_idx in zip(self.edge_reaction, self.edge_compound)
+            if reaction_idx in selected
+        }
+        return [self.compound_ids[idx] for idx in sorted(compounds)]
+
+    def iter_records(self) -> Iterator[RawReactionRecord]:
+        """Yield reactions as ``RawReactionRecord`` dicts, one at a time."""
+        compounds = self._edges_by_reaction(self.edge_reaction)
+        enzymes = self._edges_by_reaction(self.enzyme_edge_reaction)
+        for reaction_idx, reaction_id in enumerate(self.reaction_ids):
+            pathway_idx = self.reaction_pathway[reaction_idx]
+            substrates: list[CompoundAmount] = []
+            products: list[CompoundAmount] = []
+            for edge in compounds.get(reaction_idx, ()):
+                amount = self._compound_amount(edge)
+                (substrates if self.edge_role[edge] == ROLE_SUBSTRATE else products).append(amount)
+
+            record: RawReactionRecord = {
+                "reaction_id": reaction_id,
+                "pathway_id": self.pathway_ids[pathway_idx] if pathway_idx != _NO_PATHWAY else None,
+                "pathway_name": self.pathway_names[pathway_idx] if pathway_idx != _NO_PATHWAY else None,
+                "equation": self.equations[reaction_idx],
+                "reversible": bool(self.reversible[reaction_idx]),
+                "substrates": substrates,
+                "products": products,
+                "enzymes": [
+                    self.enzyme_ids[self.enzyme_edge_enzyme[edge]]
+                    for edge in enzymes.get(reaction_idx, ())
+                ],
+                "name": self.names[reaction_idx],
+                "definition": self.definitions[reaction_idx],
+            }
+            links = self.reaction_links[reaction_idx]
+            if links is not None:
+                record.update(links)
+            if self.enriched:
+                record["compound_names"] = {
+                    amount["id"]: amount["name"] for amount in substrates + products
+                }
+            yield record
+
+    def to_records(self) -> list[RawReactionRecord]:
+        """Convert the table back to a list of ``RawReactionRecord`` dicts."""
+        return list(self.iter_records())
+
+    def _compound_amount(self, edge: int) -> CompoundAmount:
+        compound_idx = self.edge_compound[edge]
+        amount: CompoundAmount = {
+            "id": self.compound_ids[compound_idx],
+            "coef": self.coefficient(edge),
+        }
+        symbol = self.edge_coef_symbol.get(edge)
+        if symbol is not None:
+            amount["coef_symbol"] = symbol
+        if self.enriched:
+            amount["name"] = self.compound_names[compound_idx]
+        return amount
+
+    @staticmethod
+    def _edges_by_reaction(edge_reaction: array) -> dict[int, list[int]]:
+        grouped: dict[int, list[int]] = {}
+        for edge, reaction_idx in enumerate(edge_reaction):
+            grouped.setdefault(reaction_idx, []).append(edge)
+        return grouped
+
+    def _intern_pathway(self, pathway_id: str, pathway_name: str | None) -> int:
+        idx = self._pathway_index.get(pathway_id)
+        if idx is None:
+            idx = self._pathway_index[pathway_id] = len(self.pathway_ids)
+            self.pathway_ids.append(pathway_id)
+            self.pathway_names.append(pathway_name)
+        elif pathway_name is not None and self.pathway_names[idx] is None:
+            self.pathway_names[idx] = pathway_name
+        return idx
+
+    def _intern_compound(self, compound_id: str) -> int:
+        idx = self._compound_index.get(compound_id)
+        if idx is None:
+            idx = self._compound_index[compound_id] = len(self.compound_ids)
+            self.compound_ids.append(compound_id)
+            self.compound_names.append(None)
+        return idx
+
+    def _intern_enzyme(self, enzyme_id: str) -> int:
+        idx = self._enzyme_index.get(enzyme_id)
+        if idx is None:
+            idx = self._enzyme_index[enzyme_id] = len(self.enzyme_ids)
+            self.enzyme_ids.append(enzyme_id)
+        return idx
+
+
+def _record_links(fields: ParsedReactionFields) -> ReactionLinks | None:
+    if "pathways" not in fields:
+        return None
+    return {
+        "pathways": list(fields.get("pathways", [])),
+        "modules": list(fields.get("modules", [])),
+        "orthologs": list(fields.get("orthologs", [])),
+        "rclasses": list(fields.get("rclasses", [])),
+    }
@@ -0,0 +1,82 @@
+"""Compiled parser for KEGG reaction equations."""
+
+from __future__ import annotations
+
+import re
+from typing import NamedTuple, Union
+
+# A coefficient is numeric, or the symbolic expression KEGG uses for polymer
+# reactions ("n", "n+1", "2n", "m-1", ...).
+Coefficient = Union[int, float, str]
+Stoichiometry = tuple[str, Coefficient]
+
+# One term: optional coefficient (numeric, symbolic like "n+1"/"2n", or
+# parenthesised) followed by a compound id with an optional polymer suffix
+# such as "(n)". findall scans a whole side in one C-level pass; tokens that
+# are not compounds (glycans, unknown ids) simply do not match.
+_TERM = re.compile(
+    r"(?<![\w(])(?:(\d+(?:\.\d+)?|\d*[a-z](?:[+-]\d*[a-z]?\d*)?|\([^)]*\))\s+)?"
+    r"(C\d{5})(?![\w])"
+)
+
+
+class ParsedEquation(NamedTuple):
+    """Reversibility plus ``(compound_id, coefficient)`` tuples per side."""
+
+    reversible: bool
+    substrates: tuple[Stoichiometry, ...]
+    products: tuple[Stoichiometry, ...]
+
+
+def parse_equation(equation: str) -> ParsedEquation | None:
+    """Parse a KEGG EQUATION value into compact stoichiometry tuples.
+
+    Terms that are not KEGG compounds (glycans, unknown tokens) are skipped.
+    A compound's own polymer suffix, as in ``C00369(n-1)``, is dropped from
+    its id.
+
+    Args:
+        equation: Equation text, e.g. "2 C00138 + C00024 <=> C00139".
+
+    Returns:
+        The parsed equation, or None when no ``<=>``/``=>`` arrow is present.
+    """
+    left, arrow, right = equation.partition("<=>")
+    reversible = bool(arrow)
+    if not arrow:
+        left, arrow, right = equation.partition("=>")
+        if not arrow:
+            return None
+    return ParsedEquation(reversible, parse_equation_side(left), parse_equation_side(right))
+
+
+def parse_equation_side(side: str) -> tuple[Stoichiometry, ...]:
+    """Parse one side of an equation into ``(compound_id, coefficient)`` tuples."""
+    return tuple(
+        (compound_id, int(coef_raw) if coef_raw.isdigit() else parse_coefficient(coef_raw))
+        for coef_raw, compound_id in _TERM.findall(side)
+    )
+
+
+def parse_coefficient(raw: str | None) -> Coefficient:
+    """Convert a coefficient token to int/float, or its symbolic expression.
+
+    Parentheses are dropped first, so ``(2)`` is the integer 2 and only
+    genuinely symbolic terms (``n``, ``n+1``, ``2n``) stay strings.
+    """
+    if not raw:
+        return 1
+    raw = raw.strip("()")
+    if raw.isdigit():
+        return int(raw)
+    if raw[:1].isdigit() and "." in raw:
+        try:
+            return float(raw)
+        except ValueError:
+            pass
+    return raw
+
+
+def is_symbolic(coef: Coefficient) -> bool:
+    """Return True for symbolic (non-numeric) coefficients."""
+    return isinstance(coef, str)
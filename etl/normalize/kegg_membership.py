@@ -0,0 +1,196 @@
+"""Pathway and module reaction membership from whole-database KEGG link tables."""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Mapping
+
+import requests
+
+from etl.fetch.kegg_api import fetch_kegg_data
+from etl.normalize.name_utils import normalize_name
+
+DEFAULT_INDEX_REFRESH_SECONDS = 24 * 3600
+
+_PATHWAY_NUMBER = re.compile(r"(\d{5})$")
+_ORGANISM_PATHWAY = re.compile(r"^(?!map)[a-z]+\d{5}$")
+
+
+@dataclass
+class MembershipIndex:
+    """In-memory pathway->reaction and module->reaction membership.
+
+    Pathways are keyed by their 5-digit map number, so organism-specific ids
+    (e.g. "hsa00010") resolve to the reference pathway's reactions.
+    """
+
+    pathway_reactions: dict[str, set[str]] = field(default_factory=dict)
+    module_reactions: dict[str, set[str]] = field(default_factory=dict)
+
+    def reactions_for_pathway(self, pathway_id: str) -> set[str]:
+        """Return reaction ids linked to a pathway."""
+        key = pathway_key(pathway_id)
+        if not key:
+            return set()
+        with _update_lock:
+            return set(self.pathway_reactions.get(key, set()))
+
+    def reactions_for_modules(self, module_ids: Iterable[str]) -> set[str]:
+        """Return the union of reaction ids linked to the given modules."""
+        reactions: set[str] = set()
+        with _update_lock:
+            for module_id in module_ids:
+                reactions.update(self.module_reactions.get(module_key(module_id), set()))
+        return reactions
+
+    def add_reaction(
+        self,
+        reaction_id: str,
+        *,
+        pathways: Iterable[str] = (),
+        modules: Iterable[str] = (),
+    ) -> None:
+        """Record a reaction's pathway and module links (e.g. from its entry)."""
+        with _update_lock:
+            for pathway_id in pathways:
+                key = pathway_key(pathway_id)
+                if key:
+                    self.pathway_reactions.setdefault(key, set()).add(reaction_id)
+            for module_id in modules:
+                self.module_reactions.setdefault(module_key(module_id), set()).add(reaction_id)
+
+    def update_from_reactions(self, records: Iterable[Mapping[str, Any]]) -> MembershipIndex:
+        """Add membership from parsed reaction records' ``pathways``/``modules``.
+
+        Reaction entries list every pathway and module they belong to, so
+        records already fetched for one pathway fill in membership for others
+        without extra ``link`` requests.
+        """
+        for record in records:
+            self.add_reaction(
+                record["reaction_id"],
+                pathways=record.get("pathways", ()),
+                modules=record.get("modules", ()),
+            )
+        return self
+
+
+def pathway_key(pathway_id: str) -> str | None:
+    """Normalize a pathway id ("path:hsa00010", "map00010") to its map number."""
+    match = _PATHWAY_NUMBER.search(pathway_id.strip())
+    return match.group(1) if match else None
+
+
+def module_key(module_id: str) -> str:
+    """Normalize a module id ("md:hsa_M00001") to its bare form ("M00001")."""
+    return module_id.strip().split(":")[-1].split("_")[-1]
+
+
+def parse_link_table(lines: Iterable[str], *, source: str) -> dict[str, set[str]]:
+    """Parse a KEGG ``link`` table into source -> reaction id sets.
+
+    Args:
+        lines: Tab-separated ``<source>\\t<target>`` lines; either column may
+            hold the reaction id.
+        source: "pathway" or "module", selecting how source ids are keyed.
+
+    Returns:
+        Mapping of normalized source ids to reaction id sets.
+    """
+    table: dict[str, set[str]] = {}
+    for line in lines:
+        left, _, right = line.strip().partition("\t")
+        if not right:
+            continue
+        if left.startswith("rn:"):
+            left, right = right, left
+        reaction_id = right.split(":")[-1]
+        key = pathway_key(left) if source == "pathway" else module_key(left)
+        if key:
+            table.setdefault(key, set()).add(reaction_id)
+    return table
+
+
+def parse_list_table(lines: Iterable[str]) -> dict[str, str]:
+    """Parse KEGG ``list`` lines into bare id -> rest of the line."""
+    listed: dict[str, str] = {}
+    for line in lines:
+        entry_id, _, text = line.partition("\t")
+        entry_id = entry_id.strip().split(":")[-1]
+        if entry_id:
+            listed[entry_id] = text.strip()
+    return listed
+
+
+def pathway_list_name(pathway_id: str, text: str) -> str | None:
+    """Return a pathway name from its ``list/pathway`` description.
+
+    Organism tables (``list/pathway/hsa``) append `` - <organism>`` to each
+    name; that suffix is dropped and the rest normalized like
+    ``extract_pathway_name``, so list-based names match full ingestion.
+    """
+    if _ORGANISM_PATHWAY.match(pathway_id.strip().split(":")[-1]):
+        text = text.rpartition(" - ")[0] or text
+    return normalize_name(text)
+
+
+def parse_pathway_modules(lines: Iterable[str]) -> dict[str, set[str]]:
+    """Parse ``link/module/pathway`` lines into map number -> module ids."""
+    modules: dict[str, set[str]] = {}
+    for line in lines:
+        left, _, right = line.strip().partition("\t")
+        if left.startswith("md:"):
+            left, right = right, left
+        key = pathway_key(left)
+        if key and right:
+            modules.setdefault(key, set()).add(module_key(right))
+    return modules
+
+
+def build_membership_index(pathway_links: str, module_links: str) -> MembershipIndex:
+    """Build a membership index from raw ``link`` table responses."""
+    return MembershipIndex(
+        pathway_reactions=parse_link_table(pathway_links.splitlines(), source="pathway"),
+        module_reactions=parse_link_table(module_links.splitlines(), source="module"),
+    )
+
+
+def load_membership_index(
+    *,
+    session: requests.Session | None = None,
+    refresh_interval: float = DEFAULT_INDEX_REFRESH_SECONDS,
+) -> MembershipIndex:
+    """Load the membership index with two bulk ``link`` requests.
+
+    Responses go through ``fetch_kegg_data`` and therefore the on-disk KEGG
+    cache when configured; the parsed index is also memoized in-process for
+    ``refresh_interval`` seconds.
+    """
+    global _index, _index_loaded_at
+
+    with _index_lock:
+        if _index is not None and time.time() - _index_loaded_at < refresh_interval:
+            return _index
+
+        sess = session or requests.Session()
+        pathway_links = fetch_kegg_data("link", "reaction/pathway", session=sess, timeout=60)
+        module_links = fetch_kegg_data("link", "reaction/module", session=sess, timeout=60)
+        index = build_membership_index(pathway_links, module_links)
+        print(
+            f"Membership index loaded: {len(index.pathway_reactions)} pathways, "
+            f"{len(index.module_reactions)} modules"
+        )
+        # Keep an empty index out of the memo so a failed download is retried.
+        if index.pathway_reactions or index.module_reactions:
+            _index, _index_loaded_at = index, time.time()
+        return index
+
+
+_index: MembershipIndex | None = None
+_index_loaded_at = 0.0
+_index_lock = threading.Lock()
+# Guards index reads and updates; pathway chains may share one index across threads.
+_update_lock = threading.Lock()
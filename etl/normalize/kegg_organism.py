@@ -0,0 +1,264 @@
+"""Whole-organism ingestion planned from KEGG ``list``/``link`` tables."""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Collection
+
+import requests
+
+from etl.enrich.compound_enrichment import (
+    ENRICH_MODE_BULK,
+    attach_compound_names,
+    collect_compound_ids,
+    enrich_compound_names,
+)
+from etl.fetch.kegg_api import KEGG_MAX_GET_ENTRIES, fetch_kegg_data
+from etl.fetch.kegg_async import DEFAULT_CONCURRENCY, KEGG_RATE_LIMIT
+from etl.fetch.kegg_metrics import get_fetch_metrics
+from etl.models.kegg_types import RawReactionRecord
+from etl.normalize.kegg_membership import (
+    MembershipIndex,
+    build_membership_index,
+    parse_list_table,
+    parse_pathway_modules,
+    pathway_key,
+    pathway_list_name,
+)
+from etl.normalize.kegg_registry import BatchRegistry, PathwayMembership
+
+# list/pathway/<org>, link/reaction/pathway, link/reaction/module, link/module/pathway.
+PLAN_REQUESTS = 4
+
+
+@dataclass
+class OrganismPlan:
+    """Every pathway of an organism with the distinct modules and reactions behind it."""
+
+    organism: str
+    listed_pathways: int
+    pathways: list[PathwayMembership] = field(default_factory=list)
+    modules: set[str] = field(default_factory=set)
+    reaction_ids: set[str] = field(default_factory=set)
+
+    def request_estimate(self) -> dict[str, int]:
+        """KEGG requests for this plan versus ingesting each pathway on its own.
+
+        Per-pathway ingestion (as in the batch flow's per-pathway chains with
+        the bulk link index) costs one pathway ``get`` plus batched reaction
+        ``get``s per pathway, repeating reactions shared between pathways.
+        Compound enrichment is left out: both modes use one bulk table.
+        """
+        return {
+            "organism": PLAN_REQUESTS + _get_requests(len(self.reaction_ids)),
+            # The two bulk link tables are shared by every per-pathway chain.
+            "per_pathway": 2
+            + sum(1 + _get_requests(len(pathway.reaction_ids)) for pathway in self.pathways),
+        }
+
+
+@dataclass
+class OrganismIngestion:
+    """Result of ``ingest_organism``: the plan, the registry and enriched reactions."""
+
+    plan: OrganismPlan
+    registry: BatchRegistry
+    records: list[RawReactionRecord]
+    report: dict[str, Any]
+
+    def pathway_records(self) -> list[RawReactionRecord]:
+        """Return per-pathway records (the ``ingest_pathway`` shape) with names attached."""
+        names = {
+            compound["id"]: compound.get("name")
+            for record in self.records
+            for compound in (*record.get("substrates", []), *record.get("products", []))
+        }
+        records = [
+            record
+            for pathway in self.registry.memberships()
+            for record in self.registry.records_for(pathway.pathway_id)
+        ]
+        return attach_compound_names(records, names)
+
+
+def plan_organism(
+    organism: str,
+    *,
+    fetch: Callable[..., str] | None = None,
+    session: requests.Session | None = None,
+) -> tuple[OrganismPlan, MembershipIndex]:
+    """List an organism's pathways and resolve their reactions from bulk tables.
+
+    Uses ``PLAN_REQUESTS`` requests in total, whatever the number of
+    pathways; pathways without reactions (e.g. signaling maps) are dropped.
+
+    Returns:
+        The plan and the membership index it was built from.
+    """
+    session = session or requests.Session()
+
+    def _table(endpoint: str, entries: str) -> str:
+        if fetch is not None:
+            return fetch(endpoint, entries, session=session)
+        return fetch_kegg_data(endpoint, entries, session=session, timeout=60)
+
+    listed = parse_list_table(_table("list", f"pathway/{organism}").splitlines())
+    if not listed:
+        raise ValueError(f"KEGG lists no pathways for organism '{organism}'")
+    index = build_membership_index(_table("link", "reaction/pathway"), _table("link", "reaction/module"))
+    pathway_modules = parse_pathway_modules(_table("link", "module/pathway").splitlines())
+
+    plan = OrganismPlan(organism=organism, listed_pathways=len(listed))
+    for pathway_id, name in listed.items():
+        modules = pathway_modules.get(pathway_key(pathway_id) or "", set())
+        reactions = index.reactions_for_pathway(pathway_id) | index.reactions_for_modules(modules)
+        if not reactions:
+            continue
+        plan.pathways.append(
+            PathwayMembership(pathway_id, pathway_list_name(pathway_id, name), sorted(reactions))
+        )
+        plan.modules.update(modules)
+        plan.reaction_ids.update(reactions)
+
+    print(
+        f"Organism {organism}: {len(plan.pathways)} of {len(listed)} pathways with reactions, "
+        f"{len(plan.modules)} modules, {len(plan.reaction_ids)} distinct reactions"
+    )
+    return plan, index
+
+
+def build_organism_registry(
+    plan: OrganismPlan,
+    *,
+    fetch: Callable[..., str] | None = None,
+    session: requests.Session | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate_limit: float | None = KEGG_RATE_LIMIT,
+    parse_workers: int | None = None,
+) -> BatchRegistry:
+    """Fetch and parse every distinct reaction of a plan once."""
+    registry = BatchRegistry(
+        concurrency=concurrency,
+        rate_limit=rate_limit,
+        fetch=fetch,
+        parse_workers=parse_workers,
+        session=session,
+    )
+    registry.add_memberships(plan.pathways)
+    return registry
+
+
+def organism_report(
+    plan: OrganismPlan,
+    registry: BatchRegistry,
+    compound_ids: Collection[str],
+    *,
+    wall_seconds: float,
+    rate_limit: float | None = KEGG_RATE_LIMIT,
+    measured_requests: int | None = None,
+) -> dict[str, Any]:
+    """Summarize an organism run and its savings over per-pathway ingestion.
+
+    The per-pathway wall-clock estimate adds the extra requests at the KEGG
+    rate limit to this run's wall-clock time.
+    """
+    estimate = plan.request_estimate()
+    saved = estimate["per_pathway"] - estimate["organism"]
+    return {
+        "organism": plan.organism,
+        "listed_pathways": plan.listed_pathways,
+        "pathways": len(registry.pathways),
+        "distinct_modules": len(plan.modules),
+        "distinct_reactions": len(plan.reaction_ids),
+        "parsed_reactions": len(registry.reactions),
+        "distinct_compounds": len(set(compound_ids)),
+        "reaction_references": sum(len(pathway.reaction_ids) for pathway in plan.pathways),
+        "requests": estimate["organism"],
+        "per_pathway_requests": estimate["per_pathway"],
+        "requests_saved": saved,
+        "measured_requests": measured_requests,
+        "wall_seconds": round(wall_seconds, 2),
+        "per_pathway_wall_seconds_estimate": (
+            round(wall_seconds + saved / rate_limit, 2) if rate_limit else None
+        ),
+    }
+
+
+def ingest_organism(
+    organism: str,
+    *,
+    fetch: Callable[..., str] | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate_limit: float | None = KEGG_RATE_LIMIT,
+    parse_workers: int | None = None,
+    enrich: bool = True,
+    enrich_mode: str = ENRICH_MODE_BULK,
+    compound_cache_path: str | Path | None = None,
+) -> OrganismIngestion:
+    """Ingest every pathway of an organism with deduplicated fetches.
+
+    Plans from ``list/pathway/<organism>`` and the bulk link tables, fetches
+    and parses each distinct reaction once, and enriches all of them with a
+    single compound-name pass. Loading is left to the caller (e.g.
+    ``load_reactions`` followed by ``load_pathway_memberships``).
+
+    Args:
+        organism: KEGG organism code (e.g. "hsa").
+        fetch: Optional ``fetch_kegg_data``-compatible source.
+        concurrency: Maximum in-flight KEGG requests.
+        rate_limit: KEGG requests per second (None disables throttling).
+        parse_workers: Processes for parsing reaction entries.
+        enrich: Attach compound names.
+        enrich_mode: ``enrich_compound_names`` mode (bulk by default).
+        compound_cache_path: Compound name cache file.
+
+    Returns:
+        Plan, registry, distinct enriched reactions and a savings report.
+    """
+    started = time.perf_counter()
+    requests_before = get_fetch_metrics().snapshot()["totals"]["requests"]
+    session = requests.Session()
+
+    plan, _index = plan_organism(organism, fetch=fetch, session=session)
+    registry = build_organism_registry(
+        plan,
+        fetch=fetch,
+        session=session,
+        concurrency=concurrency,
+        rate_limit=rate_limit,
+        parse_workers=parse_workers,
+    )
+    records = registry.reaction_records()
+    if enrich:
+        records = enrich_compound_names(
+            records,
+            cache_path=compound_cache_path,
+            session=session,
+            mode=enrich_mode,
+            fetch=fetch,
+            parse_workers=parse_workers,
+        )
+
+    report = organism_report(
+        plan,
+        registry,
+        collect_compound_ids(records),
+        wall_seconds=time.perf_counter() - started,
+        rate_limit=rate_limit,
+        # Only network requests are counted by the fetch metrics.
+        measured_requests=(
+            get_fetch_metrics().snapshot()["totals"]["requests"] - requests_before
+            if fetch is None
+            else None
+        ),
+    )
+    print(f"Organism ingestion report: {report}")
+    return OrganismIngestion(plan, registry, records, report)
+
+
+def _get_requests(entries: int) -> int:
+    """Batched ``get`` requests needed for ``entries`` ids."""
+    return math.ceil(entries / KEGG_MAX_GET_ENTRIES)
@@ -0,0 +1,122 @@
+"""Parse stage for batches of KEGG entries: memoization and process pools."""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Sequence, TypeVar
+
+from etl.config import get_settings
+from etl.fetch.kegg_cache import KeggCache, content_digest
+
+T = TypeVar("T")
+
+# Entries per task sent to a worker; large enough to amortize pickling.
+DEFAULT_PARSE_CHUNK_SIZE = 256
+
+
+def parse_entries(
+    texts: Sequence[str],
+    parser: Callable[[str], T],
+    *,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_PARSE_CHUNK_SIZE,
+) -> list[T]:
+    """Parse entry texts, fanning chunks out to worker processes when useful.
+
+    Results are returned in input order whatever the worker count, so the
+    parallel stage is a drop-in replacement for a serial loop. Batches that
+    fit in a single chunk, ``workers <= 1``, or environments where a process
+    pool cannot start are parsed serially in-process.
+
+    Args:
+        texts: Raw entry texts.
+        parser: Module-level (picklable) parse function, e.g.
+            ``parse_reaction_entry``.
+        workers: Worker processes (defaults to ``KEGG_PARSE_WORKERS``).
+        chunk_size: Entries per worker task.
+
+    Returns:
+        Parsed results, one per input text.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    worker_count = get_settings().kegg_parse_workers if workers is None else workers
+    if worker_count <= 1 or len(texts) <= chunk_size:
+        return [parser(text) for text in texts]
+
+    try:
+        pickle.dumps(parser)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        print("[KEGG PARSE] parser cannot be sent to worker processes; parsing serially")
+        return [parser(text) for text in texts]
+
+    chunks = [list(texts[i : i + chunk_size]) for i in range(0, len(texts), chunk_size)]
+    try:
+        # Spawned workers do not inherit the parent's fetch threads or
+        # SQLite handles, which forking a threaded process could deadlock on.
+        with ProcessPoolExecutor(
+            max_workers=min(worker_count, len(chunks)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            parsed_chunks = list(pool.map(_parse_chunk, [parser] * len(chunks), chunks))
+    except (BrokenProcessPool, OSError) as exc:
+        print(f"[KEGG PARSE] process pool unavailable ({exc}); parsing serially")
+        return [parser(text) for text in texts]
+
+    return [result for chunk in parsed_chunks for result in chunk]
+
+
+def parse_entries_cached(
+    texts: Sequence[str],
+    parser: Callable[[str], T],
+    *,
+    kind: str,
+    version: int,
+    cache: KeggCache | None,
+    workers: int | None = None,
+) -> list[T]:
+    """Parse entry texts, reusing results memoized in the KEGG cache.
+
+    Results are keyed by the SHA-256 of the raw text plus ``version``, so
+    byte-identical entries skip parsing entirely and a version bump forces a
+    full reparse. Only misses reach ``parse_entries``. Results must be
+    JSON-serializable; every returned record is a fresh object, safe for
+    callers to mutate.
+
+    Args:
+        texts: Raw entry texts.
+        parser: Parse function (see ``parse_entries``).
+        kind: Memo namespace, e.g. "reaction".
+        version: Parser version for ``kind``.
+        cache: KEGG cache holding the memo table (None parses everything).
+        workers: Worker processes for the misses.
+
+    Returns:
+        Parsed results, one per input text.
+    """
+    if cache is None:
+        return parse_entries(texts, parser, workers=workers)
+
+    digests = [content_digest(text) for text in texts]
+    payloads = cache.get_parsed(kind, version, digests)
+
+    missing: dict[str, str] = {}
+    for digest, text in zip(digests, texts):
+        if digest not in payloads:
+            missing.setdefault(digest, text)
+    if missing:
+        parsed = parse_entries(list(missing.values()), parser, workers=workers)
+        fresh = list(zip(missing, parsed))
+        cache.set_parsed(kind, version, fresh)
+        payloads.update((digest, json.dumps(result).encode("utf-8")) for digest, result in fresh)
+
+    return [json.loads(payloads[digest]) for digest in digests]
+
+
+def _parse_chunk(parser: Callable[[str], T], texts: list[str]) -> list[T]:
+    """Worker entry point: parse one chunk of texts."""
+    return [parser(text) for text in texts]
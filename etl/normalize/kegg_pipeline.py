@@ -2,77 +2,188 @@
 
 from __future__ import annotations
 
+from typing import Callable, Iterator
+
 import requests
 
-from etl.fetch.kegg_api import fetch_kegg_data
+from etl.fetch.kegg_api import fetch_kegg_data, sync_kegg_release
+from etl.fetch.kegg_async import DEFAULT_CONCURRENCY, KEGG_RATE_LIMIT, AsyncKeggFetcher
+from etl.fetch.kegg_cache import KeggCache
+from etl.fetch.kegg_flatfile import FlatFileDump
+from etl.normalize.kegg_membership import MembershipIndex
 from etl.normalize.kegg_modules import extract_kegg_modules
-from etl.models.kegg_types import RawReactionRecord
-from etl.normalize.kegg_reactions import extract_kegg_reactions, parse_reaction_entry
+from etl.normalize.kegg_parse_pool import parse_entries_cached
+from etl.models.kegg_types import FetchedPathway, ParsedReactionFields, RawReactionRecord
+from etl.normalize.kegg_reactions import (
+    PARSER_VERSION,
+    extract_kegg_reactions,
+    parse_reaction_entry,
+)
+from etl.normalize.kegg_sections import section_text
 from etl.normalize.name_utils import normalize_name
 
 
-def ingest_pathway(pathway_id: str) -> list[RawReactionRecord]:
+def ingest_pathway(
+    pathway_id: str,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate_limit: float | None = KEGG_RATE_LIMIT,
+    membership: MembershipIndex | None = None,
+    fetch: Callable[..., str] | None = None,
+    parse_workers: int | None = None,
+) -> list[RawReactionRecord]:
     """Ingest a pathway into raw reaction topology records.
 
     Pipeline:
         Pathway -> Modules -> Reactions -> Parsed reactions
 
+    Module and reaction entries are fetched concurrently in multi-entry
+    ``get`` batches; records are still returned in sorted reaction-id order.
+    Runs ``fetch_pathway`` followed by ``parse_pathway``.
+
     Args:
         pathway_id: KEGG pathway id (e.g., "hsa00010").
+        concurrency: Maximum number of in-flight KEGG requests.
+        rate_limit: Maximum KEGG requests per second (None disables throttling).
+        membership: Optional index built from bulk ``link`` tables; when set,
+            module entries and ``link/rn`` are resolved from memory.
+        fetch: Optional ``fetch_kegg_data``-compatible source (e.g. an offline
+            ``FlatFileDump.fetch``); bypasses the KEGG response cache.
+        parse_workers: Processes for parsing reaction entries (defaults to
+            ``KEGG_PARSE_WORKERS``; 1 parses serially).
 
     Returns:
         Raw reaction records for the pathway.
     """
+    fetcher = AsyncKeggFetcher(
+        concurrency=concurrency,
+        rate_limit=rate_limit,
+        session=requests.Session(),
+        fetch=fetch or fetch_kegg_data,
+        use_cache=fetch is None,
+        adaptive=fetch is None,
+    )
+    fetched = fetch_pathway(pathway_id, fetcher=fetcher, membership=membership, fetch=fetch)
+    return parse_pathway(
+        fetched, membership=membership, cache=fetcher.cache, parse_workers=parse_workers
+    )
+
 
-    # Create a shared session for all KEGG requests.
-    session = requests.Session()
+def fetch_pathway(
+    pathway_id: str,
+    *,
+    fetcher: AsyncKeggFetcher | None = None,
+    membership: MembershipIndex | None = None,
+    fetch: Callable[..., str] | None = None,
+) -> FetchedPathway:
+    """Fetch a pathway's entry and the raw entries of all its reactions.
+
+    Args:
+        pathway_id: KEGG pathway id (e.g., "hsa00010").
+        fetcher: Fetcher for every request of the pathway, so its rate limit
+            also covers the pathway and ``link/rn`` lookups (a default one is
+            created when omitted; share one across concurrent pathways).
+        membership: Optional bulk link index (see ``ingest_pathway``).
+        fetch: Optional ``fetch_kegg_data``-compatible source.
+
+    Returns:
+        Pathway name and reaction id -> entry text, in reaction-id order.
+    """
+    if fetcher is None:
+        fetcher = AsyncKeggFetcher(
+            fetch=fetch or fetch_kegg_data, use_cache=fetch is None, adaptive=fetch is None
+        )
+
+    # Confirm the KEGG release so unchanged cached entries can be reused.
+    if fetch is None:
+        sync_kegg_release(cache=fetcher.cache, session=fetcher.session)
 
     # Fetch pathway entry and extract module ids.
     print(f"\nFetching pathway: {pathway_id}")
-    pathway_text = fetch_kegg_data("get", pathway_id, session=session)
+    pathway_text = fetcher.fetch_one("get", pathway_id)
 
-    pathway_name = _extract_pathway_name(pathway_text)
+    pathway_name = extract_pathway_name(pathway_text)
     modules = extract_kegg_modules(pathway_text)
     print(f"Modules discovered: {len(modules)}")
 
-    # Fetch each module entry and collect reaction ids.
     all_reactions: set[str] = set()
 
-    for module in modules:
-        module_text = fetch_kegg_data("get", module, session=session)
-        reactions = extract_kegg_reactions(module_text)
-        all_reactions.update(reactions)
+    if membership is not None:
+        # Resolve module and pathway membership from the bulk link tables.
+        all_reactions.update(membership.reactions_for_modules(modules))
+        all_reactions.update(membership.reactions_for_pathway(pathway_id))
+    else:
+        # Fetch module entries (batched) and collect reaction ids.
+        module_texts = fetcher.fetch_entries(modules)
+        for module_text in module_texts.values():
+            all_reactions.update(extract_kegg_reactions(module_text))
 
     # Module sections can be incomplete for organism-specific pathways.
     # Always union direct pathway reaction references to maximize coverage.
     all_reactions.update(extract_kegg_reactions(pathway_text))
-    # KEGG pathway entries often omit explicit R-ids; the pathway->reaction
-    # link endpoint is a more reliable source of reaction membership.
-    pathway_links_text = fetch_kegg_data("link/rn", pathway_id, session=session)
-    all_reactions.update(extract_kegg_reactions(pathway_links_text))
+    if membership is None:
+        # KEGG pathway entries often omit explicit R-ids; the pathway->reaction
+        # link endpoint is a more reliable source of reaction membership.
+        pathway_links_text = fetcher.fetch_one("link/rn", pathway_id)
+        all_reactions.update(extract_kegg_reactions(pathway_links_text))
 
     print(f"Total reactions collected: {len(all_reactions)}")
 
-    # Fetch each reaction entry and parse into structured records.
-    parsed_reactions: list[RawReactionRecord] = []
-    skipped_reactions: list[str] = []
+    # Fetch reaction entries in concurrent batches.
+    reaction_ids = sorted(all_reactions)
+    reaction_texts = fetcher.fetch_entries(reaction_ids)
+    # Ids come back empty when the fetch failed or KEGG does not know them.
+    missing = [reaction_id for reaction_id in reaction_ids if not reaction_texts.get(reaction_id)]
+    if missing:
+        print(f"Unfetched reactions: {', '.join(missing)}")
+    return {
+        "pathway_id": pathway_id,
+        "pathway_name": pathway_name,
+        "reaction_texts": {
+            reaction_id: reaction_texts[reaction_id]
+            for reaction_id in reaction_ids
+            if reaction_texts.get(reaction_id)
+        },
+    }
 
-    for reaction_id in sorted(all_reactions):
-        reaction_text = fetch_kegg_data("get", reaction_id, session=session)
 
-        parsed = parse_reaction_entry(reaction_text)
+def parse_pathway(
+    fetched: FetchedPathway,
+    *,
+    membership: MembershipIndex | None = None,
+    cache: KeggCache | None = None,
+    parse_workers: int | None = None,
+) -> list[RawReactionRecord]:
+    """Parse the reaction entries returned by ``fetch_pathway``.
 
-        if not parsed["equation"] or not parsed["substrates"] or not parsed["products"]:
-            skipped_reactions.append(reaction_id)
-            continue
+    Args:
+        fetched: Output of ``fetch_pathway``.
+        membership: Optional bulk link index; parsed pathway/module links
+            are folded back into it.
+        cache: KEGG cache for the parse memo and negative marking.
+        parse_workers: Processes for parsing reaction entries.
 
-        parsed_record: RawReactionRecord = {
+    Returns:
+        Raw reaction records in reaction-id order.
+    """
+    parsed_by_id, skipped_reactions = parse_reaction_texts(
+        fetched["reaction_texts"], cache=cache, parse_workers=parse_workers
+    )
+
+    parsed_reactions: list[RawReactionRecord] = [
+        {
             "reaction_id": reaction_id,
-            "pathway_id": pathway_id,
-            "pathway_name": pathway_name,
+            "pathway_id": fetched["pathway_id"],
+            "pathway_name": fetched["pathway_name"],
             **parsed,
         }
-        parsed_reactions.append(parsed_record)
+        for reaction_id, parsed in parsed_by_id.items()
+    ]
+
+    if membership is not None:
+        # Reaction entries list all of their pathways and modules; fold those
+        # links back so later pathways in a batch see any the bulk tables lack.
+        membership.update_from_reactions(parsed_reactions)
 
     missing_count = len(skipped_reactions)
     print(f"Missing reactions: {missing_count}")
@@ -83,21 +194,84 @@ def ingest_pathway(pathway_id: str) -> list[RawReactionRecord]:
     return parsed_reactions
 
 
-def _extract_pathway_name(text: str) -> str | None:
-    """Extract the pathway NAME field from a KEGG pathway entry."""
-    name = ""
-    capture = False
+def parse_reaction_texts(
+    reaction_texts: dict[str, str],
+    *,
+    cache: KeggCache | None,
+    parse_workers: int | None = None,
+) -> tuple[dict[str, ParsedReactionFields], list[str]]:
+    """Parse fetched reaction entries, separating usable and skipped ones.
+
+    Unchanged entries reuse parse results memoized in ``cache``. Entries
+    without an equation, substrates or products are skipped; those KEGG
+    actually returned are moved to the shorter negative TTL when cached.
+    Empty texts (failed or unknown fetches) are skipped without touching the
+    cache, so transient fetch failures are retried on the next run.
+
+    Args:
+        reaction_texts: Reaction id -> raw entry text, in the desired order.
+        cache: KEGG cache for the parse memo and negative marking.
+        parse_workers: Processes for parsing (see ``parse_entries``).
 
-    for line in text.splitlines():
-        if line.startswith("NAME"):
-            capture = True
-            name = line.replace("NAME", "", 1).strip()
+    Returns:
+        Parsed fields by reaction id (input order) and the skipped ids.
+    """
+    parsed_entries = parse_entries_cached(
+        list(reaction_texts.values()),
+        parse_reaction_entry,
+        kind="reaction",
+        version=PARSER_VERSION,
+        cache=cache,
+        workers=parse_workers,
+    )
+
+    parsed_by_id: dict[str, ParsedReactionFields] = {}
+    skipped: list[str] = []
+    for reaction_id, parsed in zip(reaction_texts, parsed_entries):
+        if not parsed["equation"] or not parsed["substrates"] or not parsed["products"]:
+            skipped.append(reaction_id)
+            # Keep unparsable entries on the shorter negative TTL.
+            if cache is not None and reaction_texts[reaction_id]:
+                cache.mark_negative("get", reaction_id)
             continue
+        parsed_by_id[reaction_id] = parsed
+    return parsed_by_id, skipped
 
-        if capture:
-            if line.startswith(" "):
-                name += " " + line.strip()
-            else:
-                break
 
-    return normalize_name(name)
+def ingest_pathways_from_dump(
+    dump: FlatFileDump,
+    pathway_ids: list[str] | None = None,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    parse_workers: int | None = None,
+) -> Iterator[tuple[str, list[RawReactionRecord]]]:
+    """Ingest pathways entirely offline from a local KEGG flat-file dump.
+
+    Membership is derived from the dump's reaction PATHWAY/MODULE sections,
+    and entries are served from memory-mapped files without throttling.
+
+    Args:
+        dump: Flat-file dump providing ``pathway``, ``module`` and ``reaction``.
+        pathway_ids: Pathways to ingest (default: every entry in ``pathway``).
+        concurrency: Maximum number of concurrent entry lookups.
+        parse_workers: Processes for parsing reaction entries.
+
+    Yields:
+        ``(pathway_id, records)`` for one pathway at a time.
+    """
+    membership = dump.build_membership_index()
+    for pathway_id in pathway_ids or dump.entry_ids("pathway"):
+        records = ingest_pathway(
+            pathway_id,
+            concurrency=concurrency,
+            rate_limit=None,
+            membership=membership,
+            fetch=dump.fetch,
+            parse_workers=parse_workers,
+        )
+        yield pathway_id, records
+
+
+def extract_pathway_name(text: str) -> str | None:
+    """Extract the pathway NAME field from a KEGG pathway entry."""
+    return normalize_name(section_text(text, "NAME"))
@@ -2,10 +2,28 @@
 
 import re
 
-from etl.models.kegg_types import CompoundAmount, ParsedReactionFields
+from etl.models.kegg_types import CompoundAmount, ParsedReactionFields, ReactionLinks
 from etl.normalize.kegg_enzymes import extract_kegg_enzymes
+from etl.normalize.kegg_equations import Stoichiometry, is_symbolic, parse_equation
+from etl.normalize.kegg_sections import (
+    EntryLike,
+    KeggSections,
+    as_sections,
+    section_text,
+    tokenize_entry,
+)
 from etl.normalize.name_utils import normalize_name
 
+# Bump whenever parse_reaction_entry output changes; memoized parses of older
+# versions are then discarded.
+PARSER_VERSION = 2
+
+# Leading identifiers of the cross-reference sections in reaction entries.
+_PATHWAY_ID = re.compile(r"[a-z]{2,4}\d{5}")
+_MODULE_ID = re.compile(r"(?:[a-z]+_)?M\d{5}")
+_ORTHOLOG_ID = re.compile(r"K\d{5}")
+_RCLASS_ID = re.compile(r"RC\d{5}")
+
 
 def extract_kegg_reactions(text: str) -> list[str]:
     """Extract reaction IDs (Rxxxxx) from a module entry blob.
@@ -29,10 +47,13 @@ def parse_reaction_entry(text: str) -> ParsedReactionFields:
     Returns:
         Parsed reaction fields with empty lists when data is missing.
     """
-    equation = _extract_equation(text)
-    name = normalize_name(_extract_field(text, "NAME"))
-    definition = _extract_field(text, "DEFINITION")
-    enzymes = extract_kegg_enzymes(text)
+    # Tokenize once; every field below reads from the same section mapping.
+    sections = tokenize_entry(text)
+    equation = section_text(sections, "EQUATION")
+    name = normalize_name(section_text(sections, "NAME"))
+    definition = section_text(sections, "DEFINITION")
+    enzymes = extract_kegg_enzymes(sections)
+    links = extract_reaction_links(sections)
 
     if not equation:
         return {
@@ -43,6 +64,7 @@ def parse_reaction_entry(text: str) -> ParsedReactionFields:
             "enzymes": enzymes,
             "name": name,
             "definition": definition,
+            **links,
         }
 
     reversible, substrates, products = _parse_equation(equation)
@@ -55,82 +77,59 @@ def parse_reaction_entry(text: str) -> ParsedReactionFields:
         "enzymes": sorted(set(enzymes)),
         "name": name,
         "definition": definition,
+        **links,
     }
 
 
-def _extract_equation(text: str) -> str | None:
-    """Extract the EQUATION field as a single line string."""
-    equation = ""
-    capture_equation = False
-
-    for line in text.splitlines():
-        if line.startswith("EQUATION"):
-            capture_equation = True
-            equation = line.replace("EQUATION", "").strip()
-            continue
-
-        if capture_equation:
-            if line.startswith(" "):
-                equation += " " + line.strip()
-            else:
-                capture_equation = False
+def extract_reaction_links(text: EntryLike) -> ReactionLinks:
+    """Extract PATHWAY, MODULE, ORTHOLOGY and RCLASS ids from a reaction entry.
 
-    return equation or None
+    Each section line starts with one identifier followed by a description
+    (``rn00010  Glycolysis / Gluconeogenesis``); descriptions are dropped.
 
+    Args:
+        text: Raw KEGG reaction entry text or its tokenized sections.
 
-def _extract_field(text: str, field_name: str) -> str | None:
-    """Extract a single-line KEGG field with continuation lines."""
-    value = ""
-    capture = False
-
-    for line in text.splitlines():
-        if line.startswith(field_name):
-            capture = True
-            value = line.replace(field_name, "", 1).strip()
-            continue
+    Returns:
+        Sorted unique ids per section, empty lists when a section is absent.
+    """
+    sections = as_sections(text)
+    return {
+        "pathways": _section_ids(sections, "PATHWAY", _PATHWAY_ID),
+        "modules": _section_ids(sections, "MODULE", _MODULE_ID),
+        "orthologs": _section_ids(sections, "ORTHOLOGY", _ORTHOLOG_ID),
+        "rclasses": _section_ids(sections, "RCLASS", _RCLASS_ID),
+    }
 
-        if capture:
-            if line.startswith(" "):
-                value += " " + line.strip()
-            else:
-                break
 
-    return value or None
+def _section_ids(sections: KeggSections, label: str, pattern: re.Pattern[str]) -> list[str]:
+    """Collect the identifier leading each line of a section."""
+    ids: set[str] = set()
+    for line in sections.get(label, []):
+        match = pattern.match(line)
+        if match:
+            ids.add(match.group(0))
+    return sorted(ids)
 
 
 def _parse_equation(equation: str) -> tuple[bool, list[CompoundAmount], list[CompoundAmount]]:
     """Parse stoichiometry and reversibility from a KEGG equation."""
-    if "<=>" in equation:
-        reversible = True
-        left, right = equation.split("<=>", 1)
-    elif "=>" in equation:
-        reversible = False
-        left, right = equation.split("=>", 1)
-    else:
+    parsed = parse_equation(equation)
+    if parsed is None:
         return False, [], []
+    return parsed.reversible, _compound_amounts(parsed.substrates), _compound_amounts(parsed.products)
 
-    substrates = _parse_compound_side(left)
-    products = _parse_compound_side(right)
-    return reversible, substrates, products
 
+def _compound_amounts(terms: tuple[Stoichiometry, ...]) -> list[CompoundAmount]:
+    """Expand stoichiometry tuples into ``CompoundAmount`` records.
 
-def _parse_compound_side(side: str) -> list[CompoundAmount]:
-    """Parse a side of the equation into compound coefficients."""
+    Symbolic coefficients (e.g. "n+1") keep a numeric ``coef`` of 1 so graph
+    consumers can rely on a number, and carry the expression in ``coef_symbol``.
+    """
     compounds: list[CompoundAmount] = []
-
-    for token in side.split("+"):
-        match = re.match(r"^\s*(?:(\d+(?:\.\d+)?)\s+)?(C\d{5})\s*$", token)
-        if not match:
-            continue
-
-        coef_raw, compound_id = match.groups()
-        if coef_raw and "." in coef_raw:
-            coef: int | float = float(coef_raw)
-        elif coef_raw:
-            coef = int(coef_raw)
+    for compound_id, coef in terms:
+        if is_symbolic(coef):
+            compounds.append({"id": compound_id, "coef": 1, "coef_symbol": coef})
         else:
-            coef = 1
-
-        compounds.append({"id": compound_id, "coef": coef})
-
+            compounds.append({"id": compound_id, "coef": coef})
     return compounds
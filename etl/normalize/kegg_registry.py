@@ -0,0 +1,435 @@
+"""Batch-level registry of KEGG modules and reactions shared across pathways."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Sequence
+
+import requests
+
+from etl.checkpoints import STAGE_ENRICHED, STAGE_LOADED, STAGE_PARSED, CheckpointStore
+from etl.fetch.kegg_api import fetch_kegg_data, sync_kegg_release
+from etl.fetch.kegg_async import DEFAULT_CONCURRENCY, KEGG_RATE_LIMIT, AsyncKeggFetcher
+from etl.models.kegg_types import ParsedReactionFields, RawReactionRecord
+from etl.models.reaction_table import ReactionTable
+from etl.normalize.kegg_membership import MembershipIndex
+from etl.normalize.kegg_modules import extract_kegg_modules
+from etl.normalize.kegg_pipeline import extract_pathway_name, parse_reaction_texts
+from etl.normalize.kegg_reactions import extract_kegg_reactions
+
+logger = logging.getLogger(__name__)
+
+# Checkpoint key of the batch-wide registry stages (never a KEGG pathway id).
+REGISTRY_CHECKPOINT_KEY = "__registry__"
+
+
+@dataclass
+class PathwayMembership:
+    """Reactions resolved for one pathway of a batch."""
+
+    pathway_id: str
+    name: str | None
+    reaction_ids: list[str] = field(default_factory=list)
+
+
+NameResolver = Callable[[Sequence[str]], dict[str, str | None]]
+PathwayLoader = Callable[[ReactionTable, PathwayMembership, list[str]], None]
+
+
+class BatchRegistry:
+    """Fetch and parse every distinct module and reaction once per batch.
+
+    Pathways are resolved to reaction ids first (module entries shared by
+    several pathways are fetched once); then the union of reaction ids is
+    fetched and parsed in one pass. Pathway membership is kept separately
+    from the reactions, so loaders can write each reaction once and attach
+    ``HAS_REACTION`` edges afterwards.
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate_limit: float | None = KEGG_RATE_LIMIT,
+        membership: MembershipIndex | None = None,
+        fetch: Callable[..., str] | None = None,
+        parse_workers: int | None = None,
+        session: requests.Session | None = None,
+    ) -> None:
+        self.session = session or requests.Session()
+        self.membership = membership
+        self.parse_workers = parse_workers
+        self._fetch = fetch or fetch_kegg_data
+        self._use_network = fetch is None
+        self.fetcher = AsyncKeggFetcher(
+            concurrency=concurrency,
+            rate_limit=rate_limit,
+            session=self.session,
+            fetch=self._fetch,
+            use_cache=self._use_network,
+            adaptive=self._use_network,
+        )
+        self.pathways: dict[str, PathwayMembership] = {}
+        self.failures: dict[str, str] = {}
+        self.reactions: dict[str, ParsedReactionFields] = {}
+        # Unparsable entries only; ids whose fetch failed stay retryable.
+        self.skipped: set[str] = set()
+        self._references: dict[str, list[str]] = {}
+        self._module_reactions: dict[str, set[str]] = {}
+        self._release_synced = False
+        self._counts = {"pathway_references": 0, "module_references": 0, "reaction_references": 0}
+
+    def add_pathways(self, pathway_ids: Iterable[str]) -> None:
+        """Resolve pathways, then fetch and parse their not-yet-seen reactions.
+
+        A pathway whose entry cannot be fetched is recorded in ``failures``
+        and does not stop the rest of the batch.
+        """
+        resolved = self.resolve_pathways(pathway_ids)
+        self._add_reactions(set().union(*resolved.values()))
+
+    def add_memberships(self, memberships: Iterable[PathwayMembership]) -> None:
+        """Register pathways whose reaction ids are already known, then add their reactions.
+
+        Used when membership comes from bulk link tables (see
+        ``plan_organism``), so no pathway entries are fetched.
+        """
+        self._sync_release()
+        reaction_ids: set[str] = set()
+        for item in memberships:
+            if item.pathway_id in self.pathways:
+                continue
+            self._counts["pathway_references"] += 1
+            self._counts["reaction_references"] += len(item.reaction_ids)
+            self.pathways[item.pathway_id] = PathwayMembership(
+                item.pathway_id, item.name, sorted(item.reaction_ids)
+            )
+            self._references[item.pathway_id] = sorted(item.reaction_ids)
+            reaction_ids.update(item.reaction_ids)
+        self._add_reactions(reaction_ids)
+
+    def resolve_pathways(self, pathway_ids: Iterable[str]) -> dict[str, set[str]]:
+        """Resolve new pathways to the reaction ids they reference.
+
+        Registers a ``PathwayMembership`` per pathway (listing every
+        referenced id, parsed or not) without fetching reaction entries.
+
+        Returns:
+            Referenced reaction ids for each newly resolved pathway.
+        """
+        self._sync_release()
+        resolved: dict[str, tuple[str | None, list[str], set[str]]] = {}
+        for pathway_id in pathway_ids:
+            if pathway_id in self.pathways or pathway_id in resolved:
+                continue
+            try:
+                logger.info("Fetching pathway: %s", pathway_id)
+                pathway_text = self.fetcher.fetch_one("get", pathway_id)
+                if not pathway_text:
+                    # Fetches return "" after exhausting retries or on a 404.
+                    raise LookupError(f"KEGG returned no entry for {pathway_id}")
+                modules = extract_kegg_modules(pathway_text)
+                reactions = set(extract_kegg_reactions(pathway_text))
+                if self.membership is not None:
+                    reactions.update(self.membership.reactions_for_modules(modules))
+                    reactions.update(self.membership.reactions_for_pathway(pathway_id))
+                else:
+                    # The pathway->reaction link endpoint is more complete than
+                    # the R-ids embedded in pathway entries.
+                    links = self.fetcher.fetch_one("link/rn", pathway_id)
+                    reactions.update(extract_kegg_reactions(links))
+                resolved[pathway_id] = (extract_pathway_name(pathway_text), modules, reactions)
+            except Exception as exc:
+                self.failures[pathway_id] = str(exc)
+                logger.warning("Pathway %s failed: %s", pathway_id, exc)
+
+        if self.membership is None:
+            # Modules shared between pathways are fetched once per batch.
+            self._resolve_modules({m for _, modules, _ in resolved.values() for m in modules})
+
+        references: dict[str, set[str]] = {}
+        for pathway_id, (name, modules, reactions) in resolved.items():
+            for module_id in modules:
+                reactions.update(self._module_reactions.get(module_id, set()))
+            self._counts["pathway_references"] += 1
+            self._counts["module_references"] += len(modules)
+            self._counts["reaction_references"] += len(reactions)
+            self.pathways[pathway_id] = PathwayMembership(pathway_id, name, sorted(reactions))
+            self._references[pathway_id] = sorted(reactions)
+            references[pathway_id] = reactions
+        return references
+
+    def records_for(self, pathway_id: str) -> list[RawReactionRecord]:
+        """Return one pathway's reactions in the ``ingest_pathway`` record shape."""
+        pathway = self.pathways[pathway_id]
+        return [
+            {
+                "reaction_id": reaction_id,
+                "pathway_id": pathway.pathway_id,
+                "pathway_name": pathway.name,
+                **self.reactions[reaction_id],
+            }
+            for reaction_id in pathway.reaction_ids
+        ]
+
+    def reaction_records(self) -> list[RawReactionRecord]:
+        """Return every distinct reaction once, without pathway fields."""
+        return [
+            {"reaction_id": reaction_id, "pathway_id": None, "pathway_name": None, **parsed}
+            for reaction_id, parsed in sorted(self.reactions.items())
+        ]
+
+    def reaction_table(self) -> ReactionTable:
+        """Return every distinct reaction once as a columnar ``ReactionTable``.
+
+        Built from the parsed fields directly, without per-reaction records;
+        pathway links come from ``memberships``.
+        """
+        return ReactionTable.from_parsed(dict(sorted(self.reactions.items())))
+
+    def unfetched(self) -> set[str]:
+        """Referenced reaction ids that are neither parsed nor known to be unparsable."""
+        referenced = {rid for reaction_ids in self._references.values() for rid in reaction_ids}
+        return referenced - self.reactions.keys() - self.skipped
+
+    def retry_unfetched(self) -> None:
+        """Fetch referenced reactions again whose earlier fetch came back empty."""
+        missing = self.unfetched()
+        if missing:
+            self._add_reactions(missing)
+
+    def add_parsed(
+        self,
+        reaction_texts: dict[str, str],
+        parsed: dict[str, ParsedReactionFields],
+        skipped: Iterable[str],
+    ) -> None:
+        """Record ``parse_reaction_texts`` output for fetched reaction entries.
+
+        Skipped ids with an empty text were not fetched; they are left out of
+        ``skipped`` so a later call (or a resumed batch) fetches them again.
+        """
+        self.reactions.update(parsed)
+        self.skipped.update(rid for rid in skipped if reaction_texts.get(rid))
+
+    def memberships(self) -> list[PathwayMembership]:
+        """Return the resolved pathways in insertion order."""
+        return list(self.pathways.values())
+
+    def stats(self) -> dict[str, int]:
+        """Distinct entities fetched versus per-pathway references to them."""
+        return {
+            "pathways": len(self.pathways),
+            "failed_pathways": len(self.failures),
+            "distinct_modules": len(self._module_reactions),
+            "distinct_reactions": len(self.reactions) + len(self.skipped),
+            "parsed_reactions": len(self.reactions),
+            "skipped_reactions": len(self.skipped),
+            "unfetched_reactions": len(self.unfetched()),
+            **self._counts,
+        }
+
+    def to_checkpoint(self) -> dict[str, Any]:
+        """Return the resolved pathways and parsed reactions as JSON-serializable data.
+
+        Failed pathways and unfetched reactions are left out, so a restored
+        registry fetches them again.
+        """
+        return {
+            "pathways": [
+                [item.pathway_id, item.name, self._references[item.pathway_id]]
+                for item in self.pathways.values()
+            ],
+            "reactions": self.reactions,
+            "skipped": sorted(self.skipped),
+            "modules": {
+                module_id: sorted(reaction_ids)
+                for module_id, reaction_ids in self._module_reactions.items()
+            },
+            "counts": self._counts,
+        }
+
+    def restore_checkpoint(
+        self, state: dict[str, Any], pathway_ids: Iterable[str] | None = None
+    ) -> None:
+        """Restore pathways and reactions saved by ``to_checkpoint``.
+
+        With ``pathway_ids``, only those pathways (and their reactions) are
+        restored. Referenced reactions missing from the state are fetched by
+        ``retry_unfetched``.
+        """
+        wanted = set(pathway_ids) if pathway_ids is not None else None
+        referenced: set[str] = set()
+        for pathway_id, name, reaction_ids in state["pathways"]:
+            if wanted is not None and pathway_id not in wanted:
+                continue
+            self._references[pathway_id] = reaction_ids
+            self.pathways[pathway_id] = PathwayMembership(
+                pathway_id, name, [rid for rid in reaction_ids if rid in state["reactions"]]
+            )
+            referenced.update(reaction_ids)
+        self.reactions.update(
+            (rid, fields) for rid, fields in state["reactions"].items() if rid in referenced
+        )
+        self.skipped.update(state["skipped"])
+        for module_id, reaction_ids in state["modules"].items():
+            self._module_reactions[module_id] = set(reaction_ids)
+        self._counts.update(state["counts"])
+
+    def _sync_release(self) -> None:
+        if self._use_network and not self._release_synced:
+            # Confirm the KEGG release so unchanged cached entries can be reused.
+            sync_kegg_release(cache=self.fetcher.cache, session=self.session)
+            self._release_synced = True
+
+    def _add_reactions(self, reaction_ids: set[str]) -> None:
+        self._resolve_reactions(reaction_ids)
+        for pathway in self.pathways.values():
+            references = self._references.get(pathway.pathway_id, pathway.reaction_ids)
+            pathway.reaction_ids = [rid for rid in references if rid in self.reactions]
+
+        if self.membership is not None:
+            # Fold entry-listed links back into the shared index (see ingest_pathway).
+            self.membership.update_from_reactions(self.reaction_records())
+
+    def _resolve_modules(self, module_ids: set[str]) -> None:
+        missing = sorted(module_ids - self._module_reactions.keys())
+        if not missing:
+            return
+        module_texts = self.fetcher.fetch_entries(missing)
+        for module_id in missing:
+            self._module_reactions[module_id] = set(
+                extract_kegg_reactions(module_texts.get(module_id, ""))
+            )
+
+    def _resolve_reactions(self, reaction_ids: set[str]) -> None:
+        missing = sorted(reaction_ids - self.reactions.keys() - self.skipped)
+        logger.info(
+            "Distinct reactions to fetch: %d (of %d referenced)", len(missing), len(reaction_ids)
+        )
+        if not missing:
+            return
+        reaction_texts = self.fetcher.fetch_entries(missing)
+        parsed, skipped = parse_reaction_texts(
+            reaction_texts, cache=self.fetcher.cache, parse_workers=self.parse_workers
+        )
+        self.add_parsed(reaction_texts, parsed, skipped)
+
+
+@dataclass
+class RegistryBatchResult:
+    """Outcome of ``ingest_registry_batch``."""
+
+    registry: BatchRegistry
+    table: ReactionTable
+    successes: list[str] = field(default_factory=list)
+    failures: dict[str, str] = field(default_factory=dict)
+
+
+def ingest_registry_batch(
+    registry: BatchRegistry,
+    pathway_ids: Sequence[str],
+    *,
+    resolve_names: NameResolver,
+    load: PathwayLoader,
+    continue_on_error: bool = True,
+    store: CheckpointStore | None = None,
+    batch_id: str | None = None,
+) -> RegistryBatchResult:
+    """Fetch, parse, enrich and load a batch through a shared registry.
+
+    Distinct reactions are fetched, parsed and enriched once for the whole
+    batch, but loading runs one pathway at a time: ``load`` receives the
+    table, the pathway and its reactions not loaded by an earlier pathway,
+    and is expected to write those reactions plus the pathway's membership
+    edges. A pathway whose entry, enrichment or load fails is recorded in
+    ``failures`` without affecting the others. If batch-wide enrichment
+    fails, each pathway resolves the names of its own compounds instead.
+
+    With a ``store`` and ``batch_id``, the parsed registry and the enriched
+    compound names are checkpointed under ``REGISTRY_CHECKPOINT_KEY`` and
+    each pathway is checkpointed as loaded once its load finishes. A rerun
+    restores the requested pathways from the registry checkpoint instead of
+    refetching them, retries reactions whose fetch came back empty, and skips
+    loaded pathways.
+
+    Args:
+        registry: Registry to add the pathways to (pathways it already
+            holds, e.g. from ``build_organism_registry``, are loaded too).
+        pathway_ids: Pathways to resolve.
+        resolve_names: Maps compound ids to names (e.g. a
+            ``resolve_compound_names`` partial).
+        load: Per-pathway loader, see above.
+        continue_on_error: When False, the first failure is raised.
+        store: Optional checkpoint store.
+        batch_id: Batch the checkpoints belong to.
+
+    Returns:
+        The registry, its enriched reaction table and per-pathway outcomes
+        (pathways loaded by an earlier run are in neither list).
+    """
+    checkpoint = store is not None and batch_id is not None
+    stage, payload = store.load(batch_id, REGISTRY_CHECKPOINT_KEY) if checkpoint else (None, None)
+    done = store.completed(batch_id) if checkpoint else set()
+    # Reactions of pathways loaded by an earlier run of this batch are already written.
+    loaded: set[str] = set()
+    if stage is not None:
+        state = payload["registry"]
+        registry.restore_checkpoint(state, pathway_ids)
+        loaded = {rid for pid, _, rids in state["pathways"] if pid in done for rid in rids}
+        logger.info("Resuming batch %s registry after stage '%s'", batch_id, stage)
+
+    known = (len(registry.pathways), len(registry.reactions))
+    registry.add_pathways(pathway_ids)
+    registry.retry_unfetched()
+    if checkpoint and (stage is None or (len(registry.pathways), len(registry.reactions)) != known):
+        # New pathways or reactions invalidate any stored enrichment.
+        stage = STAGE_PARSED
+        store.save(batch_id, REGISTRY_CHECKPOINT_KEY, stage, {"registry": registry.to_checkpoint()})
+
+    result = RegistryBatchResult(registry, registry.reaction_table(), failures=dict(registry.failures))
+    if result.failures and not continue_on_error:
+        pathway_id, error = next(iter(result.failures.items()))
+        raise RuntimeError(f"Pathway ingestion failed: {pathway_id}: {error}")
+
+    table = result.table
+    if stage == STAGE_ENRICHED:
+        table.set_compound_names(payload["compound_names"])
+    else:
+        try:
+            table.set_compound_names(resolve_names(table.compound_ids))
+        except Exception as exc:
+            logger.warning("Batch compound enrichment failed (%s); enriching per pathway", exc)
+        else:
+            if checkpoint:
+                store.save(
+                    batch_id,
+                    REGISTRY_CHECKPOINT_KEY,
+                    STAGE_ENRICHED,
+                    {
+                        "registry": registry.to_checkpoint(),
+                        "compound_names": dict(zip(table.compound_ids, table.compound_names)),
+                    },
+                )
+
+    for item in registry.memberships():
+        if item.pathway_id in done:
+            continue
+        reaction_ids = [rid for rid in item.reaction_ids if rid not in loaded]
+        try:
+            compound_ids = [] if table.enriched else table.compound_ids_for(reaction_ids)
+            if compound_ids:
+                table.update_compound_names(resolve_names(compound_ids))
+            load(table, item, reaction_ids)
+        except Exception as exc:
+            result.failures[item.pathway_id] = str(exc)
+            logger.warning("Pathway %s failed: %s", item.pathway_id, exc)
+            if not continue_on_error:
+                raise
+            continue
+        if checkpoint:
+            store.save(batch_id, item.pathway_id, STAGE_LOADED)
+        loaded.update(reaction_ids)
+        result.successes.append(item.pathway_id)
+    return result
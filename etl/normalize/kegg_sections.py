@@ -0,0 +1,71 @@
+"""Single-pass tokenizer for KEGG flat-file entries."""
+
+from __future__ import annotations
+
+from typing import Union
+
+# KEGG flat files put section labels in columns 0-11 and values from column 12.
+KEGG_LABEL_WIDTH = 12
+
+KeggSections = dict[str, list[str]]
+EntryLike = Union[str, KeggSections]
+
+
+def tokenize_entry(text: str) -> KeggSections:
+    """Split a KEGG entry into a section -> value lines mapping in one pass.
+
+    A line starting in column 0 opens a section named by its first token;
+    indented lines continue the open section (sub-labels such as
+    ``AUTHORS`` under ``REFERENCE`` stay part of their parent). Values are
+    stripped of the label columns and surrounding whitespace. A blank line
+    closes the open section, so indented lines after it are dropped, but a
+    later labeled line still opens a new section; only the ``///``
+    terminator ends the entry.
+
+    Args:
+        text: Raw KEGG flat-file entry (reaction, compound, pathway, ...).
+
+    Returns:
+        Mapping of section label to its non-empty value lines, in order.
+    """
+    sections: KeggSections = {}
+    current: list[str] | None = None
+
+    for line in text.splitlines():
+        if not line:
+            current = None
+            continue
+        if line[0] == " " or line[0] == "\t":
+            # Continuation values start at column 12; stripping the whole line
+            # also keeps sub-labels (e.g. "AUTHORS") that sit in the label columns.
+            if current is not None:
+                value = line.strip()
+                if value:
+                    current.append(value)
+            continue
+        if line.startswith("///"):
+            break
+
+        label, _, value = line.partition(" ")
+        current = sections.setdefault(label, [])
+        value = value.strip()
+        if value:
+            current.append(value)
+
+    return sections
+
+
+def as_sections(entry: EntryLike) -> KeggSections:
+    """Return ``entry`` tokenized, passing already-tokenized sections through."""
+    return entry if isinstance(entry, dict) else tokenize_entry(entry)
+
+
+def section_lines(entry: EntryLike, label: str) -> list[str]:
+    """Return the value lines of one section ([] when absent)."""
+    return as_sections(entry).get(label, [])
+
+
+def section_text(entry: EntryLike, label: str) -> str | None:
+    """Return a section's value with continuation lines joined by spaces."""
+    lines = as_sections(entry).get(label)
+    return " ".join(lines) if lines else None
@@ -0,0 +1,327 @@
+"""Streaming ingestion: fetch, parse, enrich and load connected by bounded queues."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from etl.enrich.compound_enrichment import (
+    ENRICH_MODE_ENTRY,
+    attach_compound_names,
+    collect_compound_ids,
+    resolve_compound_names,
+)
+from etl.fetch.kegg_api import KEGG_MAX_GET_ENTRIES
+from etl.fetch.kegg_async import KEGG_RATE_LIMIT
+from etl.models.kegg_types import RawReactionRecord
+from etl.normalize.kegg_membership import MembershipIndex
+from etl.normalize.kegg_pipeline import parse_reaction_texts
+from etl.normalize.kegg_registry import BatchRegistry
+
+DEFAULT_QUEUE_SIZE = 8
+
+_DONE = object()
+# How often blocked workers re-check whether the pipeline was aborted.
+_POLL_SECONDS = 0.1
+
+
+@dataclass
+class Stage:
+    """One pipeline stage: ``fn`` maps an input item to an output item.
+
+    Returning None drops the item. ``workers`` threads run ``fn``
+    concurrently, so it must be thread-safe.
+    """
+
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+
+
+@dataclass
+class StageStats:
+    """Per-stage counters for a pipeline run."""
+
+    name: str
+    workers: int
+    items_in: int = 0
+    items_out: int = 0
+    busy_seconds: float = 0.0
+    # Time spent waiting for room in the next stage's queue (backpressure).
+    blocked_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+        }
+
+
+@dataclass
+class StreamResult:
+    """Outputs of the last stage plus timing for every stage."""
+
+    outputs: list[Any] = field(default_factory=list)
+    stages: list[StageStats] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "wall_seconds": round(self.wall_seconds, 3),
+            "stages": {stats.name: stats.as_dict() for stats in self.stages},
+        }
+
+
+def run_stages(
+    source: Iterable[Any],
+    stages: Sequence[Stage],
+    *,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> StreamResult:
+    """Run ``source`` items through ``stages`` with bounded queues between them.
+
+    Every stage reads from its own queue of at most ``queue_size`` items, so
+    a slow stage blocks its producers instead of letting work pile up in
+    memory, and all stages run at the same time. The first exception raised
+    by the source or any stage aborts the run and is re-raised.
+
+    Returns:
+        Items produced by the last stage (completion order) and stage stats.
+    """
+    if not stages:
+        raise ValueError("at least one stage is required")
+    if queue_size < 1 or any(stage.workers < 1 for stage in stages):
+        raise ValueError("queue_size and stage workers must be at least 1")
+
+    inboxes: list[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in stages]
+    stats = [StageStats(stage.name, stage.workers) for stage in stages]
+    remaining = [stage.workers for stage in stages]
+    result = StreamResult(stages=stats)
+    lock = threading.Lock()
+    abort = threading.Event()
+    errors: list[BaseException] = []
+
+    def _put(target: queue.Queue, item: Any) -> bool:
+        while not abort.is_set():
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fail(exc: BaseException) -> None:
+        with lock:
+            errors.append(exc)
+        abort.set()
+
+    def _worker(index: int) -> None:
+        stage, stage_stats = stages[index], stats[index]
+        inbox = inboxes[index]
+        outbox = inboxes[index + 1] if index + 1 < len(stages) else None
+        while not abort.is_set():
+            try:
+                item = inbox.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                with lock:
+                    remaining[index] -= 1
+                    last = remaining[index] == 0
+                # The stage's last worker tells every downstream worker to stop.
+                if last and outbox is not None:
+                    for _ in range(stages[index + 1].workers):
+                        _put(outbox, _DONE)
+                return
+
+            started = time.perf_counter()
+            try:
+                output = stage.fn(item)
+            except BaseException as exc:  # noqa: BLE001 - re-raised by run_stages
+                _fail(exc)
+                return
+            finished = time.perf_counter()
+            with lock:
+                stage_stats.items_in += 1
+                stage_stats.busy_seconds += finished - started
+            if output is None:
+                continue
+            if outbox is None:
+                with lock:
+                    result.outputs.append(output)
+                    stage_stats.items_out += 1
+                continue
+            if not _put(outbox, output):
+                return
+            with lock:
+                stage_stats.items_out += 1
+                stage_stats.blocked_seconds += time.perf_counter() - finished
+
+    threads = [
+        threading.Thread(target=_worker, args=(index,), name=f"stream-{stage.name}-{n}", daemon=True)
+        for index, stage in enumerate(stages)
+        for n in range(stage.workers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    try:
+        for item in source:
+            if not _put(inboxes[0], item):
+                break
+        for _ in range(stages[0].workers):
+            _put(inboxes[0], _DONE)
+    except BaseException as exc:  # noqa: BLE001 - re-raised below
+        _fail(exc)
+    for thread in threads:
+        thread.join()
+    result.wall_seconds = time.perf_counter() - started
+
+    if errors:
+        raise errors[0]
+    return result
+
+
+def stream_ingest_pathways(
+    pathway_ids: Sequence[str],
+    *,
+    membership: MembershipIndex | None = None,
+    fetch: Callable[..., str] | None = None,
+    rate_limit: float | None = KEGG_RATE_LIMIT,
+    enrich: bool = True,
+    enrich_mode: str = ENRICH_MODE_ENTRY,
+    compound_cache_path: str | Path | None = None,
+    load: Callable[[list[RawReactionRecord]], None] | None = None,
+    fetch_workers: int = 4,
+    parse_threads: int = 1,
+    enrich_workers: int = 1,
+    load_workers: int = 1,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    chunk_size: int = KEGG_MAX_GET_ENTRIES,
+) -> tuple[BatchRegistry, StreamResult]:
+    """Ingest pathways with fetch, parse, enrich and load running concurrently.
+
+    Pathways are resolved one at a time; each new chunk of reaction ids is
+    fetched (one ``get`` per chunk and fetch worker), parsed, enriched and
+    handed to ``load`` while later chunks are still being downloaded.
+    Reactions shared between pathways flow through once. Stage workers are
+    threads: parse threads overlap with I/O-bound stages but do not parse in
+    parallel with each other. ``parse_threads`` is therefore not the
+    process count that ``parse_workers``/``KEGG_PARSE_WORKERS`` set elsewhere;
+    parsing never uses the process pool here.
+
+    Args:
+        pathway_ids: Pathways to ingest.
+        membership: Optional bulk link index (see ``BatchRegistry``).
+        fetch: Optional ``fetch_kegg_data``-compatible source.
+        rate_limit: KEGG requests per second (None disables throttling).
+        enrich: Attach compound names between parse and load.
+        enrich_mode: ``resolve_compound_names`` mode.
+        compound_cache_path: Compound name cache file.
+        load: Callable receiving each enriched batch of records (e.g. a
+            ``load_reactions`` partial); without it, batches are collected in
+            ``StreamResult.outputs``.
+        fetch_workers, parse_threads, enrich_workers, load_workers: Threads
+            per stage.
+        queue_size: Maximum batches waiting in front of each stage.
+        chunk_size: Reaction ids per ``get`` request.
+
+    Returns:
+        The registry (pathway membership and parsed reactions) and the run
+        result; attach membership edges after loading, e.g. with
+        ``load_pathway_memberships``.
+    """
+    registry = BatchRegistry(
+        concurrency=fetch_workers,
+        rate_limit=rate_limit,
+        membership=membership,
+        fetch=fetch,
+    )
+    cache = registry.fetcher.cache
+    names = _CompoundNameMemo(
+        cache_path=compound_cache_path,
+        mode=enrich_mode,
+        fetch=fetch,
+        session=registry.session,
+    )
+
+    def _chunks() -> Iterator[list[str]]:
+        emitted: set[str] = set()
+        for pathway_id in pathway_ids:
+            for reactions in registry.resolve_pathways([pathway_id]).values():
+                new_ids = sorted(reactions - emitted)
+                emitted.update(new_ids)
+                for start in range(0, len(new_ids), chunk_size):
+                    yield new_ids[start : start + chunk_size]
+
+    def _fetch(chunk: list[str]) -> dict[str, str]:
+        batch_size = min(chunk_size, KEGG_MAX_GET_ENTRIES)
+        return registry.fetcher.fetch_entries(chunk, batch_size=batch_size)
+
+    def _parse(texts: dict[str, str]) -> list[RawReactionRecord] | None:
+        # Parallelism comes from the stage's threads, not a process pool.
+        parsed, skipped = parse_reaction_texts(texts, cache=cache, parse_workers=1)
+        with registry_lock:
+            registry.add_parsed(texts, parsed, skipped)
+        records: list[RawReactionRecord] = [
+            {"reaction_id": reaction_id, "pathway_id": None, "pathway_name": None, **fields}
+            for reaction_id, fields in parsed.items()
+        ]
+        return records or None
+
+    def _enrich(records: list[RawReactionRecord]) -> list[RawReactionRecord]:
+        return attach_compound_names(records, names.resolve(collect_compound_ids(records)))
+
+    def _load(records: list[RawReactionRecord]) -> list[RawReactionRecord] | None:
+        if load is None:
+            return records
+        load(records)
+        return None
+
+    registry_lock = threading.Lock()
+    stages = [
+        Stage("fetch", _fetch, fetch_workers),
+        Stage("parse", _parse, parse_threads),
+        *([Stage("enrich", _enrich, enrich_workers)] if enrich else []),
+        Stage("load", _load, load_workers),
+    ]
+    result = run_stages(_chunks(), stages, queue_size=queue_size)
+
+    for pathway in registry.pathways.values():
+        pathway.reaction_ids = [rid for rid in pathway.reaction_ids if rid in registry.reactions]
+    busy = sum(stats.busy_seconds for stats in result.stages)
+    print(
+        f"Streamed {len(registry.reactions)} reactions for {len(registry.pathways)} pathways "
+        f"in {result.wall_seconds:.2f}s (stage busy time {busy:.2f}s)"
+    )
+    return registry, result
+
+
+class _CompoundNameMemo:
+    """Thread-safe compound name lookups shared by enrich workers.
+
+    Names already resolved in this run are served from memory; only unseen
+    ids go through ``resolve_compound_names``, one call at a time so the
+    JSON name cache is never written concurrently.
+    """
+
+    def __init__(self, **options: Any) -> None:
+        self._options = options
+        self._names: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, compound_ids: set[str]) -> dict[str, str | None]:
+        with self._lock:
+            if not compound_ids <= self._names.keys():
+                self._names.update(resolve_compound_names(compound_ids, **self._options))
+                # Ids KEGG does not know are remembered as unnamed, not refetched.
+                for compound_id in compound_ids:
+                    self._names.setdefault(compound_id, None)
+            return {compound_id: self._names.get(compound_id) for compound_id in compound_ids}
@@ -13,3 +13,7 @@ REQUIRE c.id IS UNIQUE;
 CREATE CONSTRAINT enzyme_ec_unique IF NOT EXISTS
 FOR (e:Enzyme)
 REQUIRE e.ec IS UNIQUE;
+
+CREATE CONSTRAINT ortholog_id_unique IF NOT EXISTS
+FOR (k:Ortholog)
+REQUIRE k.id IS UNIQUE;
@@ -5,30 +5,81 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+import time
+from collections import deque
+from contextlib import nullcontext
 from pathlib import Path
 
 from prefect import flow, task
+from prefect.task_runners import ConcurrentTaskRunner
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from etl.enrich.compound_enrichment import enrich_compound_names
-from etl.load.neo4j_loader import get_driver, load_reactions
+COMPOUND_CACHE_PATH = REPO_ROOT / "data" / "cache" / "compound_names.json"
+
+from etl.checkpoints import (
+    STAGE_ENRICHED,
+    STAGE_FETCHED,
+    STAGE_LOADED,
+    STAGE_PARSED,
+    CheckpointStore,
+    run_pathway_stages,
+)
+from etl.config import get_settings
+from etl.enrich.compound_enrichment import (
+    ENRICH_MODE_BULK,
+    collect_compound_ids,
+    enrich_compound_names,
+    refresh_compound_name_table,
+    resolve_compound_names,
+)
+from etl.fetch.kegg_archive import use_archive
+from etl.fetch.kegg_async import AsyncKeggFetcher
+from etl.fetch.kegg_cache import get_default_cache
+from etl.fetch.kegg_control import get_flow_control
+from etl.fetch.kegg_metrics import get_fetch_metrics
+from etl.fetch.kegg_singleflight import get_singleflight
+from etl.incremental_sync import SYNC_MANIFEST_PATH, ChangeSet, SyncManifest, plan_sync
+from etl.load.neo4j_loader import (
+    apply_change_set,
+    get_driver,
+    load_pathway_memberships,
+    load_reaction_table,
+    load_reactions,
+)
 from etl.models.kegg_types import RawReactionRecord
-from etl.normalize.kegg_pipeline import ingest_pathway
+from etl.models.reaction_table import ReactionTable
+from etl.normalize.kegg_membership import MembershipIndex, load_membership_index
+from etl.normalize.kegg_organism import OrganismPlan, build_organism_registry, organism_report, plan_organism
+from etl.normalize.kegg_pipeline import fetch_pathway, ingest_pathway, parse_pathway
+from etl.normalize.kegg_registry import (
+    BatchRegistry,
+    PathwayMembership,
+    RegistryBatchResult,
+    ingest_registry_batch,
+)
+from etl.streaming import DEFAULT_QUEUE_SIZE, stream_ingest_pathways
 
 
 @task
-def ingest_pathway_task(pathway_id: str) -> list[RawReactionRecord]:
+def ingest_pathway_task(
+    pathway_id: str,
+    membership: MembershipIndex | None = None,
+) -> list[RawReactionRecord]:
     """Ingest raw reactions for a pathway."""
-    return ingest_pathway(pathway_id)
+    return ingest_pathway(pathway_id, membership=membership)
 
 
 @task
 def enrich_entities_task(reactions: list[RawReactionRecord]) -> list[RawReactionRecord]:
     """Enrich reactions with compound metadata."""
-    return enrich_compound_names(reactions)
+    return enrich_compound_names(
+        reactions,
+        cache_path=COMPOUND_CACHE_PATH,
+        mode=ENRICH_MODE_BULK,
+    )
 
 
 @task
@@ -42,52 +93,332 @@ def load_graph_task(reactions: list[RawReactionRecord]) -> None:
         driver.close()
 
 
+@task
+def pathway_chain_task(
+    pathway_id: str,
+    membership: MembershipIndex | None = None,
+    batch_id: str | None = None,
+    fetcher: AsyncKeggFetcher | None = None,
+) -> dict[str, int]:
+    """Run fetch -> parse -> enrich -> load for one pathway as a single unit of work.
+
+    Submitted concurrently by ``batch_ingestion_flow`` with one shared
+    ``fetcher``, so every chain's requests draw from the same rate limit;
+    returns the pathway's ingestion stats. With a ``batch_id``, every stage
+    is checkpointed and a rerun resumes after the last completed one.
+    """
+
+    def _load(records: list[RawReactionRecord]) -> dict[str, int]:
+        driver = get_driver()
+        try:
+            load_reactions(driver, records)
+        finally:
+            driver.close()
+        return _reaction_stats(records)
+
+    steps = [
+        (
+            STAGE_FETCHED,
+            lambda _: fetch_pathway(pathway_id, fetcher=fetcher, membership=membership),
+        ),
+        (
+            STAGE_PARSED,
+            lambda fetched: parse_pathway(fetched, membership=membership, cache=get_default_cache()),
+        ),
+        (
+            STAGE_ENRICHED,
+            lambda records: enrich_compound_names(
+                records, cache_path=COMPOUND_CACHE_PATH, mode=ENRICH_MODE_BULK
+            ),
+        ),
+        (STAGE_LOADED, _load),
+    ]
+    store = CheckpointStore() if batch_id else None
+    try:
+        return run_pathway_stages(pathway_id, steps, store=store, batch_id=batch_id)
+    finally:
+        if store is not None:
+            store.close()
+
+
+@task
+def warm_compound_names_task() -> None:
+    """Refresh the bulk compound name table once before parallel chains start."""
+    refresh_compound_name_table(COMPOUND_CACHE_PATH)
+
+
+@task
+def apply_schema_task() -> None:
+    """Apply graph schema constraints once for a batch."""
+    driver = get_driver()
+    try:
+        _apply_schema(driver)
+    finally:
+        driver.close()
+
+
+@task
+def build_organism_registry_task(organism: str) -> tuple[OrganismPlan, BatchRegistry]:
+    """Plan an organism's pathways and fetch and parse each distinct reaction once."""
+    plan, _index = plan_organism(organism)
+    registry = build_organism_registry(plan)
+    print(f"Organism registry: {registry.stats()}")
+    return plan, registry
+
+
+@task
+def registry_ingest_task(
+    registry: BatchRegistry,
+    pathway_ids: list[str],
+    continue_on_error: bool = True,
+    batch_id: str | None = None,
+) -> RegistryBatchResult:
+    """Fetch, parse and enrich each distinct reaction once, then load pathway by pathway.
+
+    A pathway's reactions not written by an earlier pathway are loaded
+    together with its membership edges, so a failure only fails that pathway.
+    With a ``batch_id``, the registry stages and each loaded pathway are
+    checkpointed, so a rerun resumes where this one stopped.
+    """
+    driver = get_driver()
+    store = CheckpointStore() if batch_id else None
+    try:
+        _apply_schema(driver)
+
+        def _load(table: ReactionTable, item: PathwayMembership, reaction_ids: list[str]) -> None:
+            load_reaction_table(driver, table, reaction_ids=reaction_ids)
+            load_pathway_memberships(driver, [(item.pathway_id, item.name, item.reaction_ids)])
+
+        result = ingest_registry_batch(
+            registry,
+            pathway_ids,
+            resolve_names=lambda compound_ids: resolve_compound_names(
+                compound_ids, cache_path=COMPOUND_CACHE_PATH, mode=ENRICH_MODE_BULK
+            ),
+            load=_load,
+            continue_on_error=continue_on_error,
+            store=store,
+            batch_id=batch_id,
+        )
+    finally:
+        driver.close()
+        if store is not None:
+            store.close()
+    print(f"Batch registry: {registry.stats()}")
+    return result
+
+
+@task
+def stream_ingest_task(
+    pathway_ids: list[str],
+    membership: MembershipIndex | None = None,
+    fetch_workers: int = 4,
+    parse_threads: int = 1,
+    enrich_workers: int = 1,
+    load_workers: int = 2,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> dict[str, object]:
+    """Stream fetch -> parse -> enrich -> load, then attach pathway edges."""
+    driver = get_driver()
+    try:
+        _apply_schema(driver)
+        registry, result = stream_ingest_pathways(
+            pathway_ids,
+            membership=membership,
+            enrich_mode=ENRICH_MODE_BULK,
+            compound_cache_path=COMPOUND_CACHE_PATH,
+            load=lambda records: load_reactions(driver, records),
+            fetch_workers=fetch_workers,
+            parse_threads=parse_threads,
+            enrich_workers=enrich_workers,
+            load_workers=load_workers,
+            queue_size=queue_size,
+        )
+        load_pathway_memberships(
+            driver,
+            [(item.pathway_id, item.name, item.reaction_ids) for item in registry.memberships()],
+        )
+    finally:
+        driver.close()
+
+    stream = result.summary()
+    print(f"Streaming stages: {stream}")
+    return {
+        "successes": [pathway_id for pathway_id in pathway_ids if pathway_id in registry.pathways],
+        "failures": [
+            {"pathway_id": pathway_id, "error": error}
+            for pathway_id, error in registry.failures.items()
+        ],
+        "stream": stream,
+        "registry": registry.stats(),
+    }
+
+
+@task
+def plan_sync_task(
+    manifest_path: str,
+    pathway_ids: list[str] | None = None,
+    force: bool = False,
+) -> ChangeSet:
+    """Diff the sync manifest against KEGG and fetch new or changed entries."""
+    manifest = SyncManifest(manifest_path)
+    try:
+        return plan_sync(manifest, pathway_ids, force=force)
+    finally:
+        manifest.close()
+
+
+@task
+def apply_change_set_task(change_set: ChangeSet, manifest_path: str) -> None:
+    """Apply a change set to Neo4j, then record it in the sync manifest."""
+    if not change_set.is_empty:
+        driver = get_driver()
+        try:
+            _apply_schema(driver)
+            apply_change_set(driver, change_set)
+        finally:
+            driver.close()
+    # Only recorded once loaded, so a failed load is retried by the next sync.
+    manifest = SyncManifest(manifest_path)
+    try:
+        manifest.apply(change_set)
+    finally:
+        manifest.close()
+
+
+@task
+def load_snapshot_task(snapshot_path: str, pathway_ids: list[str] | None = None) -> int:
+    """Reload Neo4j from a Parquet snapshot instead of fetching from KEGG."""
+    from etl.load.parquet_snapshot import load_snapshot
+
+    table = load_snapshot(snapshot_path, pathway_ids=pathway_ids)
+    driver = get_driver()
+    try:
+        _apply_schema(driver)
+        load_reaction_table(driver, table)
+    finally:
+        driver.close()
+    return len(table)
+
+
 @task(persist_result=True)
 def ingest_stats(reactions: list[RawReactionRecord]) -> dict[str, int]:
     """Persist basic ingestion stats for observability."""
-    compound_ids: set[str] = set()
-    for reaction in reactions:
-        for compound in reaction.get("substrates", []):
-            compound_ids.add(compound["id"])
-        for compound in reaction.get("products", []):
-            compound_ids.add(compound["id"])
+    return _reaction_stats(reactions)
 
-    return {
-        "reactions": len(reactions),
-        "compounds": len(compound_ids),
-    }
+
+@task(persist_result=True)
+def table_stats(table: ReactionTable) -> dict[str, int]:
+    """Persist basic ingestion stats for a reaction table."""
+    return {"reactions": len(table), "compounds": len(table.compound_ids)}
+
+
+@task(persist_result=True)
+def fetch_stats() -> dict[str, object]:
+    """Persist KEGG fetch telemetry (latency, bytes, retries, cache) for the run."""
+    summary = get_fetch_metrics().snapshot()
+    summary["coalescing"] = get_singleflight().stats()
+    summary["flow_control"] = get_flow_control().snapshot()
+    totals = summary["totals"]
+    print(
+        "KEGG fetch summary: "
+        f"{totals['requests']} requests, {totals['retries']} retries, "
+        f"{totals['bytes']} bytes, cache hit ratio {totals['cache_hit_ratio']}"
+    )
+    return summary
 
 
 @flow(name="kegg_pathway_ingestion")
-def ingestion_flow(pathway_id: str = "hsa00010") -> None:
-    """Run ingestion -> enrichment -> loading for a single pathway."""
-    raw_reactions = ingest_pathway_task(pathway_id)
-    enriched_reactions = enrich_entities_task(raw_reactions)
-    ingest_stats(enriched_reactions)
-    load_graph_task(enriched_reactions)
+def ingestion_flow(
+    pathway_id: str = "hsa00010",
+    archive_path: str | None = None,
+    archive_mode: str | None = None,
+) -> None:
+    """Run ingestion -> enrichment -> loading for a single pathway.
+
+    Set ``archive_mode`` to "record" or "replay" (with ``archive_path``) to
+    capture KEGG traffic or rerun deterministically without network.
+    """
+    _reset_fetch_telemetry()
+    with _archive_context(archive_path, archive_mode) as archive:
+        raw_reactions = ingest_pathway_task(pathway_id)
+        enriched_reactions = enrich_entities_task(raw_reactions)
+        ingest_stats(enriched_reactions)
+        fetch_stats()
+        load_graph_task(enriched_reactions)
+        if archive is not None:
+            print(f"KEGG archive summary: {archive.summary()}")
 
 
-@flow(name="kegg_batch_pathway_ingestion")
+@flow(name="kegg_batch_pathway_ingestion", task_runner=ConcurrentTaskRunner())
 def batch_ingestion_flow(
     pathway_ids: list[str] | str,
     continue_on_error: bool = True,
+    archive_path: str | None = None,
+    archive_mode: str | None = None,
+    shared_registry: bool = True,
+    max_concurrency: int | None = None,
+    batch_id: str | None = None,
 ) -> dict[str, object]:
-    """Run ingestion for multiple pathways and return per-pathway outcomes."""
+    """Run ingestion for multiple pathways and return per-pathway outcomes.
+
+    With ``shared_registry`` (default), modules and reactions shared between
+    pathways are fetched, parsed, enriched and loaded once for the whole
+    batch, and pathway membership edges are attached afterwards. Otherwise
+    each pathway runs its own fetch -> parse -> enrich -> load chain, with up
+    to ``max_concurrency`` chains in flight (defaults to ``PATHWAY_CONCURRENCY``).
+
+    With a ``batch_id``, progress is checkpointed under ``data/checkpoints/``
+    and rerunning the same batch id skips pathways that were already loaded.
+    The shared registry also checkpoints its parsed and enriched stages and
+    marks each pathway loaded as its load finishes; per-pathway chains
+    resume at their first unfinished stage.
+    """
     normalized_ids = _normalize_pathway_ids(pathway_ids)
     successes: list[str] = []
     failures: list[dict[str, str]] = []
 
-    for pathway_id in normalized_ids:
+    completed: set[str] = set()
+    if batch_id:
+        store = CheckpointStore()
         try:
-            raw_reactions = ingest_pathway_task(pathway_id)
-            enriched_reactions = enrich_entities_task(raw_reactions)
-            ingest_stats(enriched_reactions)
-            load_graph_task(enriched_reactions)
-            successes.append(pathway_id)
-        except Exception as exc:  # pragma: no cover - orchestration boundary
-            failures.append({"pathway_id": pathway_id, "error": str(exc)})
-            if not continue_on_error:
-                raise
+            completed = store.completed(batch_id) & set(normalized_ids)
+        finally:
+            store.close()
+        if completed:
+            print(f"Batch {batch_id}: {len(completed)} pathway(s) already loaded; skipping them")
+    pending = [pathway_id for pathway_id in normalized_ids if pathway_id not in completed]
+
+    _reset_fetch_telemetry()
+    with _archive_context(archive_path, archive_mode) as archive:
+        # Resolve pathway/module membership for the whole batch from two bulk
+        # link tables instead of per-pathway module and link/rn requests.
+        membership = load_membership_index() if pending else None
+
+        if shared_registry:
+            _run_registry_batch(
+                pending, membership, continue_on_error, successes, failures, batch_id
+            )
+        else:
+            _run_parallel_batch(
+                pending,
+                membership,
+                continue_on_error,
+                max_concurrency or get_settings().pathway_concurrency,
+                successes,
+                failures,
+                batch_id,
+            )
+
+        successes = [
+            pathway_id
+            for pathway_id in normalized_ids
+            if pathway_id in completed or pathway_id in successes
+        ]
+
+        fetch_stats()
+        if archive is not None:
+            print(f"KEGG archive summary: {archive.summary()}")
 
     return {
         "total": len(normalized_ids),
@@ -98,6 +429,237 @@ def batch_ingestion_flow(
     }
 
 
+def _run_registry_batch(
+    pathway_ids: list[str],
+    membership: MembershipIndex | None,
+    continue_on_error: bool,
+    successes: list[str],
+    failures: list[dict[str, str]],
+    batch_id: str | None = None,
+) -> None:
+    """Ingest a batch through one ``BatchRegistry`` and record per-pathway outcomes."""
+    if not pathway_ids:
+        return
+    result = registry_ingest_task(
+        BatchRegistry(membership=membership), pathway_ids, continue_on_error, batch_id
+    )
+    table_stats(result.table)
+    successes.extend(result.successes)
+    failures.extend(
+        {"pathway_id": pathway_id, "error": error} for pathway_id, error in result.failures.items()
+    )
+
+
+def _run_parallel_batch(
+    pathway_ids: list[str],
+    membership: MembershipIndex | None,
+    continue_on_error: bool,
+    max_concurrency: int,
+    successes: list[str],
+    failures: list[dict[str, str]],
+    batch_id: str | None = None,
+) -> None:
+    """Submit one chain per pathway, keeping at most ``max_concurrency`` in flight.
+
+    A failed chain only fails its own pathway. Without ``continue_on_error``
+    no further chains are submitted after the first failure; chains already
+    running are waited for before it is raised. Outcomes are recorded in
+    input order.
+    """
+    if not pathway_ids:
+        return
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    # Shared one-off work happens before the chains, not once per chain.
+    apply_schema_task()
+    warm_compound_names_task()
+    # One fetcher (and rate limit) for every chain of the batch.
+    fetcher = AsyncKeggFetcher()
+
+    outcomes: dict[str, object] = {}
+    in_flight: deque[tuple[str, object]] = deque()
+
+    def _collect_oldest() -> None:
+        pathway_id, future = in_flight.popleft()
+        outcomes[pathway_id] = future.result(raise_on_failure=False)
+
+    def _failed() -> bool:
+        return any(isinstance(outcome, BaseException) for outcome in outcomes.values())
+
+    for pathway_id in pathway_ids:
+        if not continue_on_error and _failed():
+            break
+        while len(in_flight) >= max_concurrency:
+            _collect_oldest()
+        future = pathway_chain_task.submit(pathway_id, membership, batch_id, fetcher)
+        in_flight.append((pathway_id, future))
+    while in_flight:
+        _collect_oldest()
+
+    first_error: BaseException | None = None
+    for pathway_id in pathway_ids:
+        if pathway_id not in outcomes:
+            continue
+        outcome = outcomes[pathway_id]
+        if isinstance(outcome, BaseException):
+            failures.append({"pathway_id": pathway_id, "error": str(outcome)})
+            first_error = first_error or outcome
+        else:
+            successes.append(pathway_id)
+            print(f"Pathway {pathway_id}: {outcome}")
+    if first_error is not None and not continue_on_error:
+        raise first_error
+
+
+@flow(name="kegg_organism_ingestion")
+def organism_ingestion_flow(
+    organism: str = "hsa",
+    archive_path: str | None = None,
+    archive_mode: str | None = None,
+) -> dict[str, object]:
+    """Ingest every pathway of a KEGG organism planned from ``list/pathway/<org>``.
+
+    Distinct reactions are fetched once, enriched in one bulk pass and
+    loaded once before pathway membership edges are attached. Returns the
+    batch summary shape plus the registry and a request/wall-clock report
+    comparing the run with per-pathway ingestion.
+    """
+    started = time.perf_counter()
+    _reset_fetch_telemetry()
+    with _archive_context(archive_path, archive_mode) as archive:
+        plan, registry = build_organism_registry_task(organism)
+        result = registry_ingest_task(registry, [])
+        table_stats(result.table)
+        telemetry = fetch_stats()
+        if archive is not None:
+            print(f"KEGG archive summary: {archive.summary()}")
+
+    report = organism_report(
+        plan,
+        registry,
+        result.table.compound_ids,
+        wall_seconds=time.perf_counter() - started,
+        measured_requests=telemetry["totals"]["requests"],
+    )
+    print(f"Organism ingestion report: {report}")
+    successes = result.successes
+    failures = [{"pathway_id": pathway_id, "error": error} for pathway_id, error in result.failures.items()]
+    return {
+        "total": len(plan.pathways),
+        "success_count": len(successes),
+        "failure_count": len(failures),
+        "successes": successes,
+        "failures": failures,
+        "registry": registry.stats(),
+        "report": report,
+    }
+
+
+@flow(name="kegg_streaming_ingestion")
+def streaming_ingestion_flow(
+    pathway_ids: list[str] | str,
+    fetch_workers: int = 4,
+    parse_threads: int = 1,
+    enrich_workers: int = 1,
+    load_workers: int = 2,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    archive_path: str | None = None,
+    archive_mode: str | None = None,
+) -> dict[str, object]:
+    """Ingest pathways with all stages running concurrently over bounded queues.
+
+    Returns the batch summary shape plus per-stage timing under ``stream``.
+    """
+    normalized_ids = _normalize_pathway_ids(pathway_ids)
+
+    _reset_fetch_telemetry()
+    with _archive_context(archive_path, archive_mode) as archive:
+        membership = load_membership_index() if normalized_ids else None
+        outcome = stream_ingest_task(
+            normalized_ids,
+            membership,
+            fetch_workers=fetch_workers,
+            parse_threads=parse_threads,
+            enrich_workers=enrich_workers,
+            load_workers=load_workers,
+            queue_size=queue_size,
+        )
+        fetch_stats()
+        if archive is not None:
+            print(f"KEGG archive summary: {archive.summary()}")
+
+    return {
+        "total": len(normalized_ids),
+        "success_count": len(outcome["successes"]),
+        "failure_count": len(outcome["failures"]),
+        **outcome,
+    }
+
+
+@flow(name="kegg_incremental_sync")
+def incremental_sync_flow(
+    pathway_ids: list[str] | str | None = None,
+    force: bool = False,
+    manifest_path: str | None = None,
+    archive_path: str | None = None,
+    archive_mode: str | None = None,
+) -> dict[str, object]:
+    """Bring Neo4j up to date with KEGG, fetching only new or changed entries.
+
+    Syncs every pathway in the manifest plus ``pathway_ids`` (which start
+    being tracked). Returns added/updated/removed counts per entity kind.
+    """
+    selected = _normalize_pathway_ids(pathway_ids) if pathway_ids else None
+    resolved_manifest = str(manifest_path or SYNC_MANIFEST_PATH)
+
+    _reset_fetch_telemetry()
+    with _archive_context(archive_path, archive_mode) as archive:
+        change_set = plan_sync_task(resolved_manifest, selected, force)
+        apply_change_set_task(change_set, resolved_manifest)
+        fetch_stats()
+        if archive is not None:
+            print(f"KEGG archive summary: {archive.summary()}")
+    return change_set.summary()
+
+
+@flow(name="kegg_snapshot_reload")
+def snapshot_reload_flow(
+    snapshot_path: str,
+    pathway_ids: list[str] | str | None = None,
+) -> dict[str, object]:
+    """Reload Neo4j from a Parquet snapshot written by ``write_snapshot``.
+
+    ``pathway_ids`` restricts the reload to those pathways' reactions.
+    """
+    selected = _normalize_pathway_ids(pathway_ids) if pathway_ids else None
+    loaded = load_snapshot_task(snapshot_path, selected)
+    return {"snapshot_path": snapshot_path, "pathway_ids": selected, "reactions": loaded}
+
+
+def _reaction_stats(reactions: list[RawReactionRecord]) -> dict[str, int]:
+    """Count reactions and distinct compounds in a batch of records."""
+    return {
+        "reactions": len(reactions),
+        "compounds": len(collect_compound_ids(reactions)),
+    }
+
+
+def _reset_fetch_telemetry() -> None:
+    """Start each flow run with empty fetch counters."""
+    get_fetch_metrics().reset()
+    get_singleflight().reset_stats()
+
+
+def _archive_context(archive_path: str | None, archive_mode: str | None):
+    """Return a record/replay archive context, or a no-op when not requested."""
+    if not archive_mode:
+        return nullcontext(None)
+    if not archive_path:
+        raise ValueError("archive_path is required when archive_mode is set")
+    return use_archive(archive_path, archive_mode)
+
+
 def _apply_schema(driver) -> None:
     """Apply graph schema constraints before ingestion."""
     schema_path = REPO_ROOT / "graph" / "schema.cypher"
@@ -133,6 +695,48 @@ def _parse_args() -> argparse.Namespace:
         action="store_true",
         help="Stop batch ingestion at first failure",
     )
+    parser.add_argument(
+        "--archive-mode",
+        choices=["record", "replay"],
+        help="Record KEGG traffic to, or replay it from, --archive-path",
+    )
+    parser.add_argument(
+        "--archive-path",
+        default="data/archives/kegg_traffic.sqlite",
+        help="KEGG traffic archive file (default: data/archives/kegg_traffic.sqlite)",
+    )
+    parser.add_argument(
+        "--per-pathway",
+        action="store_true",
+        help="Run each of --pathway-ids as its own ingest -> enrich -> load chain",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        help="Pathway chains run at once with --per-pathway (default: PATHWAY_CONCURRENCY)",
+    )
+    parser.add_argument(
+        "--batch-id",
+        help="Checkpoint batch progress under this id; rerun with it to resume",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Run --pathway-ids through the streaming (bounded-queue) pipeline",
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Incrementally sync tracked pathways (plus --pathway-ids) with KEGG",
+    )
+    parser.add_argument(
+        "--organism",
+        help="Ingest every pathway of a KEGG organism code (e.g. hsa)",
+    )
+    parser.add_argument(
+        "--from-snapshot",
+        help="Reload Neo4j from a Parquet snapshot directory instead of KEGG",
+    )
     return parser.parse_args()
 
 
@@ -176,10 +780,39 @@ def _normalize_pathway_ids(pathway_ids: list[str] | str) -> list[str]:
 
 if __name__ == "__main__":
     args = _parse_args()
-    if args.pathway_ids:
+    if args.from_snapshot:
+        snapshot_reload_flow(snapshot_path=args.from_snapshot, pathway_ids=args.pathway_ids)
+    elif args.organism:
+        organism_ingestion_flow(
+            organism=args.organism,
+            archive_path=args.archive_path,
+            archive_mode=args.archive_mode,
+        )
+    elif args.sync:
+        incremental_sync_flow(
+            pathway_ids=args.pathway_ids,
+            archive_path=args.archive_path,
+            archive_mode=args.archive_mode,
+        )
+    elif args.stream:
+        streaming_ingestion_flow(
+            pathway_ids=args.pathway_ids or [args.pathway_id],
+            archive_path=args.archive_path,
+            archive_mode=args.archive_mode,
+        )
+    elif args.pathway_ids:
         batch_ingestion_flow(
             pathway_ids=args.pathway_ids,
             continue_on_error=not args.fail_fast,
+            archive_path=args.archive_path,
+            archive_mode=args.archive_mode,
+            shared_registry=not args.per_pathway,
+            max_concurrency=args.max_concurrency,
+            batch_id=args.batch_id,
         )
     else:
-        ingestion_flow(pathway_id=args.pathway_id)
+        ingestion_flow(
+            pathway_id=args.pathway_id,
+            archive_path=args.archive_path,
+            archive_mode=args.archive_mode,
+        )
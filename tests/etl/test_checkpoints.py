@@ -0,0 +1,51 @@
+import pytest
+
+from etl.checkpoints import STAGE_LOADED, CheckpointStore, run_pathway_stages
+
+
+def _steps(calls, fail_at=None):
+    def step(name, fn):
+        def run(value):
+            calls.append(name)
+            if name == fail_at:
+                raise RuntimeError(f"{name} failed")
+            return fn(value)
+
+        return name, run
+
+    return [
+        step("fetched", lambda _: {"texts": {"R00001": "ENTRY R00001"}}),
+        step("parsed", lambda fetched: [{"reaction_id": rid} for rid in fetched["texts"]]),
+        step("enriched", lambda records: [record | {"compound_names": {}} for record in records]),
+        step("loaded", lambda records: {"reactions": len(records)}),
+    ]
+
+
+def test_rerun_resumes_at_first_unfinished_stage(tmp_path):
+    store = CheckpointStore(tmp_path / "checkpoints.sqlite")
+    calls: list[str] = []
+
+    with pytest.raises(RuntimeError):
+        run_pathway_stages("hsa00010", _steps(calls, fail_at="enriched"), store=store, batch_id="b1")
+    assert store.status("b1") == {"hsa00010": "parsed"}
+
+    calls.clear()
+    result = run_pathway_stages("hsa00010", _steps(calls), store=store, batch_id="b1")
+
+    assert calls == ["enriched", "loaded"]
+    assert result == {"reactions": 1}
+    assert store.completed("b1") == {"hsa00010"}
+
+
+def test_completed_pathways_are_skipped_and_batches_are_independent(tmp_path):
+    store = CheckpointStore(tmp_path / "checkpoints.sqlite")
+    store.save("b1", "hsa00010", STAGE_LOADED, {"reactions": 3})
+    calls: list[str] = []
+
+    assert run_pathway_stages("hsa00010", _steps(calls), store=store, batch_id="b1") == {"reactions": 3}
+    assert calls == []
+
+    run_pathway_stages("hsa00010", _steps(calls), store=store, batch_id="b2")
+    assert calls == ["fetched", "parsed", "enriched", "loaded"]
+    assert store.clear("b1") == 1
+    assert store.status("b1") == {}
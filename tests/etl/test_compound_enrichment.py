@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from etl.enrich.compound_enrichment import (
+    ENRICH_MODE_BULK,
+    enrich_compound_names,
+    load_compound_cache,
+    parse_compound_list,
+    save_compound_cache,
+)
+
+
+def _reactions():
+    return [
+        {
+            "reaction_id": "R00001",
+            "substrates": [{"id": "C00001", "coef": 1}],
+            "products": [{"id": "G00001", "coef": 1}],
+        }
+    ]
+
+
+def test_parse_compound_list_keeps_first_synonym():
+    lines = ["C00001\tH2O; Water", "cpd:C00002\tATP;  Adenosine 5'-triphosphate", "C00003\t"]
+
+    assert parse_compound_list(lines) == {
+        "C00001": "H2O",
+        "C00002": "ATP",
+        "C00003": None,
+    }
+
+
+def test_bulk_enrichment_uses_list_table_and_refresh_interval(tmp_path, monkeypatch):
+    list_calls: list[str] = []
+    get_calls: list[str] = []
+
+    def fake_stream(endpoint: str, entries: str, **_kwargs: object):
+        list_calls.append(f"{endpoint}/{entries}")
+        yield "C00001\tH2O; Water"
+
+    def fake_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        get_calls.append(entries)
+        return "ENTRY       G00001\nNAME        Glycan one\n///\n"
+
+    monkeypatch.setattr("etl.enrich.compound_enrichment.stream_kegg_lines", fake_stream)
+    monkeypatch.setattr("etl.fetch.kegg_api.fetch_kegg_data", fake_fetch)
+    cache_path = tmp_path / "compound_names.json"
+
+    first = enrich_compound_names(_reactions(), cache_path=cache_path, mode=ENRICH_MODE_BULK)
+    second = enrich_compound_names(_reactions(), cache_path=cache_path, mode=ENRICH_MODE_BULK)
+
+    assert list_calls == ["list/compound"]
+    assert get_calls == ["G00001"]
+    assert first[0]["compound_names"] == {"C00001": "H2O", "G00001": "Glycan one"}
+    assert second[0]["compound_names"] == first[0]["compound_names"]
+    assert (tmp_path / "compound_names.meta.json").exists()
+
+
+def test_concurrent_cache_saves_leave_a_complete_file(tmp_path):
+    cache_path = tmp_path / "compound_names.json"
+    caches = [{f"C{n:05d}": f"name {n}" for n in range(500)} | {"writer": str(i)} for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda cache: save_compound_cache(cache_path, cache), caches))
+
+    assert load_compound_cache(cache_path) in caches
+    assert [path.name for path in tmp_path.iterdir()] == ["compound_names.json"]
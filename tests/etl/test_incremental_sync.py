@@ -0,0 +1,109 @@
+import pytest
+
+from etl.incremental_sync import SyncManifest, plan_sync
+
+
+def _kegg(release="117.0+/01-18"):
+    return {
+        "release": release,
+        "pathways": {"hsa00010": "Glycolysis - Homo sapiens (human)"},
+        "pathway_links": {"R00001": "map00010", "R00002": "map00010"},
+        "module_links": {"R00003": "M00001"},
+        "reactions": {
+            "R00001": "C00001 <=> C00002",
+            "R00002": "C00002 <=> C00003",
+            "R00003": "C00003 <=> C00004",
+        },
+        "compounds": {"C00001": "H2O", "C00002": "ATP", "C00003": "ADP", "C00004": "AMP", "C00005": "NAD+"},
+    }
+
+
+def _fake_fetch(kegg, calls):
+    def fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        calls.append(f"{endpoint}/{entries}")
+        if endpoint == "info":
+            return f"kegg             Kyoto Encyclopedia of Genes and Genomes\n                 Release {kegg['release']}, Jan 26\n"
+        tables = {
+            "list/pathway/hsa": [f"path:{pid}\t{name}" for pid, name in kegg["pathways"].items()],
+            "link/reaction/pathway": [f"path:{pid}\trn:{rid}" for rid, pid in kegg["pathway_links"].items()],
+            "link/reaction/module": [f"md:{mid}\trn:{rid}" for rid, mid in kegg["module_links"].items()],
+            "link/module/pathway": ["path:map00010\tmd:M00001"],
+            "list/reaction": [f"rn:{rid}\treaction {rid}; {eq}" for rid, eq in kegg["reactions"].items()],
+            "list/compound": [f"cpd:{cid}\t{name}" for cid, name in kegg["compounds"].items()],
+        }
+        if f"{endpoint}/{entries}" in tables:
+            return "\n".join(tables[f"{endpoint}/{entries}"]) + "\n"
+        return "".join(
+            f"ENTRY       {rid}\nEQUATION    {kegg['reactions'][rid]}\n///\n"
+            for rid in entries.split("+")
+            if rid in kegg["reactions"]
+        )
+
+    return fetch
+
+
+def _sync(manifest, kegg, calls, pathway_ids=None):
+    change_set = plan_sync(manifest, pathway_ids, fetch=_fake_fetch(kegg, calls), rate_limit=None)
+    manifest.apply(change_set)
+    return change_set
+
+
+def test_first_sync_adds_everything_and_unchanged_release_short_circuits(tmp_path):
+    manifest = SyncManifest(tmp_path / "manifest.sqlite")
+    kegg, calls = _kegg(), []
+
+    first = _sync(manifest, kegg, calls, ["hsa00010"])
+
+    assert first.pathways.added == ["hsa00010"]
+    assert first.reactions.added == ["R00001", "R00002", "R00003"]
+    assert first.compounds.added == ["C00001", "C00002", "C00003", "C00004"]
+    assert first.memberships[0].reaction_ids == ["R00001", "R00002", "R00003"]
+    # The organism suffix of list/pathway/hsa is dropped, as in full ingestion.
+    assert first.memberships[0].name == "Glycolysis"
+    assert first.records[0]["compound_names"] == {"C00001": "H2O", "C00002": "ATP"}
+
+    calls.clear()
+    second = _sync(manifest, kegg, calls)
+
+    assert second.is_empty
+    assert calls == ["info/kegg"]
+
+
+def test_sync_fetches_only_changed_entries_and_emits_removals(tmp_path):
+    manifest = SyncManifest(tmp_path / "manifest.sqlite")
+    kegg, calls = _kegg(), []
+    _sync(manifest, kegg, calls, ["hsa00010"])
+
+    kegg["release"] = "117.0+/01-19"
+    kegg["reactions"]["R00002"] = "C00002 <=> C00005"
+    kegg["reactions"]["R00004"] = "C00001 <=> C00005"
+    kegg["pathway_links"]["R00004"] = "map00010"
+    kegg["module_links"]["R00003"] = "M00002"
+    kegg["compounds"]["C00001"] = "Water"
+    calls.clear()
+
+    change_set = _sync(manifest, kegg, calls)
+
+    assert [call for call in calls if call.startswith("get/")] == ["get/R00002+R00004"]
+    assert change_set.reactions.added == ["R00004"]
+    assert change_set.reactions.updated == ["R00002"]
+    assert change_set.reactions.removed == ["R00003"]
+    assert change_set.pathways.updated == ["hsa00010"]
+    assert change_set.memberships[0].reaction_ids == ["R00001", "R00002", "R00004"]
+    assert change_set.compounds.as_dict() == {"added": 1, "updated": 1, "removed": 2}
+    assert change_set.compound_names == {"C00001": "Water", "C00005": "NAD+"}
+    assert manifest.memberships() == {"hsa00010": {"R00001", "R00002", "R00004"}}
+
+
+def test_sync_aborts_on_empty_table_without_touching_manifest(tmp_path):
+    manifest = SyncManifest(tmp_path / "manifest.sqlite")
+    kegg, calls = _kegg(), []
+    _sync(manifest, kegg, calls, ["hsa00010"])
+
+    kegg["release"] = "117.0+/01-19"
+    kegg["reactions"] = {}
+    with pytest.raises(RuntimeError, match="list/reaction"):
+        _sync(manifest, kegg, calls)
+
+    assert manifest.release == "117.0+/01-18"
+    assert len(manifest.states("reaction")) == 3
@@ -0,0 +1,61 @@
+import pytest
+
+from etl.fetch.kegg_api import fetch_kegg_data
+from etl.fetch.kegg_archive import KeggArchiveMiss, use_archive
+
+
+class _Response:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.status_code = 200
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+class _Session:
+    def __init__(self) -> None:
+        self.urls: list[str] = []
+
+    def get(self, url: str, timeout: int = 0, **_kwargs: object) -> _Response:
+        self.urls.append(url)
+        return _Response(f"body for {url.rsplit('/', 1)[-1]}")
+
+
+class _OfflineSession:
+    def get(self, url: str, **_kwargs: object) -> _Response:
+        raise AssertionError(f"network access attempted: {url}")
+
+
+def test_record_then_replay_without_network(tmp_path):
+    path = tmp_path / "traffic.sqlite"
+    session = _Session()
+
+    with use_archive(path, "record") as archive:
+        recorded = fetch_kegg_data("get", "R00001", session=session)
+        fetch_kegg_data("link/rn", "hsa00010", session=session)
+        assert archive.summary()["recorded"] == 2
+
+    with use_archive(path, "replay") as archive:
+        replayed = fetch_kegg_data("get", "R00001", session=_OfflineSession())
+        missing = fetch_kegg_data("get", "R99999", session=_OfflineSession())
+        summary = archive.summary()
+
+    assert replayed == recorded == "body for R00001"
+    assert missing == ""
+    assert summary["replayed"] == 1
+    assert summary["unmatched"] == ["get/R99999"]
+
+
+def test_replay_injects_seeded_errors_and_strict_misses(tmp_path):
+    path = tmp_path / "traffic.sqlite"
+    with use_archive(path, "record"):
+        fetch_kegg_data("get", "R00001", session=_Session())
+
+    with use_archive(path, "replay", error_rate=1.0) as archive:
+        assert fetch_kegg_data("get", "R00001") == ""
+        assert archive.summary()["injected_errors"] == 1
+
+    with use_archive(path, "replay", strict=True):
+        with pytest.raises(KeggArchiveMiss):
+            fetch_kegg_data("get", "R99999")
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+
+from etl.fetch.kegg_async import AsyncKeggFetcher, TokenBucket
+from etl.normalize.kegg_pipeline import fetch_pathway, ingest_pathway
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0])
+
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+
+    now[0] = 10.0
+    assert bucket.reserve() == 0.0
+
+
+def test_fetch_all_preserves_order_and_bounds_concurrency():
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        # Later entries finish first to exercise result reordering.
+        time.sleep(0.02 * (5 - int(entries)))
+        with lock:
+            in_flight -= 1
+        return f"{endpoint}:{entries}"
+
+    fetcher = AsyncKeggFetcher(concurrency=2, rate_limit=1000, fetch=fake_fetch)
+    calls = [("get", str(index)) for index in range(5)]
+
+    assert fetcher.fetch_all(calls) == [f"get:{index}" for index in range(5)]
+    assert peak <= 2
+
+
+def test_fetch_all_runs_inside_event_loop():
+    fetcher = AsyncKeggFetcher(
+        rate_limit=1000,
+        fetch=lambda endpoint, entries, **_kwargs: entries,
+    )
+
+    async def _call() -> list[str]:
+        return fetcher.fetch_all([("get", "R00001"), ("get", "R00002")])
+
+    assert asyncio.run(_call()) == ["R00001", "R00002"]
+
+
+def test_ingest_pathway_concurrent_fetch_keeps_reaction_order(monkeypatch):
+    def fake_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        if entries == "path:demo":
+            return "MODULE      M00001 M00002\n"
+        if entries == "M00001+M00002":
+            return (
+                "ENTRY       M00001\nREACTION    R00003 R00001 R00012\n///\n"
+                "ENTRY       M00002\nREACTION    R00002 R00011\n///\n"
+            )
+        if endpoint == "get" and entries.startswith("R"):
+            # Larger batches finish first to exercise result reordering.
+            time.sleep(0.01 * (12 - len(entries.split("+"))))
+            return "".join(
+                f"ENTRY       {rid}\nEQUATION    C{rid[1:]} <=> C00099\n///\n"
+                for rid in entries.split("+")
+            )
+        return ""
+
+    monkeypatch.setattr("etl.normalize.kegg_pipeline.fetch_kegg_data", fake_fetch)
+
+    reactions = ingest_pathway("path:demo", concurrency=3, rate_limit=1000)
+
+    assert [item["reaction_id"] for item in reactions] == [
+        "R00001",
+        "R00002",
+        "R00003",
+        "R00011",
+        "R00012",
+    ]
+
+
+def test_shared_fetcher_rate_limits_every_pathway_request():
+    calls: list[tuple[str, str]] = []
+
+    def fake_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        calls.append((endpoint, entries))
+        if endpoint == "link/rn":
+            return f"path:{entries}\trn:R00001\n"
+        if entries.startswith("R"):
+            return "ENTRY       R00001\nEQUATION    C00001 <=> C00002\n///\n"
+        return "NAME        Demo\n"
+
+    reserved = 0
+
+    class CountingBucket(TokenBucket):
+        def reserve(self) -> float:
+            nonlocal reserved
+            reserved += 1
+            return 0.0
+
+    bucket = CountingBucket()
+    fetcher = AsyncKeggFetcher(fetch=fake_fetch, adaptive=False, use_cache=False, bucket=bucket)
+
+    for pathway_id in ["hsa00010", "hsa00020"]:
+        fetch_pathway(pathway_id, fetcher=fetcher, fetch=fake_fetch)
+
+    assert fetcher.bucket is bucket
+    assert {endpoint for endpoint, _ in calls} == {"get", "link/rn"}
+    assert reserved == len(calls)
+
+
+def test_shared_fetcher_caps_in_flight_requests_across_threads():
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        return entries
+
+    fetcher = AsyncKeggFetcher(concurrency=2, rate_limit=None, fetch=slow_fetch, adaptive=False)
+    threads = [
+        threading.Thread(
+            target=fetcher.fetch_all, args=([("get", f"{worker}-{index}") for index in range(4)],)
+        )
+        for worker in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
@@ -0,0 +1,80 @@
+from etl.enrich.compound_enrichment import enrich_compound_names
+from etl.fetch.kegg_api import chunk_entry_ids, fetch_kegg_entries, split_kegg_entries
+from etl.fetch.kegg_async import AsyncKeggFetcher
+
+
+def _entry(entry_id: str, body: str) -> str:
+    return f"ENTRY       {entry_id}                      Compound\n{body}\n///\n"
+
+
+def test_split_kegg_entries_keys_by_entry_id():
+    text = _entry("C00001", "NAME        H2O") + _entry("C00002", "NAME        ATP")
+
+    entries = split_kegg_entries(text)
+
+    assert list(entries) == ["C00001", "C00002"]
+    assert "NAME        ATP" in entries["C00002"]
+    assert "///" not in entries["C00001"]
+
+
+def test_chunk_entry_ids_dedupes_and_respects_limit():
+    ids = [f"R{index:05d}" for index in range(23)] + ["R00000"]
+
+    chunks = chunk_entry_ids(ids)
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 3]
+    assert chunks[0][0] == "R00000"
+
+
+def test_fetch_kegg_entries_retries_only_failed_chunks():
+    calls: list[str] = []
+
+    def fake_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        calls.append(entries)
+        ids = entries.split("+")
+        if "cpd:C00011" in ids and calls.count(entries) == 1:
+            return ""
+        return "".join(_entry(entry_id.split(":")[-1], "NAME        X") for entry_id in ids)
+
+    ids = [f"cpd:C{index:05d}" for index in range(1, 16)]
+
+    entries = fetch_kegg_entries(ids, fetch=fake_fetch)
+
+    assert len(calls) == 3
+    assert calls[2] == calls[1]
+    assert all(entries[entry_id] for entry_id in ids)
+
+
+def test_fetch_kegg_entries_marks_missing_entries_empty():
+    def fake_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        return _entry("R00001", "EQUATION    C00001 <=> C00002")
+
+    entries = AsyncKeggFetcher(rate_limit=1000, fetch=fake_fetch).fetch_entries(
+        ["R00001", "R99999"]
+    )
+
+    assert entries["R00001"].startswith("ENTRY")
+    assert entries["R99999"] == ""
+
+
+def test_enrich_compound_names_batches_uncached_compounds(monkeypatch):
+    calls: list[str] = []
+
+    def fake_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        calls.append(entries)
+        return "".join(_entry(entry_id, f"NAME        name-{entry_id};") for entry_id in entries.split("+"))
+
+    monkeypatch.setattr("etl.fetch.kegg_api.fetch_kegg_data", fake_fetch)
+    reactions = [
+        {
+            "reaction_id": "R00001",
+            "substrates": [{"id": f"C{index:05d}", "coef": 1} for index in range(1, 8)],
+            "products": [{"id": f"C{index:05d}", "coef": 1} for index in range(8, 13)],
+        }
+    ]
+
+    enriched = enrich_compound_names(reactions)
+
+    assert len(calls) == 2
+    assert enriched[0]["compound_names"]["C00012"] == "name-C00012"
+    assert enriched[0]["substrates"][0]["name"] == "name-C00001"
@@ -0,0 +1,158 @@
+import random
+
+from etl.fetch.kegg_api import fetch_kegg_entries, sync_kegg_release
+from etl.fetch.kegg_cache import KeggCache
+from etl.normalize.kegg_pipeline import parse_reaction_texts
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_roundtrip_and_ttl_expiry(tmp_path):
+    clock = _Clock()
+    cache = KeggCache(tmp_path / "kegg.sqlite", ttl=60, clock=clock)
+
+    assert cache.get("get", "R00001") is None
+    cache.set("get", "R00001", "ENTRY       R00001\n")
+    assert cache.get("get", "R00001") == "ENTRY       R00001\n"
+
+    clock.now += 61
+    assert cache.get("get", "R00001") is None
+
+
+def test_cache_survives_reopen_and_dedupes_bodies(tmp_path):
+    path = tmp_path / "kegg.sqlite"
+    cache = KeggCache(path)
+    cache.set("get", "C00001", "same body")
+    cache.set("get", "cpd:C00001", "same body")
+    size = cache.total_bytes
+    cache.close()
+
+    reopened = KeggCache(path)
+
+    assert reopened.get("get", "cpd:C00001") == "same body"
+    assert reopened.total_bytes == size
+
+
+def test_negative_entries_use_shorter_ttl(tmp_path):
+    clock = _Clock()
+    cache = KeggCache(tmp_path / "kegg.sqlite", ttl=600, negative_ttl=10, clock=clock)
+    cache.set("get", "R00002", "")
+    cache.set("get", "R00003", "ENZYME      1.1.1.1\n")
+    cache.mark_negative("get", "R00003")
+
+    assert cache.get("get", "R00002") == ""
+    assert cache.get("get", "R00003") == ""
+
+    clock.now += 11
+    assert cache.get("get", "R00002") is None
+    assert cache.get("get", "R00003") is None
+
+
+def test_mark_negative_never_inserts_missing_entries(tmp_path):
+    cache = KeggCache(tmp_path / "kegg.sqlite")
+
+    assert cache.mark_negative("get", "R00004") is False
+    assert cache.get("get", "R00004") is None
+
+
+def test_parse_stage_leaves_failed_fetches_uncached(tmp_path):
+    cache = KeggCache(tmp_path / "kegg.sqlite")
+    cache.set("get", "R00005", "ENTRY       R00005\nNAME        no equation\n")
+
+    parsed, skipped = parse_reaction_texts(
+        {"R00005": "ENTRY       R00005\nNAME        no equation\n", "R00006": ""},
+        cache=cache,
+        parse_workers=1,
+    )
+
+    assert parsed == {}
+    assert skipped == ["R00005", "R00006"]
+    # Unparsable text KEGG returned goes negative; the failed fetch is retried.
+    assert cache.get("get", "R00005") == ""
+    assert cache.get("get", "R00006") is None
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    clock = _Clock()
+    cache = KeggCache(tmp_path / "kegg.sqlite", max_bytes=2000, clock=clock)
+    rng = random.Random(0)
+    for index in range(20):
+        clock.now += 1
+        body = "".join(rng.choice("ACGT") for _ in range(800))
+        cache.set("get", f"R{index:05d}", body)
+        clock.now += 1
+        cache.get("get", "R00000")
+
+    assert cache.total_bytes <= 2000
+    assert cache.get("get", "R00000") is not None
+    assert cache.get("get", "R00001") is None
+
+
+def test_fetch_kegg_entries_serves_cached_and_negative_entries(tmp_path):
+    cache = KeggCache(tmp_path / "kegg.sqlite")
+    calls: list[str] = []
+
+    def fake_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        calls.append(entries)
+        return "ENTRY       R00001\nEQUATION    C00001 <=> C00002\n///\n"
+
+    first = fetch_kegg_entries(["R00001", "R99999"], fetch=fake_fetch, cache=cache)
+    second = fetch_kegg_entries(["R00001", "R99999"], fetch=fake_fetch, cache=cache)
+
+    assert calls == ["R00001+R99999"]
+    assert first == second
+    assert second["R99999"] == ""
+
+
+def test_release_change_invalidates_cache(tmp_path):
+    cache = KeggCache(tmp_path / "kegg.sqlite")
+    cache.sync_release("117.0")
+    cache.set("get", "R00001", "body")
+
+    assert cache.sync_release("117.0") is False
+    assert cache.get("get", "R00001") == "body"
+
+    assert cache.sync_release("118.0") is True
+    assert cache.get("get", "R00001") is None
+    assert cache.total_bytes == 0
+
+
+def test_confirmed_release_serves_entries_past_ttl(tmp_path):
+    clock = _Clock()
+    cache = KeggCache(
+        tmp_path / "kegg.sqlite", ttl=60, negative_ttl=60, release_recheck=3600, clock=clock
+    )
+    cache.sync_release("117.0")
+    cache.set("get", "R00001", "body")
+    cache.set("get", "R99999", "")
+
+    clock.now += 120
+    assert cache.get("get", "R00001") == "body"
+    assert cache.get("get", "R99999") is None
+
+    clock.now += 3600
+    assert cache.get("get", "R00001") is None
+
+
+def test_sync_kegg_release_checks_info_once_per_window(tmp_path, monkeypatch):
+    calls: list[tuple[str, str]] = []
+
+    def fake_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        calls.append((endpoint, entries))
+        return (
+            "kegg             Kyoto Encyclopedia of Genes and Genomes\n"
+            "kegg             Release 117.0+/01-18, Jan 26\n"
+        )
+
+    monkeypatch.setattr("etl.fetch.kegg_api.fetch_kegg_data", fake_fetch)
+    cache = KeggCache(tmp_path / "kegg.sqlite")
+
+    assert sync_kegg_release(cache=cache) == "117.0+/01-18"
+    assert sync_kegg_release(cache=cache) == "117.0+/01-18"
+    assert calls == [("info", "kegg")]
@@ -0,0 +1,180 @@
+import threading
+import time
+
+from etl.fetch.kegg_api import fetch_kegg_data, stream_kegg_lines
+from etl.fetch.kegg_control import KeggFlowControl, parse_retry_after, retry_delay
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Response:
+    def __init__(self, status_code: int, text: str = "", headers: dict | None = None) -> None:
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def raise_for_status(self) -> None:
+        import requests
+
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error")
+
+
+class _StreamResponse(_Response):
+    encoding = "utf-8"
+
+    def __enter__(self) -> "_StreamResponse":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        return None
+
+    def iter_lines(self, decode_unicode: bool = False):
+        return iter(self.text.splitlines())
+
+
+class _Session:
+    def __init__(self, responses: list[_Response]) -> None:
+        self.responses = responses
+
+    def get(self, url: str, **_kwargs: object) -> _Response:
+        return self.responses.pop(0)
+
+
+def test_aimd_grows_on_success_and_halves_on_throttle():
+    clock = _Clock()
+    control = KeggFlowControl(initial_limit=4, max_limit=8, clock=clock)
+
+    for _ in range(20):
+        control.record("ok", latency=0.1)
+    grown = control.limit
+    control.record("throttled")
+
+    assert grown > 4
+    assert control.limit == grown // 2
+
+
+def test_latency_spike_shrinks_limit():
+    clock = _Clock()
+    control = KeggFlowControl(initial_limit=8, clock=clock)
+    for _ in range(5):
+        control.record("ok", latency=0.1)
+
+    control.record("ok", latency=2.0)
+
+    assert control.limit == 4
+
+
+def test_breaker_opens_after_consecutive_failures_and_recovers():
+    clock = _Clock()
+    control = KeggFlowControl(failure_threshold=3, cooldown=30, clock=clock)
+
+    for _ in range(3):
+        control.record("error")
+
+    assert control.pause_remaining() == 30
+    clock.now += 31
+    assert control.pause_remaining() == 0
+    control.record("error")
+    assert control.pause_remaining() == 30
+    control.record("ok")
+    assert control.snapshot()["consecutive_failures"] == 0
+
+
+def test_retry_after_parsing_and_jitter():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert retry_delay(1, 2.0, retry_after=5.0) == 5.0
+    assert all(1.0 <= retry_delay(1, 2.0) <= 3.0 for _ in range(50))
+
+
+def test_fetch_honors_retry_after_and_trips_breaker(monkeypatch):
+    clock = _Clock()
+    sleeps: list[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr("etl.fetch.kegg_api.time.sleep", fake_sleep)
+    monkeypatch.setattr("etl.fetch.kegg_control.time.sleep", fake_sleep)
+    control = KeggFlowControl(failure_threshold=10, clock=clock)
+    session = _Session(
+        [_Response(429, headers={"Retry-After": "2"}), _Response(200, "ENTRY       R00001\n")]
+    )
+
+    text = fetch_kegg_data("get", "R00001", session=session, control=control, use_cache=False)
+
+    assert text == "ENTRY       R00001\n"
+    assert sleeps == [2.0]
+    assert control.snapshot()["breaker_trips"] == 1
+
+
+def test_stream_waits_for_breaker_and_reports_outcomes(monkeypatch):
+    clock = _Clock()
+    sleeps: list[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr("etl.fetch.kegg_api.time.sleep", fake_sleep)
+    monkeypatch.setattr("etl.fetch.kegg_control.time.sleep", fake_sleep)
+    control = KeggFlowControl(failure_threshold=10, cooldown=5, clock=clock)
+    control.record("throttled", retry_after=3)
+    session = _Session(
+        [
+            _StreamResponse(503, headers={"Retry-After": "2"}),
+            _StreamResponse(200, "cpd:C00001\twater\ncpd:C00002\tATP\n"),
+        ]
+    )
+
+    lines = list(stream_kegg_lines("list", "compound", session=session, control=control))
+
+    assert lines == ["cpd:C00001\twater", "cpd:C00002\tATP"]
+    # The open breaker is waited out before the first attempt; the 503's
+    # Retry-After reopens it and sets the retry delay.
+    assert sleeps == [3.0, 2.0]
+    assert control.snapshot()["breaker_trips"] == 2
+    assert control.snapshot()["consecutive_failures"] == 0
+
+
+def test_flow_control_limit_bounds_concurrent_sync_fetches():
+    control = KeggFlowControl(initial_limit=1, max_limit=1)
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    class _SlowSession:
+        def get(self, url: str, **_kwargs: object) -> _Response:
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return _Response(200, url)
+
+    threads = [
+        threading.Thread(
+            target=fetch_kegg_data,
+            args=("get", f"R0000{index}"),
+            kwargs={"session": _SlowSession(), "control": control, "use_cache": False},
+        )
+        for index in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 1
+    assert control.snapshot()["in_flight"] == 0
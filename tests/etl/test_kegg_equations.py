@@ -0,0 +1,40 @@
+import time
+
+from etl.normalize.kegg_equations import parse_coefficient, parse_equation
+
+
+def test_parse_equation_returns_compact_tuples():
+    parsed = parse_equation("2 C00138 + 0.5 C00024 => C00139 + G10505")
+
+    assert parsed is not None
+    assert parsed.reversible is False
+    assert parsed.substrates == (("C00138", 2), ("C00024", 0.5))
+    assert parsed.products == (("C00139", 1),)
+
+
+def test_parse_equation_without_arrow_returns_none():
+    assert parse_equation("C00001 + C00002") is None
+
+
+def test_parse_coefficient_keeps_symbolic_expressions():
+    assert parse_coefficient(None) == 1
+    assert parse_coefficient("3") == 3
+    assert parse_coefficient("1.5") == 1.5
+    assert parse_coefficient("(n+1)") == "n+1"
+    assert parse_coefficient("n-1") == "n-1"
+    assert parse_coefficient("(2)") == 2
+    assert parse_coefficient("(1.5)") == 1.5
+    assert parse_coefficient("2n") == "2n"
+
+
+def test_parse_equation_full_reaction_set_under_a_second():
+    equations = [
+        f"2 C{i % 30000:05d} + (n+1) C{(i + 7) % 30000:05d} <=> C{(i + 3) % 30000:05d}(n) + n C00001"
+        for i in range(12000)
+    ]
+
+    started = time.perf_counter()
+    for equation in equations:
+        parse_equation(equation)
+
+    assert time.perf_counter() - started < 1.0
@@ -0,0 +1,78 @@
+import textwrap
+
+from etl.enrich.compound_enrichment import enrich_compound_names
+from etl.fetch.kegg_flatfile import FlatFileDump, iter_flatfile_entries
+from etl.normalize.kegg_pipeline import ingest_pathways_from_dump
+
+
+def _write_dump(tmp_path):
+    dump_dir = tmp_path / "kegg"
+    dump_dir.mkdir()
+    (dump_dir / "reaction").write_text(
+        textwrap.dedent(
+            """\
+            ENTRY       R00001                      Reaction
+            EQUATION    C00001 <=> C00002
+            PATHWAY     rn00010  Glycolysis / Gluconeogenesis
+            ///
+            ENTRY       R00002                      Reaction
+            EQUATION    C00002 => C00003
+            MODULE      M00001  Glycolysis
+            ///
+            ENTRY       R00003                      Reaction
+            ENZYME      1.1.1.1
+            PATHWAY     rn00020  Citrate cycle
+            ///
+            """
+        )
+    )
+    (dump_dir / "pathway").write_text(
+        "ENTRY       map00010                    Pathway\n"
+        "NAME        Glycolysis / Gluconeogenesis\n"
+        "MODULE      M00001  Glycolysis\n"
+        "///\n"
+    )
+    (dump_dir / "compound").write_text(
+        "ENTRY       C00001                      Compound\nNAME        H2O;\n            Water\n///\n"
+        "ENTRY       C00002                      Compound\nNAME        ATP\n///\n"
+    )
+    (dump_dir / "enzyme").write_text("ENTRY       EC 1.1.1.1                  Enzyme\n///\n")
+    return dump_dir
+
+
+def test_iter_flatfile_entries_streams_records(tmp_path):
+    dump_dir = _write_dump(tmp_path)
+
+    entries = list(iter_flatfile_entries(dump_dir / "reaction"))
+
+    assert [entry_id for entry_id, _text in entries] == ["R00001", "R00002", "R00003"]
+    assert entries[1][1].startswith("ENTRY       R00002")
+    assert "///" not in entries[1][1]
+
+
+def test_flatfile_dump_serves_batched_gets(tmp_path):
+    with FlatFileDump(_write_dump(tmp_path)) as dump:
+        text = dump.fetch("get", "rn:R00002+R99999+1.1.1.1")
+
+        assert text.count("///") == 2
+        assert "EC 1.1.1.1" in text
+        assert dump.get("hsa00010").startswith("ENTRY       map00010")
+        assert dump.fetch("link/rn", "map00010") == ""
+
+
+def test_ingest_pathways_from_dump_runs_offline(tmp_path, monkeypatch):
+    def no_network(*_args: object, **_kwargs: object) -> str:
+        raise AssertionError("network access attempted")
+
+    monkeypatch.setattr("etl.normalize.kegg_pipeline.fetch_kegg_data", no_network)
+    monkeypatch.setattr("etl.fetch.kegg_api.fetch_kegg_data", no_network)
+
+    with FlatFileDump(_write_dump(tmp_path)) as dump:
+        results = list(ingest_pathways_from_dump(dump))
+        records = results[0][1]
+        enrich_compound_names(records, fetch=dump.fetch)
+
+    assert [pathway_id for pathway_id, _records in results] == ["map00010"]
+    assert [item["reaction_id"] for item in records] == ["R00001", "R00002"]
+    assert records[0]["pathway_name"] == "Glycolysis / Gluconeogenesis"
+    assert records[0]["compound_names"] == {"C00001": "H2O", "C00002": "ATP"}
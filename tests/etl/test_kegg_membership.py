@@ -0,0 +1,52 @@
+from etl.normalize.kegg_membership import build_membership_index, parse_link_table
+from etl.normalize.kegg_pipeline import ingest_pathway
+
+
+def test_parse_link_table_normalizes_pathway_and_module_ids():
+    pathways = parse_link_table(
+        ["path:map00010\trn:R00014", "path:rn00010\trn:R00200", "rn:R00300\tpath:map00020"],
+        source="pathway",
+    )
+    modules = parse_link_table(["md:M00001\trn:R00200", "md:hsa_M00001\trn:R00299"], source="module")
+
+    assert pathways == {"00010": {"R00014", "R00200"}, "00020": {"R00300"}}
+    assert modules == {"M00001": {"R00200", "R00299"}}
+
+
+def test_ingest_pathway_resolves_membership_from_index(monkeypatch):
+    calls: list[tuple[str, str]] = []
+
+    def fake_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        calls.append((endpoint, entries))
+        if entries == "hsa00010":
+            return "ENTRY       hsa00010\nMODULE      hsa_M00001\n"
+        return "".join(
+            f"ENTRY       {rid}\nEQUATION    C00001 <=> C00002\n///\n"
+            for rid in entries.split("+")
+        )
+
+    monkeypatch.setattr("etl.normalize.kegg_pipeline.fetch_kegg_data", fake_fetch)
+    index = build_membership_index(
+        "path:map00010\trn:R00002\npath:map00020\trn:R00009\n",
+        "md:M00001\trn:R00001\n",
+    )
+
+    reactions = ingest_pathway("hsa00010", membership=index, rate_limit=1000)
+
+    assert [item["reaction_id"] for item in reactions] == ["R00001", "R00002"]
+    assert calls == [("get", "hsa00010"), ("get", "R00001+R00002")]
+
+
+def test_membership_index_updates_from_parsed_reaction_links():
+    index = build_membership_index("path:map00010\trn:R00001\n", "")
+
+    index.update_from_reactions(
+        [
+            {"reaction_id": "R00200", "pathways": ["rn00010", "rn00620"], "modules": ["M00001"]},
+            {"reaction_id": "R00300"},
+        ]
+    )
+
+    assert index.reactions_for_pathway("hsa00010") == {"R00001", "R00200"}
+    assert index.reactions_for_pathway("map00620") == {"R00200"}
+    assert index.reactions_for_modules(["hsa_M00001"]) == {"R00200"}
@@ -0,0 +1,82 @@
+import json
+
+import requests
+
+from etl.fetch.kegg_api import fetch_kegg_data
+from etl.fetch.kegg_control import KeggFlowControl
+from etl.fetch.kegg_metrics import FetchMetrics, endpoint_label, get_fetch_metrics
+
+
+class _Response:
+    def __init__(self, status_code: int, text: str = "") -> None:
+        self.status_code = status_code
+        self.text = text
+        self.headers: dict = {}
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error")
+
+
+class _Session:
+    def __init__(self, responses: list[_Response]) -> None:
+        self.responses = responses
+
+    def get(self, url: str, **_kwargs: object) -> _Response:
+        return self.responses.pop(0)
+
+
+def test_endpoint_label_splits_link_by_target_database():
+    assert endpoint_label("get", "R00001+R00002") == "get"
+    assert endpoint_label("list", "compound") == "list"
+    assert endpoint_label("link", "rn/path:hsa00010") == "link/rn"
+    assert endpoint_label("link", "reaction/pathway") == "link/reaction"
+
+
+def test_metrics_snapshot_reports_histogram_and_hit_ratio(tmp_path):
+    metrics = FetchMetrics()
+    metrics.record_request("get", latency=0.02, size=100)
+    metrics.record_request("get", latency=3.0, size=50, error=True)
+    metrics.record_retry("get")
+    metrics.record_cache("get", hit=True)
+    metrics.record_cache("get", hit=True)
+    metrics.record_cache("get", hit=False)
+
+    snapshot = metrics.snapshot()
+    get_stats = snapshot["endpoints"]["get"]
+    assert get_stats["requests"] == 2
+    assert get_stats["errors"] == 1
+    assert get_stats["retries"] == 1
+    assert get_stats["bytes"] == 150
+    assert get_stats["cache_hit_ratio"] == round(2 / 3, 4)
+    assert get_stats["latency_seconds"]["buckets"]["0.05"] == 1
+    assert get_stats["latency_seconds"]["buckets"]["5.0"] == 1
+    assert get_stats["latency_seconds"]["max"] == 3.0
+    assert snapshot["totals"]["requests"] == 2
+
+    path = metrics.write_summary(tmp_path / "metrics.json", pathway_id="hsa00010")
+    written = json.loads(path.read_text())
+    assert written["pathway_id"] == "hsa00010"
+    assert written["endpoints"]["get"]["bytes"] == 150
+
+
+def test_fetch_kegg_data_records_requests_and_retries(monkeypatch):
+    monkeypatch.setattr("etl.fetch.kegg_api.time.sleep", lambda _seconds: None)
+    metrics = get_fetch_metrics()
+    metrics.reset()
+    session = _Session([_Response(500), _Response(200, "ENTRY       R00001\n")])
+
+    text = fetch_kegg_data(
+        "link",
+        "rn/path:hsa00010",
+        session=session,
+        use_cache=False,
+        control=KeggFlowControl(),
+    )
+
+    stats = metrics.snapshot()["endpoints"]["link/rn"]
+    assert text == "ENTRY       R00001\n"
+    assert stats["requests"] == 2
+    assert stats["errors"] == 1
+    assert stats["retries"] == 1
+    assert stats["bytes"] == len(text)
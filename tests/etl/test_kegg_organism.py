@@ -0,0 +1,75 @@
+from etl.enrich.compound_enrichment import ENRICH_MODE_ENTRY
+from etl.normalize.kegg_organism import ingest_organism
+
+REACTIONS = {
+    "R00001": "C00001 <=> C00002",
+    "R00002": "C00002 <=> C00003",
+    "R00003": "C00003 <=> C00004",
+}
+COMPOUNDS = {"C00001": "H2O", "C00002": "ATP", "C00003": "ADP", "C00004": "AMP"}
+
+
+def _fake_fetch(calls):
+    tables = {
+        "list/pathway/hsa": [
+            "path:hsa00010\tGlycolysis - Homo sapiens (human)",
+            "path:hsa00020\tCitrate cycle - Homo sapiens (human)",
+            "path:hsa04010\tMAPK signaling pathway - Homo sapiens (human)",
+        ],
+        "link/reaction/pathway": [
+            "path:map00010\trn:R00001",
+            "path:map00010\trn:R00002",
+            "path:map00020\trn:R00002",
+        ],
+        "link/reaction/module": ["md:M00001\trn:R00003"],
+        "link/module/pathway": ["path:map00020\tmd:M00001"],
+    }
+
+    def fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        calls.append(f"{endpoint}/{entries}")
+        if f"{endpoint}/{entries}" in tables:
+            return "\n".join(tables[f"{endpoint}/{entries}"]) + "\n"
+        return "".join(
+            f"ENTRY       {kegg_id}\nEQUATION    {REACTIONS[kegg_id]}\n///\n"
+            if kegg_id in REACTIONS
+            else f"ENTRY       {kegg_id}\nNAME        {COMPOUNDS[kegg_id]}\n///\n"
+            for kegg_id in entries.split("+")
+        )
+
+    return fetch
+
+
+def test_organism_ingestion_fetches_each_distinct_reaction_once(tmp_path):
+    calls: list[str] = []
+
+    result = ingest_organism(
+        "hsa",
+        fetch=_fake_fetch(calls),
+        rate_limit=None,
+        parse_workers=1,
+        enrich_mode=ENRICH_MODE_ENTRY,
+        compound_cache_path=tmp_path / "compounds.json",
+    )
+
+    gets = [call for call in calls if call.startswith("get/")]
+    assert gets == ["get/R00001+R00002+R00003", "get/C00001+C00002+C00003+C00004"]
+    assert [pathway.pathway_id for pathway in result.plan.pathways] == ["hsa00010", "hsa00020"]
+    assert [pathway.name for pathway in result.plan.pathways] == ["Glycolysis", "Citrate cycle"]
+    assert result.plan.modules == {"M00001"}
+
+    records = result.pathway_records()
+    assert [(record["pathway_id"], record["reaction_id"]) for record in records] == [
+        ("hsa00010", "R00001"),
+        ("hsa00010", "R00002"),
+        ("hsa00020", "R00002"),
+        ("hsa00020", "R00003"),
+    ]
+    assert records[-1]["substrates"][0]["name"] == "ADP"
+
+    report = result.report
+    assert report["listed_pathways"] == 3
+    assert report["distinct_reactions"] == 3
+    assert report["reaction_references"] == 4
+    assert report["distinct_compounds"] == 4
+    assert report["requests"] == 5
+    assert report["per_pathway_requests"] == 6
@@ -0,0 +1,53 @@
+from etl.normalize.kegg_parse_pool import parse_entries
+from etl.normalize.kegg_reactions import parse_reaction_entry
+
+
+def _reaction_texts(count: int) -> list[str]:
+    return [
+        f"ENTRY       R{i:05d}\nEQUATION    {i % 3 + 1} C{i:05d} <=> C{i + 1:05d}\n"
+        for i in range(count)
+    ]
+
+
+def test_parse_entries_process_pool_matches_serial_order():
+    texts = _reaction_texts(9)
+
+    serial = parse_entries(texts, parse_reaction_entry, workers=1)
+    parallel = parse_entries(texts, parse_reaction_entry, workers=2, chunk_size=2)
+
+    assert parallel == serial
+    assert [item["substrates"][0]["id"] for item in parallel] == [f"C{i:05d}" for i in range(9)]
+
+
+def test_parse_entries_falls_back_to_serial_for_unpicklable_parser():
+    texts = _reaction_texts(4)
+
+    parsed = parse_entries(texts, lambda text: text.split()[1], workers=2, chunk_size=1)
+
+    assert parsed == ["R00000", "R00001", "R00002", "R00003"]
+
+
+def test_parse_entries_cached_skips_unchanged_entries_until_version_bump(tmp_path):
+    from etl.fetch.kegg_cache import KeggCache, content_digest
+    from etl.normalize.kegg_parse_pool import parse_entries_cached
+
+    cache = KeggCache(tmp_path / "cache.sqlite")
+    calls: list[str] = []
+
+    def counting_parser(text: str) -> dict:
+        calls.append(text)
+        return parse_reaction_entry(text)
+
+    texts = _reaction_texts(3)
+    first = parse_entries_cached(texts, counting_parser, kind="reaction", version=1, cache=cache)
+    second = parse_entries_cached(texts, counting_parser, kind="reaction", version=1, cache=cache)
+
+    assert second == first
+    assert len(calls) == 3
+    second[0]["substrates"].clear()
+    assert parse_entries_cached(texts[:1], counting_parser, kind="reaction", version=1, cache=cache) == first[:1]
+
+    parse_entries_cached(texts, counting_parser, kind="reaction", version=2, cache=cache)
+    assert len(calls) == 6
+    assert cache.get_parsed("reaction", 1, [content_digest(text) for text in texts]) == {}
+    cache.close()
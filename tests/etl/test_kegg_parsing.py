@@ -1,10 +1,26 @@
 import textwrap
 
 from etl.normalize.kegg_enzymes import extract_kegg_enzymes
-from etl.normalize.kegg_pipeline import ingest_pathway
+from etl.normalize.kegg_pipeline import fetch_pathway, ingest_pathway
 from etl.normalize.kegg_reactions import parse_reaction_entry
 
 
+def _serve_batches(fake_fetch):
+    """Answer '+'-joined KEGG get requests from a single-entry fake."""
+
+    def _fetch(endpoint: str, entries: str, **kwargs: object) -> str:
+        if endpoint != "get" or "+" not in entries:
+            return fake_fetch(endpoint, entries, **kwargs)
+        blocks = []
+        for entry_id in entries.split("+"):
+            text = fake_fetch(endpoint, entry_id, **kwargs)
+            if text:
+                blocks.append(f"ENTRY       {entry_id}\n{text}///\n")
+        return "".join(blocks)
+
+    return _fetch
+
+
 def test_parse_reaction_entry_reversible_stoichiometry():
     text = textwrap.dedent(
         """
@@ -121,7 +137,9 @@ def test_ingest_pathway_skips_missing_equation(monkeypatch):
             return "ENZYME      1.1.1.1\n"
         return ""
 
-    monkeypatch.setattr("etl.normalize.kegg_pipeline.fetch_kegg_data", fake_fetch)
+    monkeypatch.setattr(
+        "etl.normalize.kegg_pipeline.fetch_kegg_data", _serve_batches(fake_fetch)
+    )
 
     reactions = ingest_pathway("path:demo")
 
@@ -142,7 +160,9 @@ def test_ingest_pathway_skips_missing_products(monkeypatch):
             return "EQUATION    C00001 <=> X00099\n"
         return ""
 
-    monkeypatch.setattr("etl.normalize.kegg_pipeline.fetch_kegg_data", fake_fetch)
+    monkeypatch.setattr(
+        "etl.normalize.kegg_pipeline.fetch_kegg_data", _serve_batches(fake_fetch)
+    )
 
     reactions = ingest_pathway("path:demo")
 
@@ -160,7 +180,9 @@ def test_ingest_pathway_falls_back_to_pathway_reactions_when_no_modules(monkeypa
             return "EQUATION    C00012 => C00013\n"
         return ""
 
-    monkeypatch.setattr("etl.normalize.kegg_pipeline.fetch_kegg_data", fake_fetch)
+    monkeypatch.setattr(
+        "etl.normalize.kegg_pipeline.fetch_kegg_data", _serve_batches(fake_fetch)
+    )
 
     reactions = ingest_pathway("path:demo")
 
@@ -180,7 +202,9 @@ def test_ingest_pathway_unions_module_and_pathway_reactions(monkeypatch):
             return "EQUATION    C00003 => C00004\n"
         return ""
 
-    monkeypatch.setattr("etl.normalize.kegg_pipeline.fetch_kegg_data", fake_fetch)
+    monkeypatch.setattr(
+        "etl.normalize.kegg_pipeline.fetch_kegg_data", _serve_batches(fake_fetch)
+    )
 
     reactions = ingest_pathway("path:demo")
 
@@ -201,8 +225,70 @@ def test_ingest_pathway_collects_reactions_from_link_endpoint(monkeypatch):
             return "EQUATION    C00003 => C00004\n"
         return ""
 
-    monkeypatch.setattr("etl.normalize.kegg_pipeline.fetch_kegg_data", fake_fetch)
+    monkeypatch.setattr(
+        "etl.normalize.kegg_pipeline.fetch_kegg_data", _serve_batches(fake_fetch)
+    )
 
     reactions = ingest_pathway("path:demo")
 
     assert [item["reaction_id"] for item in reactions] == ["R12345", "R12346"]
+
+
+def test_fetch_pathway_reports_unfetched_reactions(capsys):
+    def fake_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        if entries == "path:demo":
+            return "REACTION    R00001 R00002\n"
+        if entries == "R00001":
+            return "EQUATION    C00001 <=> C00002\n"
+        return ""
+
+    fetched = fetch_pathway("path:demo", fetch=_serve_batches(fake_fetch))
+
+    assert list(fetched["reaction_texts"]) == ["R00001"]
+    assert "Unfetched reactions: R00002" in capsys.readouterr().out
+
+
+def test_parse_reaction_entry_symbolic_coefficients():
+    text = textwrap.dedent(
+        """
+        ENTRY       RTEST07
+        EQUATION    C00369(n) + n C00001 <=> (n+1) C00031 + 2n C00080
+        """
+    ).strip()
+
+    parsed = parse_reaction_entry(text)
+
+    assert parsed["substrates"] == [
+        {"id": "C00369", "coef": 1},
+        {"id": "C00001", "coef": 1, "coef_symbol": "n"},
+    ]
+    assert parsed["products"] == [
+        {"id": "C00031", "coef": 1, "coef_symbol": "n+1"},
+        {"id": "C00080", "coef": 1, "coef_symbol": "2n"},
+    ]
+
+
+def test_parse_reaction_entry_extracts_cross_reference_sections():
+    text = textwrap.dedent(
+        """
+        ENTRY       R00200                      Reaction
+        EQUATION    C00002 + C00022 <=> C00008 + C00074
+        RCLASS      RC00002  C00002_C00008
+                    RC00015  C00022_C00074
+        ENZYME      2.7.1.40
+        PATHWAY     rn00010  Glycolysis / Gluconeogenesis
+                    rn00620  Pyruvate metabolism
+        MODULE      M00001  Glycolysis (Embden-Meyerhof pathway), glucose => pyruvate
+                    M00002  Glycolysis, core module involving three-carbon compounds
+        ORTHOLOGY   K00873  PK, pyk; pyruvate kinase [EC:2.7.1.40]
+                    K12406  PKLR; pyruvate kinase isozymes R/L [EC:2.7.1.40]
+        """
+    ).strip()
+
+    parsed = parse_reaction_entry(text)
+
+    assert parsed["pathways"] == ["rn00010", "rn00620"]
+    assert parsed["modules"] == ["M00001", "M00002"]
+    assert parsed["orthologs"] == ["K00873", "K12406"]
+    assert parsed["rclasses"] == ["RC00002", "RC00015"]
+    assert parsed["enzymes"] == ["2.7.1.40"]
@@ -0,0 +1,233 @@
+import pytest
+
+from etl.checkpoints import STAGE_ENRICHED, STAGE_LOADED, CheckpointStore
+from etl.normalize.kegg_membership import build_membership_index
+from etl.normalize.kegg_registry import REGISTRY_CHECKPOINT_KEY, BatchRegistry, ingest_registry_batch
+
+PATHWAYS = {
+    "hsa00010": "ENTRY       hsa00010\nNAME        Glycolysis\nMODULE      hsa_M00001\n",
+    "hsa00020": "ENTRY       hsa00020\nNAME        Citrate cycle\nMODULE      hsa_M00001\n",
+}
+LINKS = {"hsa00010": "path:hsa00010\trn:R00002\n", "hsa00020": "path:hsa00020\trn:R00003\n"}
+
+
+def _fake_fetch(calls):
+    def fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        calls.append((endpoint, entries))
+        if endpoint == "link/rn":
+            return LINKS[entries]
+        if entries in PATHWAYS:
+            return PATHWAYS[entries]
+        blocks = []
+        for entry_id in entries.split("+"):
+            if entry_id == "M00001":
+                blocks.append("ENTRY       M00001\nREACTION    R00001\n")
+            elif entry_id == "R00003":
+                # Returned by KEGG but without an equation: unparsable.
+                blocks.append(f"ENTRY       {entry_id}\nNAME        Unbalanced\n")
+            else:
+                blocks.append(f"ENTRY       {entry_id}\nEQUATION    C00001 <=> C00002\n")
+        return "".join(f"{block}///\n" for block in blocks)
+
+    return fetch
+
+
+def test_batch_registry_fetches_shared_modules_and_reactions_once():
+    calls: list[tuple[str, str]] = []
+    registry = BatchRegistry(fetch=_fake_fetch(calls), rate_limit=None)
+
+    registry.add_pathways(["hsa00010", "hsa00020"])
+
+    assert calls.count(("get", "M00001")) == 1
+    reaction_gets = [entries for endpoint, entries in calls if endpoint == "get" and "R" in entries]
+    assert reaction_gets == ["R00001+R00002+R00003"]
+
+    assert [item.reaction_ids for item in registry.memberships()] == [
+        ["R00001", "R00002"],
+        ["R00001"],
+    ]
+    assert [record["reaction_id"] for record in registry.reaction_records()] == ["R00001", "R00002"]
+    assert {record["pathway_id"] for record in registry.reaction_records()} == {None}
+    assert registry.records_for("hsa00020")[0]["pathway_name"] == "Citrate cycle"
+    assert registry.reaction_table().to_records() == registry.reaction_records()
+
+    stats = registry.stats()
+    assert stats["distinct_reactions"] == 3
+    assert stats["skipped_reactions"] == 1
+    assert stats["reaction_references"] == 4
+
+
+def test_batch_registry_skips_known_reactions_on_later_batches():
+    calls: list[tuple[str, str]] = []
+    index = build_membership_index("path:map00010\trn:R00001\npath:map00020\trn:R00001\n", "")
+    registry = BatchRegistry(fetch=_fake_fetch(calls), membership=index, rate_limit=None)
+
+    registry.add_pathways(["hsa00010"])
+    registry.add_pathways(["hsa00020", "hsa00010"])
+
+    assert calls == [("get", "hsa00010"), ("get", "R00001"), ("get", "hsa00020")]
+    assert [item.pathway_id for item in registry.memberships()] == ["hsa00010", "hsa00020"]
+
+
+def test_batch_registry_records_failed_pathway_and_continues():
+    calls: list[tuple[str, str]] = []
+    fetch = _fake_fetch(calls)
+
+    def flaky_fetch(endpoint: str, entries: str, **kwargs: object) -> str:
+        if entries == "hsa00010":
+            raise TimeoutError("read timed out")
+        return fetch(endpoint, entries, **kwargs)
+
+    registry = BatchRegistry(fetch=flaky_fetch, rate_limit=None)
+
+    registry.add_pathways(["hsa00010", "hsa00020"])
+
+    assert registry.failures == {"hsa00010": "read timed out"}
+    assert [item.pathway_id for item in registry.memberships()] == ["hsa00020"]
+    assert [record["reaction_id"] for record in registry.records_for("hsa00020")] == ["R00001"]
+    assert registry.stats()["failed_pathways"] == 1
+
+
+def test_batch_registry_records_empty_pathway_entry_as_failure():
+    fetch = _fake_fetch([])
+
+    def unreachable_fetch(endpoint: str, entries: str, **kwargs: object) -> str:
+        if entries == "hsa00010":
+            return ""
+        return fetch(endpoint, entries, **kwargs)
+
+    registry = BatchRegistry(fetch=unreachable_fetch, rate_limit=None)
+
+    registry.add_pathways(["hsa00010", "hsa00020"])
+
+    assert registry.failures == {"hsa00010": "KEGG returned no entry for hsa00010"}
+    assert [item.pathway_id for item in registry.memberships()] == ["hsa00020"]
+
+
+def _names(compound_ids):
+    return {compound_id: f"name-{compound_id}" for compound_id in compound_ids}
+
+
+def test_registry_batch_isolates_a_failing_pathway_load():
+    registry = BatchRegistry(fetch=_fake_fetch([]), rate_limit=None)
+    loads: list[tuple[str, list[str]]] = []
+
+    def load(table, item, reaction_ids):
+        if item.pathway_id == "hsa00010":
+            raise RuntimeError("neo4j unavailable")
+        loads.append((item.pathway_id, reaction_ids))
+
+    result = ingest_registry_batch(
+        registry, ["hsa00010", "hsa00020"], resolve_names=_names, load=load
+    )
+
+    assert result.failures == {"hsa00010": "neo4j unavailable"}
+    assert result.successes == ["hsa00020"]
+    assert loads == [("hsa00020", ["R00001"])]
+
+
+def test_registry_batch_enriches_per_pathway_when_batch_enrichment_fails():
+    registry = BatchRegistry(fetch=_fake_fetch([]), rate_limit=None)
+    requests: list[list[str]] = []
+
+    def resolve(compound_ids):
+        requests.append(sorted(compound_ids))
+        if len(requests) == 1:
+            raise TimeoutError("names unavailable")
+        return _names(compound_ids)
+
+    loads: list[tuple[str, list[str]]] = []
+    result = ingest_registry_batch(
+        registry,
+        ["hsa00010", "hsa00020"],
+        resolve_names=resolve,
+        load=lambda table, item, reaction_ids: loads.append((item.pathway_id, reaction_ids)),
+    )
+
+    assert result.failures == {}
+    assert result.successes == ["hsa00010", "hsa00020"]
+    assert loads == [("hsa00010", ["R00001", "R00002"]), ("hsa00020", [])]
+    assert len(requests) == 2
+    assert result.table.compound_names == ["name-C00001", "name-C00002"]
+
+
+def test_interrupted_registry_batch_resumes_from_checkpoints(tmp_path):
+    store = CheckpointStore(tmp_path / "checkpoints.sqlite")
+    loads: list[tuple[str, list[str]]] = []
+
+    def interrupted_load(table, item, reaction_ids):
+        if item.pathway_id == "hsa00020":
+            raise KeyboardInterrupt
+        loads.append((item.pathway_id, reaction_ids))
+
+    with pytest.raises(KeyboardInterrupt):
+        ingest_registry_batch(
+            BatchRegistry(fetch=_fake_fetch([]), rate_limit=None),
+            ["hsa00010", "hsa00020"],
+            resolve_names=_names,
+            load=interrupted_load,
+            store=store,
+            batch_id="b1",
+        )
+    assert store.status("b1") == {REGISTRY_CHECKPOINT_KEY: STAGE_ENRICHED, "hsa00010": STAGE_LOADED}
+
+    calls: list[tuple[str, str]] = []
+    resolved: list[list[str]] = []
+    loads.clear()
+    result = ingest_registry_batch(
+        BatchRegistry(fetch=_fake_fetch(calls), rate_limit=None),
+        ["hsa00020"],
+        resolve_names=lambda ids: resolved.append(list(ids)) or _names(ids),
+        load=lambda table, item, reaction_ids: loads.append((item.pathway_id, reaction_ids)),
+        store=store,
+        batch_id="b1",
+    )
+
+    assert calls == []
+    assert resolved == []
+    assert loads == [("hsa00020", [])]
+    assert result.successes == ["hsa00020"]
+    assert result.table.compound_names == ["name-C00001", "name-C00002"]
+    assert store.completed("b1") == {"hsa00010", "hsa00020"}
+
+
+def test_resumed_registry_batch_retries_unfetched_reactions(tmp_path):
+    store = CheckpointStore(tmp_path / "checkpoints.sqlite")
+    fetch = _fake_fetch([])
+
+    def flaky_fetch(endpoint: str, entries: str, **kwargs: object) -> str:
+        # R00002 is left out of every response, as if its fetch failed.
+        kept = "+".join(entry for entry in entries.split("+") if entry != "R00002")
+        return fetch(endpoint, kept, **kwargs) if kept else ""
+
+    def interrupted_load(table, item, reaction_ids):
+        raise KeyboardInterrupt
+
+    first = BatchRegistry(fetch=flaky_fetch, rate_limit=None)
+    with pytest.raises(KeyboardInterrupt):
+        ingest_registry_batch(
+            first,
+            ["hsa00010", "hsa00020"],
+            resolve_names=_names,
+            load=interrupted_load,
+            store=store,
+            batch_id="b1",
+        )
+    assert first.unfetched() == {"R00002"}
+    assert "R00002" not in first.skipped
+
+    calls: list[tuple[str, str]] = []
+    loads: list[tuple[str, list[str]]] = []
+    result = ingest_registry_batch(
+        BatchRegistry(fetch=_fake_fetch(calls), rate_limit=None),
+        ["hsa00010"],
+        resolve_names=_names,
+        load=lambda table, item, reaction_ids: loads.append((item.pathway_id, reaction_ids)),
+        store=store,
+        batch_id="b1",
+    )
+
+    assert calls == [("get", "R00002")]
+    assert [item.pathway_id for item in result.registry.memberships()] == ["hsa00010"]
+    assert loads == [("hsa00010", ["R00001", "R00002"])]
+    assert result.registry.unfetched() == set()
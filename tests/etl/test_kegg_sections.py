@@ -0,0 +1,52 @@
+import textwrap
+
+from etl.enrich.compound_enrichment import extract_compound_name
+from etl.normalize.kegg_sections import section_text, tokenize_entry
+
+
+def test_tokenize_entry_joins_continuations_and_keeps_sublabels():
+    text = textwrap.dedent(
+        """
+        ENTRY       R00200                      Reaction
+        NAME        ATP:pyruvate 2-O-phosphotransferase
+        DEFINITION  ATP + Pyruvate <=>
+                    ADP + Phosphoenolpyruvate
+        PATHWAY     rn00010  Glycolysis / Gluconeogenesis
+                    rn00620  Pyruvate metabolism
+        REFERENCE   1
+          AUTHORS   Smith J.
+        ///
+        ENTRY       R99999
+        """
+    ).strip()
+
+    sections = tokenize_entry(text)
+
+    assert sections["ENTRY"] == ["R00200                      Reaction"]
+    assert section_text(sections, "DEFINITION") == "ATP + Pyruvate <=> ADP + Phosphoenolpyruvate"
+    assert sections["PATHWAY"] == [
+        "rn00010  Glycolysis / Gluconeogenesis",
+        "rn00620  Pyruvate metabolism",
+    ]
+    assert sections["REFERENCE"] == ["1", "AUTHORS   Smith J."]
+    assert section_text(sections, "EQUATION") is None
+
+
+def test_tokenize_entry_blank_line_closes_section():
+    sections = tokenize_entry("NAME        Pyruvate\n\n            stray\n")
+
+    assert sections == {"NAME": ["Pyruvate"]}
+
+
+def test_tokenize_entry_continues_after_blank_line_until_terminator():
+    sections = tokenize_entry(
+        "ENTRY       R00001\n\nEQUATION    C00001 <=> C00002\n///\nNAME        next entry\n"
+    )
+
+    assert sections == {"ENTRY": ["R00001"], "EQUATION": ["C00001 <=> C00002"]}
+
+
+def test_extract_compound_name_uses_first_synonym():
+    text = "ENTRY       C00022\nNAME        Pyruvate;\n            Pyruvic acid;\n"
+
+    assert extract_compound_name(text) == "Pyruvate"
@@ -0,0 +1,123 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from etl.fetch.kegg_api import fetch_kegg_data, fetch_kegg_entries
+from etl.fetch.kegg_control import KeggFlowControl
+from etl.fetch.kegg_singleflight import SingleFlight, get_singleflight
+
+
+class _Response:
+    status_code = 200
+    headers: dict = {}
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+class _GatedSession:
+    """Session whose requests block until the test releases them."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.urls: list[str] = []
+
+    def get(self, url: str, **_kwargs: object) -> _Response:
+        self.urls.append(url)
+        self.started.set()
+        self.release.wait(timeout=5)
+        return _Response(f"ENTRY       {url.rsplit('/', 1)[-1]}\n")
+
+
+def _wait_for_waiters(flight: SingleFlight, coalesced: int) -> None:
+    for _ in range(500):
+        if flight.stats()["coalesced"] >= coalesced:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("callers never joined the in-flight request")
+
+
+def test_singleflight_shares_result_and_counts_coalesced_calls():
+    flight = SingleFlight()
+    gate = threading.Event()
+    calls = []
+
+    def work() -> str:
+        calls.append(1)
+        gate.wait(timeout=5)
+        return "body"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flight.do, "get/R00001", work) for _ in range(4)]
+        _wait_for_waiters(flight, 3)
+        gate.set()
+        results = [future.result() for future in futures]
+
+    assert results == ["body"] * 4
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_singleflight_propagates_leader_error_and_forgets_key():
+    flight = SingleFlight()
+
+    def boom() -> str:
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        flight.do("get/R00001", boom)
+    assert flight.do("get/R00001", lambda: "ok") == "ok"
+    assert flight.stats()["executed"] == 2
+
+
+def test_concurrent_fetch_kegg_data_issues_one_request():
+    session = _GatedSession()
+    flight = get_singleflight()
+    flight.reset_stats()
+    control = KeggFlowControl()
+
+    def _fetch() -> str:
+        return fetch_kegg_data("get", "R00001", session=session, use_cache=False, control=control)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(_fetch) for _ in range(3)]
+        _wait_for_waiters(flight, 2)
+        session.release.set()
+        results = [future.result() for future in futures]
+
+    assert session.urls == ["https://rest.kegg.jp/get/R00001"]
+    assert results == ["ENTRY       R00001\n"] * 3
+
+
+def test_fetch_kegg_entries_waits_for_entries_claimed_elsewhere():
+    flight = get_singleflight()
+    gate = threading.Event()
+    requested: list[str] = []
+
+    def fake_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        requested.append(entries)
+        if "R00001" in entries:
+            gate.wait(timeout=5)
+        return "".join(f"ENTRY       {rid}\n///\n" for rid in entries.split("+"))
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(fetch_kegg_entries, ["R00001"], fetch=fake_fetch, use_cache=False)
+        while not requested:
+            threading.Event().wait(0.01)
+        flight.reset_stats()
+        second = pool.submit(
+            fetch_kegg_entries, ["R00001", "R00002"], fetch=fake_fetch, use_cache=False
+        )
+        _wait_for_waiters(flight, 1)
+        gate.set()
+        first_result = first.result()
+        second_result = second.result()
+
+    assert requested == ["R00001", "R00002"]
+    assert second_result["R00001"] == first_result["R00001"] == "ENTRY       R00001\n"
+    assert second_result["R00002"] == "ENTRY       R00002\n"
@@ -0,0 +1,55 @@
+from etl.load.parquet_snapshot import load_snapshot, read_snapshot_table, write_snapshot
+from etl.models.reaction_table import ReactionTable
+
+
+def _reaction(reaction_id, pathway_id, substrates, products, enzymes=()):
+    return {
+        "reaction_id": reaction_id,
+        "pathway_id": pathway_id,
+        "pathway_name": f"Pathway {pathway_id}",
+        "equation": f"{reaction_id} equation",
+        "reversible": True,
+        "substrates": substrates,
+        "products": products,
+        "enzymes": list(enzymes),
+        "name": None,
+        "definition": None,
+    }
+
+
+def _records():
+    return [
+        _reaction("R00001", "hsa00010", [{"id": "C00001", "coef": 2}], [{"id": "C00002", "coef": 1}], ["1.1.1.1"]),
+        _reaction("R00002", "hsa00010", [{"id": "C00002", "coef": 1, "coef_symbol": "n"}], [{"id": "C00003", "coef": 0.5}]),
+        # R00001 again under a second pathway: stored once, linked twice.
+        _reaction("R00001", "hsa00020", [{"id": "C00001", "coef": 2}], [{"id": "C00002", "coef": 1}], ["1.1.1.1"]),
+        _reaction("R00003", "hsa00020", [{"id": "C00004", "coef": 1}], [{"id": "C00005", "coef": 1}])
+        | {"pathways": ["rn00020"], "modules": [], "orthologs": ["K00001"], "rclasses": ["RC00001"]},
+    ]
+
+
+def test_snapshot_round_trips_records(tmp_path):
+    path = write_snapshot(ReactionTable.from_records(_records()), tmp_path / "snap")
+
+    assert read_snapshot_table(path, "reactions")["reaction_id"].tolist() == ["R00001", "R00002", "R00003"]
+    assert len(read_snapshot_table(path, "stoichiometry")) == 6
+    assert (path / "membership" / "pathway_id=hsa00020").is_dir()
+
+    restored = load_snapshot(path).to_records()
+    key = lambda record: (record["pathway_id"], record["reaction_id"])
+    assert sorted(restored, key=key) == sorted(_records(), key=key)
+
+
+def test_snapshot_reads_project_columns_and_filter_pathways(tmp_path):
+    path = write_snapshot(ReactionTable.from_records(_records()), tmp_path / "snap")
+
+    membership = read_snapshot_table(
+        path, "membership", columns=["reaction_id"], filters=[("pathway_id", "==", "hsa00020")]
+    )
+    assert list(membership.columns) == ["reaction_id"]
+    assert sorted(membership["reaction_id"]) == ["R00001", "R00003"]
+
+    table = load_snapshot(path, pathway_ids=["hsa00020"])
+    assert sorted(table.reaction_ids) == ["R00001", "R00003"]
+    assert table.pathway_ids == ["hsa00020"]
+    assert sorted(table.compound_ids) == ["C00001", "C00002", "C00004", "C00005"]
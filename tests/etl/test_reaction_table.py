@@ -0,0 +1,125 @@
+from etl.enrich.compound_enrichment import enrich_reaction_table
+from etl.load.neo4j_loader import load_reaction_table
+from etl.models.reaction_table import ROLE_PRODUCT, ReactionTable
+
+
+def _records():
+    return [
+        {
+            "reaction_id": "R00001",
+            "pathway_id": "hsa00010",
+            "pathway_name": "Glycolysis",
+            "equation": "2 C00001 <=> C00002",
+            "reversible": True,
+            "substrates": [{"id": "C00001", "coef": 2}],
+            "products": [{"id": "C00002", "coef": 1}],
+            "enzymes": ["1.1.1.1"],
+            "name": "first",
+            "definition": None,
+        },
+        {
+            "reaction_id": "R00002",
+            "pathway_id": "hsa00010",
+            "pathway_name": "Glycolysis",
+            "equation": "n C00002 => 0.5 C00003",
+            "reversible": False,
+            "substrates": [{"id": "C00002", "coef": 1, "coef_symbol": "n"}],
+            "products": [{"id": "C00003", "coef": 0.5}],
+            "enzymes": ["1.1.1.1", "2.2.2.2"],
+            "name": None,
+            "definition": "B => C",
+        },
+    ]
+
+
+def test_reaction_table_interns_ids_and_round_trips_records():
+    table = ReactionTable.from_records(_records())
+
+    assert len(table) == 2
+    assert table.compound_ids == ["C00001", "C00002", "C00003"]
+    assert table.pathway_ids == ["hsa00010"]
+    assert table.enzyme_ids == ["1.1.1.1", "2.2.2.2"]
+    assert list(table.edge_compound) == [0, 1, 1, 2]
+    assert table.edge_role[3] == ROLE_PRODUCT
+    assert table.to_records() == _records()
+
+
+def test_enrich_reaction_table_sets_names_once_per_compound(tmp_path):
+    cache_path = tmp_path / "names.json"
+    cache_path.write_text('{"C00001": "Water", "C00002": "ATP", "C00003": null}')
+    table = ReactionTable.from_records(_records())
+
+    enrich_reaction_table(table, cache_path=cache_path)
+
+    assert table.compound_names == ["Water", "ATP", None]
+    records = table.to_records()
+    assert records[0]["substrates"][0]["name"] == "Water"
+    assert records[1]["compound_names"] == {"C00002": "ATP", "C00003": None}
+    assert ReactionTable.from_records(records).compound_names == ["Water", "ATP", None]
+
+
+class _Session:
+    def __init__(self) -> None:
+        self.writes: list[tuple[str, list[dict]]] = []
+
+    def __enter__(self) -> "_Session":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        return None
+
+    def execute_write(self, fn, *args):
+        fn(self, *args)
+
+    def run(self, query: str, **params) -> None:
+        self.writes.append((" ".join(query.split()), params["rows"]))
+
+
+class _Driver:
+    def __init__(self) -> None:
+        self.session_ = _Session()
+
+    def session(self) -> _Session:
+        return self.session_
+
+
+def _rows(driver: _Driver, clause: str) -> list[dict]:
+    return [row for query, rows in driver.session_.writes if clause in query for row in rows]
+
+
+def test_load_reaction_table_batches_rows_from_columns():
+    table = ReactionTable.from_parsed(
+        {record["reaction_id"]: record for record in _records()}
+    )
+    driver = _Driver()
+
+    load_reaction_table(driver, table, batch_size=1)
+
+    assert [row["id"] for row in _rows(driver, "MERGE (r:Reaction")] == ["R00001", "R00002"]
+    assert _rows(driver, "HAS_REACTION") == []
+    assert _rows(driver, "MERGE (c:Compound") == [
+        {"id": "C00001", "name": None},
+        {"id": "C00002", "name": None},
+        {"id": "C00003", "name": None},
+    ]
+    assert _rows(driver, "CONSUMED_BY")[1] == {
+        "cid": "C00002",
+        "rid": "R00002",
+        "coef": 1,
+        "coef_symbol": "n",
+    }
+    assert _rows(driver, "PRODUCES")[1]["coef"] == 0.5
+    assert len(_rows(driver, "CATALYZED_BY")) == 3
+    # One transaction per row with batch_size=1.
+    assert all(len(rows) == 1 for _, rows in driver.session_.writes)
+
+
+def test_load_reaction_table_restricts_to_reaction_ids():
+    table = ReactionTable.from_records(_records())
+    driver = _Driver()
+
+    load_reaction_table(driver, table, reaction_ids=["R00002"])
+
+    assert [row["id"] for row in _rows(driver, "MERGE (r:Reaction")] == ["R00002"]
+    assert _rows(driver, "HAS_REACTION") == [{"pid": "hsa00010", "rid": "R00002"}]
+    assert [row["id"] for row in _rows(driver, "MERGE (c:Compound")] == ["C00002", "C00003"]
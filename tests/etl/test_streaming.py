@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+from etl.streaming import Stage, run_stages, stream_ingest_pathways
+
+
+def test_run_stages_overlaps_stages_and_bounds_queues():
+    in_flight = {"parse": 0, "max_parse": 0}
+    lock = threading.Lock()
+
+    def slow_fetch(item):
+        time.sleep(0.02)
+        return item
+
+    def parse(item):
+        with lock:
+            in_flight["parse"] += 1
+            in_flight["max_parse"] = max(in_flight["max_parse"], in_flight["parse"])
+        time.sleep(0.02)
+        with lock:
+            in_flight["parse"] -= 1
+        return item * 10
+
+    result = run_stages(
+        range(20),
+        [Stage("fetch", slow_fetch, workers=2), Stage("parse", parse, workers=2), Stage("load", lambda x: x)],
+        queue_size=2,
+    )
+
+    assert sorted(result.outputs) == [value * 10 for value in range(20)]
+    assert [stats.items_in for stats in result.stages] == [20, 20, 20]
+    assert in_flight["max_parse"] == 2
+    # Two workers per stage and overlapping stages beat the serial sum of 0.8s.
+    assert result.wall_seconds < 0.6
+
+
+def test_run_stages_reraises_stage_errors():
+    def explode(item):
+        if item == 3:
+            raise ValueError("bad item")
+        return item
+
+    with pytest.raises(ValueError, match="bad item"):
+        run_stages(range(100), [Stage("parse", explode), Stage("load", lambda x: x)], queue_size=1)
+
+
+def test_stream_ingest_pathways_flows_shared_reactions_once():
+    def fake_fetch(endpoint: str, entries: str, **_kwargs: object) -> str:
+        if endpoint == "link/rn":
+            return {"hsa00010": "path:hsa00010\trn:R00001\trn:R00002\n"}.get(entries, "path:x\trn:R00002\n")
+        if entries.startswith("hsa"):
+            return f"ENTRY       {entries}\nNAME        Pathway {entries}\n"
+        return "".join(
+            f"ENTRY       {rid}\nEQUATION    C00001 <=> C00002\n///\n" for rid in entries.split("+")
+        )
+
+    loaded: list[str] = []
+    registry, result = stream_ingest_pathways(
+        ["hsa00010", "hsa00020"],
+        fetch=fake_fetch,
+        rate_limit=None,
+        enrich=False,
+        load=lambda records: loaded.extend(record["reaction_id"] for record in records),
+        chunk_size=1,
+    )
+
+    assert sorted(loaded) == ["R00001", "R00002"]
+    assert result.outputs == []
+    assert [item.reaction_ids for item in registry.memberships()] == [["R00001", "R00002"], ["R00002"]]
+    assert set(result.summary()["stages"]) == {"fetch", "parse", "load"}